@@ -0,0 +1,108 @@
+# UHS arrays: one Value object per element (the original list of Noob/Number/... objects) versus
+# typed storage (array('q') / array('d') / bytearray / list of str) boxed on read.
+# First replays random CONFINE / DISCHARGE / reads on both and checks that they agree, then
+# compares memory per element and the time of a CONFINE/read loop.
+#   python benchmarks/bench_arrays.py [size]
+import random
+import sys
+import time
+import tracemalloc
+
+from common import report
+
+from src.interpreter.values import Array, Boolean, Noob, Number, String
+
+TYPES = ('NUMBR', 'NUMBAR', 'TROOF', 'YARN')
+
+
+class BoxedArray(Array):
+    """The original layout: a list holding a Value for every element."""
+    def __init__(self, element_type, size, line_number=None):
+        super().__init__(element_type, 0, line_number)
+        self.size = size
+        self.elements = [Noob() for _ in range(size)]
+        self.noobs = self.integers = None
+        self.storage = 'boxed'
+
+
+def random_value(rng):
+    kind = rng.randrange(9)
+    if kind == 0: return Number(rng.randint(-10**6, 10**6))
+    if kind == 1: return Number(rng.choice([2**62, -2**63, 2**53, 2**53 + 1, 2**63, -2**70]))
+    if kind == 2: return Number(rng.uniform(-1e6, 1e6))
+    if kind == 3: return Number(rng.choice([0.0, -0.0, 1e300, float('inf'), 5e-324]))
+    if kind == 4: return Boolean(rng.random() < 0.5)
+    if kind == 5: return String(rng.choice(['', 'WIN', '12', 'kitteh']))
+    if kind == 6: return Noob()
+    return Number(rng.randint(0, 3))
+
+
+def describe(result):
+    value, error = result
+    if error:
+        return f"error: {error.details}"
+    return f"{type(value).__name__} {value!r} {type(value.value).__name__}"
+
+
+def check(rounds=20000, seed=124):
+    rng = random.Random(seed)
+    for element_type in TYPES:
+        size = 17
+        typed, boxed = Array(element_type, size), BoxedArray(element_type, size)
+        for _ in range(rounds):
+            operation = rng.randrange(3)
+            index = rng.choice([rng.randrange(size), -1, size, 3.0])
+            if operation == 0:
+                value = random_value(rng)
+                results = typed.set(index, value), boxed.set(index, value)
+            elif operation == 1:
+                results = typed.get(index), boxed.get(index)
+            else:
+                results = typed.remove(index), boxed.remove(index)
+            if describe(results[0]) != describe(results[1]):
+                raise SystemExit(f"MISMATCH on {element_type}: {describe(results[0])} != {describe(results[1])}")
+        for index in range(size):
+            if describe(typed.get(index)) != describe(boxed.get(index)):
+                raise SystemExit(f"MISMATCH on {element_type} at {index}")
+    print(f"Typed and boxed arrays agree on {rounds:,} random operations per element type")
+
+
+def memory_per_element(array_class, element_type, size):
+    tracemalloc.start()
+    array = array_class(element_type, size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del array
+    return current / size
+
+
+def confine_loop(array_class, element_type, size, value):
+    array = array_class(element_type, size)
+    start = time.perf_counter()
+    for index in range(size):
+        array.set(index, value)
+    for index in range(size):
+        array.get(index)
+    return time.perf_counter() - start
+
+
+def main():
+    check()
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    values = {'NUMBR': Number(42), 'NUMBAR': Number(4.2), 'TROOF': Boolean(True), 'YARN': String('kitteh')}
+    print(f"\nI HAS A x ITZ A <type> UHS OF {size:,}")
+    for element_type in TYPES:
+        boxed = memory_per_element(BoxedArray, element_type, size)
+        typed = memory_per_element(Array, element_type, size)
+        print(f"  {element_type:7} {boxed:8.1f} -> {typed:5.2f} bytes per element ({boxed / typed:.0f}x less)")
+
+    print(f"\nCONFINE then read every element")
+    for element_type in TYPES:
+        boxed = confine_loop(BoxedArray, element_type, size, values[element_type])
+        typed = confine_loop(Array, element_type, size, values[element_type])
+        report(f'  {element_type} boxed', boxed, 2 * size, 'ops')
+        report(f'  {element_type} typed', typed, 2 * size, 'ops')
+
+
+if __name__ == '__main__':
+    main()
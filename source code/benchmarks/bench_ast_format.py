@@ -0,0 +1,92 @@
+# Binary AST format: round-trips every node type, then compares serialize.load() with
+# re-lexing and re-parsing the source (and with pickle).
+#   python benchmarks/bench_ast_format.py [lines]
+import pickle
+import sys
+
+from common import best_of, parseable_program, read_testcases, report
+
+from src.lexer import tokenizer
+from src.parser import parser, serialize
+
+
+def same_tree(left, right):
+    """Structural equality of two ASTs, including every token field."""
+    work = [(left, right)]
+    while work:
+        a, b = work.pop()
+        if type(a) is not type(b):
+            return False
+        if isinstance(a, (list, tuple)):
+            if len(a) != len(b):
+                return False
+            work.extend(zip(a, b))
+        elif isinstance(a, tokenizer.Token):
+            if a != b or a.offset != b.offset:
+                return False
+        elif type(a) in serialize.NODE_FIELDS:
+            work.extend((getattr(a, name), getattr(b, name)) for name in serialize.NODE_FIELDS[type(a)])
+        elif a != b:
+            return False
+    return True
+
+
+def node_types(ast):
+    seen = set()
+    work = [ast]
+    while work:
+        value = work.pop()
+        if isinstance(value, (list, tuple)):
+            work.extend(value)
+        elif type(value) in serialize.NODE_FIELDS:
+            seen.add(type(value))
+            work.extend(getattr(value, name) for name in serialize.NODE_FIELDS[type(value)])
+    return seen
+
+
+def parse(source):
+    tokens = tokenizer.tokenize(source)
+    result = parser.Parser(tokens).parse()
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return tokens, result.node
+
+
+def check():
+    node_classes = {cls for name, cls in vars(parser).items() if name.endswith('Node') and isinstance(cls, type)}
+    missing = node_classes - set(serialize.NODE_FIELDS)
+    if missing:
+        raise SystemExit(f"No serialization schema for {sorted(cls.__name__ for cls in missing)}")
+    covered = set()
+    for name, source in read_testcases().items():
+        tokens, ast = parse(source)
+        restored_tokens, restored = serialize.load(serialize.dump((tokens, ast)))
+        if not same_tree(ast, restored) or restored_tokens != tokens:
+            raise SystemExit(f"MISMATCH: {name} does not round-trip")
+        covered |= node_types(ast)
+    print(f"Every testcase round-trips ({len(covered)} of {len(serialize.NODE_FIELDS)} node types covered)")
+
+
+def main():
+    check()
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = parseable_program(lines)
+    tokens, ast = parse(source)
+    data = serialize.dump(ast)
+    pickled = pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)
+    print(f"\n{lines} lines: {len(source) / 1024:.0f} KiB source, {len(data) / 1024:.0f} KiB binary AST, "
+          f"{len(pickled) / 1024:.0f} KiB pickle")
+
+    reparse, _ = best_of(lambda: parse(source), repeat=3)
+    report('tokenize + parse', reparse)
+    seconds, _ = best_of(lambda: pickle.loads(pickled), repeat=3)
+    report('pickle.loads', seconds)
+    seconds, restored = best_of(lambda: serialize.load(data))
+    report('serialize.load', seconds)
+    print(f"\nserialize.load is {reparse / seconds:.1f}x faster than re-parsing")
+    if not same_tree(ast, restored):
+        raise SystemExit("MISMATCH: large program does not round-trip")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# main.py --batch (src/utils/batch.py). Builds a corpus of [files] programs in a temporary
+# directory: copies of the testcases and of a counting loop, each with a .in file and the .out its
+# run gives in this process. Checks that the batch passes every file in every engine and reports a
+# changed .out as FAIL, then times the corpus run file by file in this process versus batches on
+# 1, 2, 4... worker processes up to one per CPU.
+#   python benchmarks/bench_batch.py [files]
+import os
+import shutil
+import sys
+import tempfile
+
+from bench_engines import STDIN_SETS
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.utils import batch
+
+
+def loop_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+
+    IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        total R SUM OF total AN i
+    IM OUTTA YR loop
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def build_corpus(directory, count):
+    """Write count programs (with .in and .out files) to directory; returns their paths"""
+    programs = list(read_testcases().items())
+    programs.append(('loop.lol', loop_program(20000)))
+    paths = []
+    for number in range(count):
+        name, source = programs[number % len(programs)]
+        path = os.path.join(directory, f"{number:05}_{name}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        with open(path[:-4] + batch.INPUT_SUFFIX, 'w', encoding='utf-8') as f:
+            f.write(STDIN_SETS[number % len(STDIN_SETS)])
+        output, _ = batch.execute(path, use_cache=False)
+        with open(path[:-4] + batch.GOLDEN_SUFFIX, 'w', encoding='utf-8') as f:
+            f.write(output)
+        paths.append(path)
+    return paths
+
+
+def check(directory):
+    paths = build_corpus(directory, 32)
+    for engine in Interpreter.ENGINES:
+        results = list(batch.run_batch(paths, 2, engine=engine))
+        if [result.path for result in results] != paths:
+            raise SystemExit(f"FAILED: the {engine} batch returned its results out of order")
+        failed = [result.path for result in results if result.status != batch.PASS]
+        if failed:
+            raise SystemExit(f"FAILED: {', '.join(failed)} in the {engine} engine")
+    with open(paths[0][:-4] + batch.GOLDEN_SUFFIX, 'a', encoding='utf-8') as f:
+        f.write("one more line\n")
+    result = next(batch.run_batch(paths[:1], 1))
+    if result.status != batch.FAIL or "+" not in result.diff():
+        raise SystemExit("FAILED: a changed .out file did not fail")
+    print(f"The batch passes {len(paths)} files in every engine and fails a changed .out")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    directory = tempfile.mkdtemp()
+    try:
+        checked, corpus = os.path.join(directory, 'check'), os.path.join(directory, 'corpus')
+        os.mkdir(checked)
+        os.mkdir(corpus)
+        check(checked)
+        paths = build_corpus(corpus, count)
+        cpus = os.cpu_count() or 1
+
+        print(f"\n{count:,} programs, {cpus} CPU(s)")
+        # (the first run of each also fills the parse cache)
+        seconds, _ = best_of(lambda: [batch.run_file(path, {}) for path in paths], repeat=2)
+        report('  one process, file by file', seconds, count, 'files')
+        sequential = seconds
+        jobs = 1
+        while True:
+            seconds, results = best_of(lambda: list(batch.run_batch(paths, jobs)), repeat=2)
+            if any(result.status != batch.PASS for result in results):
+                raise SystemExit(f"FAILED: the batch on {jobs} worker(s) did not pass every file")
+            report(f'  --batch --jobs {jobs}', seconds, count, 'files')
+            print(f"    {sequential / seconds:.2f}x file by file")
+            if jobs >= cpus:
+                break
+            jobs = min(jobs * 2, cpus)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Bulk UHS operations (CONFINE without AT, arr[a TIL b], SUM OF / PRODUKT OF with an array and
+# SUM OF / BIGGR OF / SMALLR OF UHS) versus the LOOP doing the same one element at a time.
+# Times each operation and its loop in every engine. (test/test_bulk.py checks the packed paths
+# against element-by-element evaluation, and the bulk statements against their loops.)
+#   python benchmarks/bench_bulk.py [size]
+import contextlib
+import io
+import random
+import sys
+
+from common import best_of, report
+
+from src.interpreter import values
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.values import Array, Number
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+OPERATIONS = [
+    ('Fill', """
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE 0.5 IN xs AT i
+    IM OUTTA YR fill""", """
+    CONFINE 0.5 IN xs"""),
+    ('Copy half', """
+    IM IN YR copy UPPIN YR i TIL BOTH SAEM i AN {half}
+        CONFINE xs[SUM OF i AN {half}] IN half AT i
+    IM OUTTA YR copy""", """
+    half R xs[{half} TIL {size}]"""),
+    ('PRODUKT OF UHS and NUMBAR', """
+    IM IN YR scale UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE PRODUKT OF xs[i] AN 1.5 IN ys AT i
+    IM OUTTA YR scale""", """
+    ys R PRODUKT OF xs AN 1.5"""),
+    ('SUM OF two UHS', """
+    IM IN YR add UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE SUM OF xs[i] AN ys[i] IN ys AT i
+    IM OUTTA YR add""", """
+    ys R SUM OF xs AN ys"""),
+    ('SUM OF UHS', """
+    total R xs[0]
+    i R 1
+    IM IN YR add UPPIN YR i TIL BOTH SAEM i AN {size}
+        total R SUM OF total AN xs[i]
+    IM OUTTA YR add""", """
+    total R SUM OF UHS xs"""),
+    ('BIGGR OF UHS', """
+    total R xs[0]
+    i R 1
+    IM IN YR biggest UPPIN YR i TIL BOTH SAEM i AN {size}
+        total R BIGGR OF total AN xs[i]
+    IM OUTTA YR biggest""", """
+    total R BIGGR OF UHS xs"""),
+]
+
+
+def program(body, size):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+{body.format(size=size, half=size // 2)}
+KTHXBYE
+"""
+
+
+def input_arrays(size):
+    rng = random.Random(size)
+    arrays = {}
+    for name, length in (('xs', size), ('ys', size), ('half', size // 2)):
+        arrays[name] = Array('NUMBAR', length)
+        for index in range(length):
+            arrays[name].set(index, Number(rng.uniform(-1000, 1000)))
+    return arrays
+
+
+def run(engine, ast, arrays):
+    """Run ast on copies of arrays and return its symbol table."""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    for name, array in arrays.items():
+        context.symbol_table.set(name, array.slice(0, array.size)[0])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = Interpreter(filename='<bench>', engine=engine).visit(ast, context)
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return context.symbol_table
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    arrays = input_arrays(size)
+    print(f"Bulk operations on the {'NumPy' if values.numpy is not None else 'array module'} path")
+    for label, loop_body, bulk_body in OPERATIONS:
+        loop = Parser(tokenizer.tokenize(program(loop_body, size))).parse().node
+        bulk = Parser(tokenizer.tokenize(program(bulk_body, size))).parse().node
+        print(f"\n{label}, {size:,} elements")
+        for engine in Interpreter.ENGINES:
+            loop_seconds, _ = best_of(lambda: run(engine, loop, arrays), repeat=3)
+            seconds, _ = best_of(lambda: run(engine, bulk, arrays), repeat=3)
+            report(f'  {engine} LOOP', loop_seconds, size, 'elements')
+            report(f'  {engine} bulk', seconds, size, 'elements')
+            print(f"  {engine}: bulk is {loop_seconds / seconds:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# HOW IZ I calls in the tree and closure engines: the original Function.execute (a new
+# Interpreter, Context and SymbolTable per call, parameters set by name) versus the current one
+# (one Interpreter per engine, parameters stored in precomputed slots, frames reused when
+# nothing keeps them). Functions cannot see their own name, so the recursive fibonacci passes
+# itself as an argument. Each program must give the same output and symbol table both ways,
+# argument-count errors included.
+#   python benchmarks/bench_calls.py [n]
+import contextlib
+import sys
+
+from bench_engines import call_program, run
+from common import best_of, report
+
+from src.interpreter.runtime import Context, RTResult, SymbolTable
+from src.interpreter.values import Break, Function, Noob, Return
+from src.lexer import tokenizer
+from src.parser.parser import Parser, RuntimeError
+
+ENGINES = ('tree', 'closure')
+
+
+def legacy_execute(self, passed_parameters):
+    from src.interpreter.interpreter import Interpreter
+
+    res = RTResult()
+    interpreter = Interpreter(engine=self.engine)
+    new_context = Context(self.function_name, parent=self.context)
+    new_context.symbol_table = SymbolTable(new_context.parent.symbol_table, self.scope)
+
+    if len(passed_parameters) > len(self.parameters):
+        return res.failure(RuntimeError(
+            ("Function Call", "Function", None),
+            f"Too many arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {len(passed_parameters)}.\nExtra arguments: {len(passed_parameters) - len(self.parameters)}"
+        ))
+    if len(passed_parameters) < len(self.parameters):
+        return res.failure(RuntimeError(
+            ("Function Call", "Function", None),
+            f"Not enough arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {len(passed_parameters)}.\nMissing arguments: {len(self.parameters) - len(passed_parameters)}"
+        ))
+
+    for param_name, param_value in zip(self.parameters, passed_parameters):
+        param_value.set_context(new_context)
+        new_context.symbol_table.set(param_name, param_value)
+
+    return_value = Noob()
+    for statement in self.body_statements:
+        value = res.register(interpreter.visit(statement, new_context))
+        if res.error: return res
+        if isinstance(value, Return):
+            return res.success(value.value)
+        if isinstance(value, Break):
+            return res.success(Noob())
+        if value is not None:
+            return_value = value
+            new_context.symbol_table.set('IT', value)
+    return res.success(return_value)
+
+
+@contextlib.contextmanager
+def legacy_calls():
+    saved = Function.execute
+    Function.execute = legacy_execute
+    try:
+        yield
+    finally:
+        Function.execute = saved
+
+
+def fib_program(n):
+    return f"""HAI
+    HOW IZ I fib YR n AN YR self
+        BOTH SAEM n AN BIGGR OF n AN 2
+        O RLY?
+            YA RLY
+                I HAS A a ITZ I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+                I HAS A b ITZ I IZ self YR DIFF OF n AN 2 AN YR self MKAY
+                FOUND YR SUM OF a AN b
+        OIC
+        FOUND YR n
+    IF U SAY SO
+
+    VISIBLE I IZ fib YR {n} AN YR fib MKAY
+KTHXBYE
+"""
+
+
+def error_program(arguments):
+    return f"""HAI
+    HOW IZ I pair YR a AN YR b
+        FOUND YR SUM OF a AN b
+    IF U SAY SO
+
+    VISIBLE I IZ pair YR 1 AN YR 2 MKAY
+    VISIBLE I IZ pair {arguments} MKAY
+KTHXBYE
+"""
+
+
+def calls(n):
+    """Calls made by fib_program(n)"""
+    a, b = 1, 1
+    for _ in range(n):
+        a, b = b, a + b + 1
+    return a
+
+
+def compare(label, source, count, repeat=3):
+    ast = Parser(tokenizer.tokenize(source)).parse().node
+    print(f"\n{label}")
+    for engine in ENGINES:
+        with legacy_calls():
+            legacy_seconds, expected = best_of(lambda: run(engine, ast), repeat=repeat)
+        seconds, output = best_of(lambda: run(engine, ast), repeat=repeat)
+        if output != expected:
+            raise SystemExit(f"MISMATCH: {label} in the {engine} engine: {output!r} != {expected!r}")
+        if count:
+            report(f'  {engine} per-call setup', legacy_seconds, count, 'calls')
+            report(f'  {engine} call frames', seconds, count, 'calls')
+            print(f"  {engine}: {legacy_seconds / seconds:.2f}x faster")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 18
+    for arguments in ('YR 1', 'YR 1 AN YR 2 AN YR 3'):
+        compare(f"Argument count error: pair {arguments}", error_program(arguments), None, repeat=1)
+    print("\nArgument count errors are unchanged")
+    compare(f"Recursive fibonacci of {n}", fib_program(n), calls(n))
+    compare(f"{20 * n:,} calls in a loop", call_program(20 * n), 20 * n)
+
+
+if __name__ == '__main__':
+    main()
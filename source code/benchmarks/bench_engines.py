@@ -0,0 +1,123 @@
+# Execution engines: checks that every Interpreter engine ('closure', 'vm') matches the
+# tree-walker on every testcase (output, errors and final symbol table), then compares their
+# throughput on counting loops, a loop of function calls and an array loop.
+#   python benchmarks/bench_engines.py [iterations]
+import contextlib
+import io
+import sys
+
+from bench_visit import loop_program
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+# Different answers to GIMMEH take different branches in the testcases
+STDIN_SETS = [
+    '5\n3\n7\n2\nhello\nworld\n4\n1\n0\n9\n8\n6\n',
+    '0\n0\n0\n0\n0\n0\n0\n0\n0\n0\n0\n0\n',
+    '12\nabc\n-3\n2.5\nWIN\n\n100\n7\n7\n7\n7\n7\n',
+]
+
+
+def call_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+
+    HOW IZ I scale YR x AN YR y
+        I HAS A doubled ITZ PRODUKT OF x AN 2
+        FOUND YR SUM OF doubled AN MOD OF y AN 7
+    IF U SAY SO
+
+    IM IN YR calls UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        I IZ scale YR i AN YR total MKAY
+        total R IT
+    IM OUTTA YR calls
+
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def array_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+        I HAS A values ITZ A NUMBR UHS OF 64
+    BUHBYE
+
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        CONFINE PRODUKT OF i AN 3 IN values AT MOD OF i AN 64
+        total R SUM OF total AN values[MOD OF i AN 64]
+    IM OUTTA YR fill
+
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def run(engine, ast, stdin=''):
+    """Run ast and return (output, error, symbol table) as strings."""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = io.StringIO()
+    saved_stdin, sys.stdin = sys.stdin, io.StringIO(stdin)
+    try:
+        with contextlib.redirect_stdout(output):
+            result = Interpreter(filename='<bench>', engine=engine).visit(ast, context)
+    except Exception as e:
+        result = None
+        output.write(f"\n{type(e).__name__}: {e}")
+    finally:
+        sys.stdin = saved_stdin
+    error = result.error.as_string() if result is not None and result.error else None
+    symbols = {name: f"{value} ({type(value).__name__})" for name, value in context.symbol_table.symbols.items()}
+    return output.getvalue(), error, symbols
+
+
+def check():
+    compared = 0
+    for name, source in read_testcases().items():
+        result = Parser(tokenizer.tokenize(source, filename=name), filename=name).parse()
+        if result.error:
+            continue
+        for stdin in STDIN_SETS:
+            expected = run('tree', result.node, stdin)
+            for engine in Interpreter.ENGINES[1:]:
+                if run(engine, result.node, stdin) != expected:
+                    raise SystemExit(f"MISMATCH: {name} differs between tree and {engine} with stdin {stdin!r}")
+                compared += 1
+    print(f"Every engine agrees with the tree-walker on {compared} testcase runs")
+
+
+def compare(label, source, count, unit):
+    result = Parser(tokenizer.tokenize(source)).parse()
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    print(f"\n{label}")
+    tree_seconds, expected = best_of(lambda: run('tree', result.node), repeat=3)
+    report('  tree', tree_seconds, count, unit)
+    for engine in Interpreter.ENGINES[1:]:
+        seconds, output = best_of(lambda: run(engine, result.node), repeat=3)
+        if output != expected:
+            raise SystemExit(f"MISMATCH: {label}: {engine} gives {output!r}, tree {expected!r}")
+        report(f'  {engine}', seconds, count, unit)
+        print(f"  {engine} engine is {tree_seconds / seconds:.1f}x faster than tree")
+
+
+def main():
+    check()
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    compare(f"Two counting loops of {iterations:,} iterations", loop_program(iterations), 2 * iterations, 'iterations')
+    compare(f"{iterations:,} function calls in a loop", call_program(iterations), iterations, 'calls')
+    compare(f"Array loop of {iterations:,} iterations", array_program(iterations), iterations, 'iterations')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+# Incremental re-lexing: times single-character edits against re-tokenizing the whole buffer, on
+# 5,000 and 20,000 lines. A keystroke still copies and splices the token list, so it grows with the
+# buffer too. (test/test_incremental.py checks retokenize() against a full tokenize().)
+#   python benchmarks/bench_incremental.py
+from common import best_of, generated_program, report
+
+from src.lexer import tokenizer
+from src.lexer.incremental import retokenize
+
+def main():
+    for lines in (5000, 20000):
+        code = generated_program(lines)
+        tokens = tokenizer.tokenize(code)
+        offset = len(code) // 2
+        print(f"{lines} lines, {len(tokens):,} tokens")
+
+        full, _ = best_of(lambda: tokenizer.tokenize(code), repeat=3)
+        report('  full tokenize per keystroke', full)
+
+        def keystroke():
+            # Type a character and delete it again, leaving the buffer unchanged
+            edited, edited_tokens = retokenize(code, list(tokens), offset, 0, 'x')
+            retokenize(edited, edited_tokens, offset, 1, '')
+        seconds, _ = best_of(keystroke, repeat=20)
+        report('  retokenize per keystroke', seconds / 2)
+        # (the times depend on the machine; the ratio much less)
+        print(f"  {full / (seconds / 2):.0f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# GIMMEH input sources (src/interpreter/streams.py). First checks that every testcase reads the
+# same from a LineInput, a BulkInput and a FileInput as from stdin in every engine, and that
+# interpreters in several threads each read their own source. Then times [lines] GIMMEHs from a
+# file: input() on it as sys.stdin (what GIMMEH did before sources) versus a BulkInput and a
+# FileInput, counting the reads each makes of the file.
+#   python benchmarks/bench_input.py [lines]
+import io
+import os
+import sys
+import tempfile
+import threading
+
+from bench_engines import STDIN_SETS, run
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.streams import BulkInput, FileInput, LineInput, MemoryOutput, StandardInput
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+THREADS = 8
+
+
+class CountingFile(io.FileIO):
+    """A file that counts the reads made of it"""
+    reads = 0
+
+    def readinto(self, buffer):
+        self.reads += 1
+        return super().readinto(buffer)
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+    def readall(self):
+        self.reads += 1
+        return super().readall()
+
+
+def input_program(lines):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A line
+    BUHBYE
+
+    IM IN YR lines UPPIN YR i TIL BOTH SAEM i AN {lines}
+        GIMMEH line
+    IM OUTTA YR lines
+    VISIBLE line
+KTHXBYE
+"""
+
+
+def parse(source, name='<bench>'):
+    return Parser(tokenizer.tokenize(source, filename=name), filename=name).parse()
+
+
+def run_from(engine, ast, source):
+    """Run ast with its GIMMEHs reading source; returns (output, error)"""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = MemoryOutput()
+    try:
+        result = Interpreter(filename='<bench>', engine=engine, output=output, input=source).visit(ast, context)
+        error = result.error.as_string() if result.error else None
+    except Exception as e:
+        output.write(f"\n{type(e).__name__}: {e}")
+        error = None
+    return output.getvalue(), error
+
+
+def check():
+    compared = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stdin.txt')
+        for name, source in read_testcases().items():
+            result = parse(source, name)
+            if result.error:
+                continue
+            for stdin in STDIN_SETS:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(stdin)
+                for engine in Interpreter.ENGINES:
+                    expected, error, _ = run(engine, result.node, stdin)
+                    sources = [LineInput(stdin.splitlines()), BulkInput(io.BytesIO(stdin.encode())), FileInput(path)]
+                    for source in sources:
+                        if run_from(engine, result.node, source) != (expected, error):
+                            raise SystemExit(f"MISMATCH: {name} in the {engine} engine reading a {type(source).__name__}")
+                    compared += 1
+    print(f"Input sources and stdin agree on {compared} testcase runs")
+
+    ast = parse(input_program(1000)).node
+    results = {}
+    def worker(number, engine):
+        results[number] = run_from(engine, ast, LineInput([number] * 1000))
+    threads = [threading.Thread(target=worker, args=(number, Interpreter.ENGINES[number % 3])) for number in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for number in range(THREADS):
+        if results[number] != (f"{number}\n", None):
+            raise SystemExit(f"FAILED: thread {number} read {results[number]!r}")
+    print(f"{THREADS} interpreters in threads each read their own source")
+
+
+def main():
+    check()
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    ast = parse(input_program(lines)).node
+    expected = f"{lines}\n"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stdin.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{number}\n" for number in range(1, lines + 1)))
+
+        def from_stdin(engine):
+            saved, sys.stdin = sys.stdin, io.TextIOWrapper(io.BufferedReader(CountingFile(path)), encoding='utf-8')
+            try:
+                return run_from(engine, ast, StandardInput()), sys.stdin.buffer.raw.reads
+            finally:
+                sys.stdin.close()
+                sys.stdin = saved
+
+        def from_bulk(engine):
+            with CountingFile(path) as f:
+                return run_from(engine, ast, BulkInput(f)), f.reads
+
+        def from_file(engine):
+            return run_from(engine, ast, FileInput(path)), 1
+
+        print(f"\n{lines:,} GIMMEHs from a file")
+        for engine in Interpreter.ENGINES:
+            timings = []
+            for label, make in (("input() per GIMMEH", from_stdin), ("BulkInput", from_bulk), ("FileInput", from_file)):
+                seconds, ((output, error), reads) = best_of(lambda: make(engine), repeat=3)
+                if error or output != expected:
+                    raise SystemExit(f"FAILED: {label} in the {engine} engine gave {output!r} {error}")
+                report(f'  {engine} {label}', seconds, lines, 'lines')
+                print(f"    {reads:,} reads of the file")
+                timings.append(seconds)
+            print(f"  {engine}: BulkInput {timings[0] / timings[1]:.2f}x, FileInput {timings[0] / timings[2]:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
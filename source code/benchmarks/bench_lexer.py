@@ -0,0 +1,85 @@
+# Lexer throughput: the original per-pattern tokenizer loop versus tokenizer.tokenize.
+#   python benchmarks/bench_lexer.py [lines]
+import re
+import sys
+
+from common import best_of, generated_program, report
+
+from src.lexer import tokenizer
+from src.lexer.tokenizer import TOKEN_SPEC, TokenType, LexerError
+
+
+def legacy_tokenize(code, filename='<stdin>'):
+    """The pre-master-regex engine: tries (and compiles) every TOKEN_SPEC entry at every position."""
+    tokens = []
+    line, col, pos = 1, 1, 0
+    in_string = False
+    escapes = {')': '\n', '>': '\t', 'o': '\a', '"': '"', ':': ':'}
+    while pos < len(code):
+        if in_string and code[pos] != '"':
+            string_col = col
+            string_value = []
+            while pos < len(code) and code[pos] != '"':
+                if code[pos] == ':' and pos + 1 < len(code) and code[pos + 1] in escapes:
+                    string_value.append(escapes[code[pos + 1]])
+                    pos += 2
+                    col += 2
+                    continue
+                if code[pos] == '\n':
+                    break
+                string_value.append(code[pos])
+                pos += 1
+                col += 1
+            if string_value:
+                tokens.append({'type': TokenType.STRING, 'value': ''.join(string_value), 'line': line,
+                               'col': string_col, 'category': tokenizer.CATEGORY_MAP[TokenType.STRING]})
+            continue
+        for token_type, pattern, *flags in TOKEN_SPEC:
+            match = re.compile(pattern, flags[0] if flags else 0).match(code, pos)
+            if match:
+                break
+        else:
+            raise LexerError(f"Unexpected character '{code[pos]}'", line, col, filename)
+        value = match.group()
+        if token_type is not None and token_type != TokenType.COMMENT:
+            if token_type == TokenType.QUOTE:
+                in_string = not in_string
+            tokens.append({'type': token_type, 'value': value, 'line': line, 'col': col,
+                           'category': tokenizer.CATEGORY_MAP.get(token_type, token_type)})
+        newline_count = value.count('\n')
+        if newline_count == 0:
+            col += len(value)
+        else:
+            line += newline_count
+            col = len(value) - value.rfind('\n')
+        pos = match.end()
+    filtered = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i]['type'] == TokenType.ELLIPSIS:
+            i += 2 if i + 1 < len(tokens) and tokens[i + 1]['type'] == TokenType.NEWLINE else 1
+        else:
+            filtered.append(tokens[i])
+            i += 1
+    return filtered
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = generated_program(lines)
+    print(f"Lexing a generated program of {len(source.splitlines())} lines ({len(source):,} chars)\n")
+
+    legacy_time, legacy_tokens = best_of(lambda: legacy_tokenize(source), repeat=1)
+    new_time, new_tokens = best_of(lambda: tokenizer.tokenize(source), repeat=3)
+
+    if [dict(t) for t in legacy_tokens] != [dict(t) for t in new_tokens]:
+        print("MISMATCH: token streams differ")
+        sys.exit(1)
+
+    report("legacy per-pattern loop", legacy_time, len(legacy_tokens), 'tokens')
+    report("tokenizer.tokenize", new_time, len(new_tokens), 'tokens')
+    print(f"\nspeedup: {legacy_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Counted UPPIN/NERFIN loops in the tree-walker: the generic visit_LoopNode path (condition
+# visited, typecast and the counter re-boxed every iteration) versus run_counted_loop (bound
+# evaluated once, counter kept as a plain number). Each program is run both ways and must give
+# the same output and symbol table.
+#   python benchmarks/bench_loops.py [iterations]
+import sys
+
+from bench_engines import run
+from common import best_of, report
+
+from src.interpreter.interpreter import subnodes
+from src.lexer import tokenizer
+from src.parser.parser import LoopNode, Parser
+
+PROGRAMS = [
+    ("Counter not read by the body", """
+    IM IN YR count UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        total R SUM OF total AN 3
+    IM OUTTA YR count"""),
+    ("Counter read by the body", """
+    IM IN YR count UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        total R SUM OF total AN i
+    IM OUTTA YR count"""),
+    ("NERFIN WILE DIFFRINT, bound in a variable", """
+    limit R PRODUKT OF {iterations} AN -1
+    IM IN YR count NERFIN YR i WILE DIFFRINT i AN limit
+        total R SUM OF total AN 1
+    IM OUTTA YR count"""),
+    ("Nested loops", """
+    IM IN YR outer UPPIN YR i TIL BOTH SAEM i AN {outer}
+        j R 0
+        IM IN YR inner UPPIN YR j TIL BOTH SAEM j AN 100
+            total R SUM OF total AN j
+        IM OUTTA YR inner
+    IM OUTTA YR outer"""),
+]
+
+
+def program(body, iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A j ITZ 0
+        I HAS A limit ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+{body.format(iterations=iterations, outer=iterations // 100)}
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def parse(source, fast_path):
+    ast = Parser(tokenizer.tokenize(source)).parse().node
+    if not fast_path:
+        # counted_loop's answer is cached on the node; None sends every loop down the generic path
+        for node in subnodes(ast):
+            if isinstance(node, LoopNode):
+                node.counted = None
+    return ast
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for label, body in PROGRAMS:
+        source = program(body, iterations)
+        generic, fast = parse(source, False), parse(source, True)
+        generic_seconds, expected = best_of(lambda: run('tree', generic), repeat=3)
+        seconds, output = best_of(lambda: run('tree', fast), repeat=3)
+        if output != expected:
+            raise SystemExit(f"MISMATCH: {label}: {output!r} != {expected!r}")
+        print(f"\n{label}, {iterations:,} iterations")
+        report('  generic loop', generic_seconds, iterations, 'iterations')
+        report('  counted loop', seconds, iterations, 'iterations')
+        print(f"  {generic_seconds / seconds:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# NUMBR / NUMBAR checks: Number.is_integer and Number.is_float as regular expressions over
+# str(value) (the original) versus checking the type of the value. Both are run on a program
+# that fills and sums arrays (array index and element type checks) and on one that SMOOSHes
+# numbers into YARNs (NUMBR/NUMBAR to YARN casts).
+#   python benchmarks/bench_numbers.py [iterations]
+import contextlib
+import io
+import re
+import sys
+
+from common import best_of, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.values import Number
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+def legacy_is_integer(value_to_check):
+    return bool(re.match(r'^-?\d+$', str(value_to_check)))
+
+
+def legacy_is_float(value_to_check):
+    return bool(re.match(r'^-?\d*\.\d*$', str(value_to_check)))
+
+
+@contextlib.contextmanager
+def regex_checks():
+    saved = Number.is_integer, Number.is_float
+    Number.is_integer, Number.is_float = legacy_is_integer, legacy_is_float
+    try:
+        yield
+    finally:
+        Number.is_integer, Number.is_float = saved
+
+
+def array_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+        I HAS A counts ITZ A NUMBR UHS OF 100
+        I HAS A ratios ITZ A NUMBAR UHS OF 100
+    BUHBYE
+
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        CONFINE MOD OF i AN 17 IN counts AT MOD OF i AN 100
+        CONFINE QUOSHUNT OF i AN 4.0 IN ratios AT MOD OF i AN 100
+        total R SUM OF total AN SUM OF counts[MOD OF i AN 100] AN ratios[MOD OF i AN 100]
+    IM OUTTA YR fill
+
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def smoosh_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A line ITZ ""
+        I HAS A half ITZ 0.5
+    BUHBYE
+
+    IM IN YR build UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        line R SMOOSH i AN ": " AN PRODUKT OF i AN half AN " / " AN i AN " = " AN 1.0
+    IM OUTTA YR build
+
+    VISIBLE line
+KTHXBYE
+"""
+
+
+def run(ast):
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = Interpreter().visit(ast, context)
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return output.getvalue()
+
+
+def compare(label, source, count):
+    ast = Parser(tokenizer.tokenize(source)).parse().node
+    with regex_checks():
+        regex_seconds, expected = best_of(lambda: run(ast), repeat=3)
+    seconds, output = best_of(lambda: run(ast), repeat=3)
+    if output != expected:
+        raise SystemExit(f"MISMATCH: {label}: {output!r} != {expected!r}")
+    print(f"\n{label}")
+    report('  regex checks', regex_seconds, count, 'iterations')
+    report('  type checks', seconds, count, 'iterations')
+    print(f"  {regex_seconds / seconds:.2f}x faster")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    compare(f"Array fill and sum, {iterations:,} iterations", array_program(iterations), iterations)
+    compare(f"SMOOSH of NUMBRs and NUMBARs, {iterations:,} iterations", smoosh_program(iterations), iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# The -O pass (src/interpreter/optimizer.py): constant folding and dead O RLY? branches.
+# First checks that every testcase gives the same output, errors and symbol table with and
+# without it in every engine, then times a loop full of constant expressions and O RLY?s.
+#   python benchmarks/bench_optimizer.py [iterations]
+import sys
+
+from bench_engines import STDIN_SETS, run
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.optimizer import optimize
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+def parse(source, name='<bench>'):
+    result = Parser(tokenizer.tokenize(source, filename=name), filename=name).parse()
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return result.node
+
+
+def check():
+    compared = 0
+    for name, source in read_testcases().items():
+        if Parser(tokenizer.tokenize(source, filename=name), filename=name).parse().error:
+            continue
+        # The pass rewrites the tree in place, so each side gets its own parse
+        plain, optimized = parse(source, name), optimize(parse(source, name))
+        for stdin in STDIN_SETS:
+            for engine in Interpreter.ENGINES:
+                if run(engine, optimized, stdin) != run(engine, plain, stdin):
+                    raise SystemExit(f"MISMATCH: {name} differs with -O in the {engine} engine with stdin {stdin!r}")
+                compared += 1
+    print(f"Optimized and unoptimized testcases agree on {compared} runs")
+
+
+def constant_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+        I HAS A ratio ITZ 0.0
+        I HAS A label ITZ ""
+    BUHBYE
+
+    IM IN YR work UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        total R SUM OF total AN PRODUKT OF SUM OF 60 AN 4 AN DIFF OF 10 AN 7
+        ratio R MAEK QUOSHUNT OF 22 AN 7 A NUMBAR
+        label R SMOOSH "ratio " AN ratio AN " of " AN BIGGR OF 3 AN 4
+        BOTH OF WIN AN NOT FAIL
+        O RLY?
+            YA RLY
+                total R SUM OF total AN 1
+            NO WAI
+                total R DIFF OF total AN 1
+        OIC
+        BOTH SAEM SUM OF 2 AN 2 AN 5
+        O RLY?
+            YA RLY
+                total R 0
+            MEBBE ALL OF WIN AN 1 MKAY
+                total R SUM OF total AN MOD OF 17 AN 5
+        OIC
+    IM OUTTA YR work
+
+    VISIBLE total + " " + ratio + " " + label
+KTHXBYE
+"""
+
+
+def main():
+    check()
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = constant_program(iterations)
+    plain, optimized = parse(source), optimize(parse(source))
+    print(f"\nConstant expressions and O RLY?s, {iterations:,} iterations")
+    for engine in Interpreter.ENGINES:
+        plain_seconds, expected = best_of(lambda: run(engine, plain), repeat=3)
+        seconds, output = best_of(lambda: run(engine, optimized), repeat=3)
+        if output != expected:
+            raise SystemExit(f"MISMATCH in the {engine} engine: {output!r} != {expected!r}")
+        report(f'  {engine}', plain_seconds, iterations, 'iterations')
+        report(f'  {engine} -O', seconds, iterations, 'iterations')
+        print(f"  {engine}: -O is {plain_seconds / seconds:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# VISIBLE output sinks (src/interpreter/streams.py). First checks that every testcase writes the
+# same text to a MemoryOutput as to stdout in every engine, then prints [lines] lines to a
+# line-buffered stream (as on a terminal): the old print() per VISIBLE versus a BufferedOutput.
+# Last, the GUI's side: one console signal per VISIBLE (the old builtins.print swap) versus a
+# BatchedOutput, counting the signals.
+#   python benchmarks/bench_output.py [lines]
+import contextlib
+import io
+import os
+import sys
+
+from bench_engines import STDIN_SETS, run
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.streams import BatchedOutput, BufferedOutput, MemoryOutput, OutputSink
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+class PrintOutput(OutputSink):
+    """What VISIBLE did before sinks: one print() each"""
+    def write(self, text):
+        print(text, end='')
+
+
+class SignalOutput(OutputSink):
+    """The old GUI console: one signal per VISIBLE"""
+    def __init__(self, emit):
+        self.emit = emit
+
+    def write(self, text):
+        self.emit(text)
+
+
+def output_program(lines):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+    BUHBYE
+
+    IM IN YR lines UPPIN YR i TIL BOTH SAEM i AN {lines}
+        VISIBLE "line " + i
+    IM OUTTA YR lines
+KTHXBYE
+"""
+
+
+def parse(source, name='<bench>'):
+    return Parser(tokenizer.tokenize(source, filename=name), filename=name).parse()
+
+
+def run_into(engine, ast, output, stdin=''):
+    """Run ast with its VISIBLE output going to output; returns the RTResult"""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    saved_stdin, sys.stdin = sys.stdin, io.StringIO(stdin)
+    try:
+        return Interpreter(filename='<bench>', engine=engine, output=output).visit(ast, context)
+    finally:
+        sys.stdin = saved_stdin
+
+
+def check():
+    compared = 0
+    for name, source in read_testcases().items():
+        result = parse(source, name)
+        if result.error:
+            continue
+        for stdin in STDIN_SETS:
+            for engine in Interpreter.ENGINES:
+                expected, _, _ = run(engine, result.node, stdin)
+                output = MemoryOutput()
+                try:
+                    run_into(engine, result.node, output, stdin)
+                except Exception as e:
+                    output.write(f"\n{type(e).__name__}: {e}")
+                if output.getvalue() != expected:
+                    raise SystemExit(f"MISMATCH: {name} in the {engine} engine with stdin {stdin!r}")
+                compared += 1
+    print(f"MemoryOutput and stdout agree on {compared} testcase runs")
+
+
+def console(ast, make):
+    """Run ast in the vm engine with its output going to make(emit); returns the emitted signals"""
+    signals = []
+    run_into('vm', ast, make(signals.append))
+    return signals
+
+
+@contextlib.contextmanager
+def terminal_stdout():
+    """sys.stdout replaced by a line-buffered stream that discards what it is given"""
+    saved = sys.stdout
+    sys.stdout = open(os.devnull, 'w', buffering=1)
+    try:
+        yield sys.stdout
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved
+
+
+def main():
+    check()
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    ast = parse(output_program(lines)).node
+
+    print(f"\n{lines:,} lines to a line-buffered stream")
+    for engine in Interpreter.ENGINES:
+        with terminal_stdout():
+            print_seconds, _ = best_of(lambda: run_into(engine, ast, PrintOutput()), repeat=3)
+        with terminal_stdout() as stream:
+            seconds, _ = best_of(lambda: run_into(engine, ast, BufferedOutput(stream)), repeat=3)
+        report(f'  {engine} print() per VISIBLE', print_seconds, lines, 'lines')
+        report(f'  {engine} BufferedOutput', seconds, lines, 'lines')
+        print(f"  {engine}: {print_seconds / seconds:.2f}x faster")
+
+    print(f"\n{lines:,} lines to the GUI console (vm engine; signals only counted)")
+    for label, make in (("signal per VISIBLE", SignalOutput), ("BatchedOutput", BatchedOutput)):
+        seconds, signals = best_of(lambda: console(ast, make), repeat=3)
+        if len(''.join(signals).splitlines()) != lines:
+            raise SystemExit(f"FAILED: {label} lost output")
+        report(f'  {label}', seconds, lines, 'lines')
+        print(f"  {label}: {len(signals):,} signals")
+
+
+if __name__ == '__main__':
+    main()
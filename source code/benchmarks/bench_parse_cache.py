@@ -0,0 +1,39 @@
+# Parse cache: tokenize() + Parser.parse() versus loading the cached tokens and AST.
+#   python benchmarks/bench_parse_cache.py [lines]
+import os
+import sys
+import tempfile
+
+from common import best_of, parseable_program, report
+
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+from src.utils import parse_cache
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = parseable_program(lines)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'program.lol')
+
+        def full_parse():
+            tokens = tokenizer.tokenize(source, filename=path)
+            return tokens, Parser(tokens, filename=path).parse().node
+
+        tokens, ast = full_parse()
+        parse_cache.store(path, source, tokens, ast)
+        entry = parse_cache.cache_path(path, source)
+        print(f"{lines} lines, {len(tokens):,} tokens, cache entry {os.path.getsize(entry) / 1024:.0f} KiB")
+
+        seconds, _ = best_of(full_parse, repeat=3)
+        report('tokenize + parse', seconds)
+        seconds, cached = best_of(lambda: parse_cache.load(path, source), repeat=3)
+        report('cache hit', seconds)
+        if cached is None or repr(cached[1]) != repr(ast):
+            print("MISMATCH: cached AST differs")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# main.py without dumps (src/parser/tree_dump.py for --ast). First checks that the streamed parse
+# tree is exactly repr(AST) for every testcase, then compares the two on a [lines]-line program:
+# time and peak memory of print(AST) versus dump_tree. Last, runs main.py on that program as
+# every run used to (--tokens --ast --symbols) versus with no dumps, the parse cache warm.
+#   python benchmarks/bench_quiet.py [lines]
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from common import ROOT, best_of, parseable_program, read_testcases, report
+
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+from src.parser.tree_dump import dump_tree, iter_repr
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source)).parse().node
+
+
+def check():
+    for name, source in read_testcases().items():
+        result = Parser(tokenizer.tokenize(source)).parse()
+        if result.error:
+            continue
+        if ''.join(iter_repr(result.node)) != repr(result.node):
+            raise SystemExit(f"MISMATCH: the streamed parse tree of {name}")
+    print("dump_tree writes repr(AST) for every testcase")
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    check()
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = parseable_program(lines)
+    ast = parse(source)
+
+    print(f"\nParse tree of a {lines:,}-line program")
+    with open(os.devnull, 'w') as devnull:
+        whole = lambda: print(ast, file=devnull)
+        streamed = lambda: dump_tree(ast, devnull)
+        for label, fn in (("print(AST)", whole), ("dump_tree", streamed)):
+            seconds, _ = best_of(fn, repeat=3)
+            report(f'  {label}', seconds)
+            print(f"    peak {peak_memory(fn) / 1024:,.0f} KiB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.lol')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        stdin = '5\n' * 10000
+        def run(*flags):
+            subprocess.run([sys.executable, 'main.py', *flags, path], cwd=ROOT, input=stdin, text=True,
+                           stdout=subprocess.DEVNULL, check=True)
+        run()
+        print(f"\nmain.py on the {lines:,}-line program")
+        dumped, _ = best_of(lambda: run('--tokens', '--ast', '--symbols'), repeat=3)
+        quiet, _ = best_of(run, repeat=3)
+        report('  --tokens --ast --symbols', dumped)
+        report('  no dumps', quiet)
+        print(f"  {dumped / quiet:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
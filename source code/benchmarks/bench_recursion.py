@@ -0,0 +1,59 @@
+# Deep HOW IZ I recursion in the vm engine, which keeps the calls in progress on a stack of its
+# own instead of recursing in Python: times [depth] calls deep with Python's recursion limit
+# lowered to a couple of hundred frames. (test/test_vm.py checks the results and --max-depth.)
+#   python benchmarks/bench_recursion.py [depth]
+import sys
+
+from bench_engines import run
+from common import best_of, report
+
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+# Python frames allowed while running the deep recursion; a recursive evaluator needs several
+# per LOLCODE call
+HOST_FRAMES = 200
+
+
+def depth_program(depth):
+    """Recurses depth calls deep (functions cannot see their own name, so it is passed along)"""
+    return f"""HAI
+    HOW IZ I depth YR n AN YR self
+        BOTH SAEM n AN 1
+        O RLY?
+            YA RLY
+                FOUND YR 1
+        OIC
+        I HAS A below ITZ I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+        FOUND YR SUM OF below AN 1
+    IF U SAY SO
+
+    VISIBLE I IZ depth YR {depth} AN YR depth MKAY
+KTHXBYE
+"""
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source)).parse().node
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ast = parse(depth_program(depth))
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(HOST_FRAMES)
+    try:
+        seconds, _ = best_of(lambda: run('vm', ast), repeat=1)
+    finally:
+        sys.setrecursionlimit(limit)
+    print(f"{depth:,} calls deep with Python's recursion limit at {HOST_FRAMES}")
+    report('  vm', seconds, depth, 'calls')
+
+    # Python's own limit stops the tree-walker long before
+    output, _, _ = run('tree', parse(depth_program(2000)))
+    print(f"  tree at 2,000 calls deep: {output.strip().splitlines()[-1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Variable lookups in the tree-walker: by name through SymbolTable (found, then get walking the
+# parent chain) versus the (depth, slot) addresses of the resolver pass: times a variable-heavy
+# loop and a function that reads a global array through the enclosing scope.
+# (test/test_resolver.py checks that both find the same values.)
+#   python benchmarks/bench_resolver.py [iterations]
+import contextlib
+import io
+import sys
+
+from common import best_of, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, RTResult, SymbolTable
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+class NameLookupInterpreter(Interpreter):
+    """Runs programs without resolving them, so every lookup goes by name."""
+    def visit_ProgramNode(self, node, context):
+        res = RTResult()
+        for section in node.sections:
+            res.register(self.visit(section, context))
+            if res.error: return res
+        return res.success(None)
+
+
+def lookup_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A a ITZ 1
+        I HAS A b ITZ 2
+        I HAS A c ITZ 3
+        I HAS A total ITZ 0
+        I HAS A weights ITZ A NUMBR UHS OF 8
+    BUHBYE
+
+    HOW IZ I weigh YR n
+        I HAS A j ITZ 0
+        I HAS A sum ITZ n
+        IM IN YR scan UPPIN YR j TIL BOTH SAEM j AN 8
+            sum R SUM OF sum AN weights[j]
+        IM OUTTA YR scan
+        FOUND YR sum
+    IF U SAY SO
+
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN 8
+        CONFINE i IN weights AT i
+    IM OUTTA YR fill
+
+    i R 0
+    IM IN YR main UPPIN YR i TIL BOTH SAEM i AN {iterations}
+        a R SUM OF b AN c
+        b R DIFF OF a AN c
+        c R MOD OF SUM OF a AN i AN 7
+        total R SUM OF total AN PRODUKT OF a AN b
+    IM OUTTA YR main
+
+    i R 0
+    IM IN YR calls UPPIN YR i TIL BOTH SAEM i AN {iterations // 10}
+        I IZ weigh YR i MKAY
+        total R SUM OF total AN IT
+    IM OUTTA YR calls
+
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def run(interpreter_class, ast):
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = interpreter_class().visit(ast, context)
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return output.getvalue()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = lookup_program(iterations)
+    # Separate trees, so the name-lookup run cannot use annotations left by the other
+    unresolved = Parser(tokenizer.tokenize(source)).parse().node
+    resolved = Parser(tokenizer.tokenize(source)).parse().node
+
+    name_seconds, _ = best_of(lambda: run(NameLookupInterpreter, unresolved), repeat=3)
+    seconds, _ = best_of(lambda: run(Interpreter, resolved), repeat=3)
+    print(f"{iterations:,} iterations of four assignments, {iterations // 10:,} calls reading a global array")
+    report('  by name', name_seconds, iterations, 'iterations')
+    report('  resolved slots', seconds, iterations, 'iterations')
+    print(f"  resolved lookups are {name_seconds / seconds:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# Run statistics (src/interpreter/stats.py, main.py --stats). First checks, on every testcase and
+# a few programs of calls, tail calls and loops left with GTFO, that a measured run gives the same
+# output as an unmeasured one in every engine, and that every engine counts the same calls and
+# loop iterations. Then times a program of [iterations] calls and loop iterations in each engine:
+# unmeasured, measured, and measured with tracemalloc.
+#   python benchmarks/bench_stats.py [iterations]
+import sys
+
+from bench_engines import STDIN_SETS, call_program
+from common import best_of, read_testcases, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.stats import Stats
+from src.interpreter.streams import LineInput, MemoryOutput
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+PROGRAMS = {
+    'calls.lol': """HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A j ITZ 0
+    BUHBYE
+
+    HOW IZ I count YR n AN YR total AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR total
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR SUM OF total AN n AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I fib YR n AN YR self
+        BOTH SAEM n AN BIGGR OF n AN 2
+        O RLY?
+            NO WAI
+                FOUND YR n
+        OIC
+        FOUND YR SUM OF I IZ self YR DIFF OF n AN 1 AN YR self MKAY AN I IZ self YR DIFF OF n AN 2 AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I inner YR n
+        I HAS A k ITZ 0
+        IM IN YR inside UPPIN YR k TIL BOTH SAEM k AN n
+            BOTH SAEM k AN 3
+            O RLY?
+                YA RLY
+                    GTFO
+            OIC
+        IM OUTTA YR inside
+        FOUND YR k
+    IF U SAY SO
+
+    VISIBLE I IZ count YR 50 AN YR 0 AN YR count MKAY
+    VISIBLE I IZ fib YR 10 AN YR fib MKAY
+    IM IN YR outer UPPIN YR i WILE DIFFRINT i AN 6
+        VISIBLE I IZ inner YR i MKAY
+    IM OUTTA YR outer
+    IM IN YR forever UPPIN YR j
+        BOTH SAEM j AN 4
+        O RLY?
+            YA RLY
+                GTFO
+        OIC
+    IM OUTTA YR forever
+KTHXBYE
+""",
+}
+
+
+def parse(source, name='<bench>'):
+    return Parser(tokenizer.tokenize(source, filename=name), filename=name).parse()
+
+
+def run(engine, ast, stdin='', stats=None):
+    """Run ast; returns its output (and error)"""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = MemoryOutput()
+    try:
+        result = Interpreter(filename='<bench>', engine=engine, output=output,
+                             input=LineInput(stdin.splitlines()), stats=stats).visit(ast, context)
+        if result.error:
+            output.write(result.error.as_string())
+    except Exception as e:
+        output.write(f"\n{type(e).__name__}: {e}")
+    return output.getvalue()
+
+
+def check():
+    compared = 0
+    for name, source in {**read_testcases(), **PROGRAMS}.items():
+        result = parse(source, name)
+        if result.error:
+            continue
+        for stdin in STDIN_SETS:
+            counted = None
+            for engine in Interpreter.ENGINES:
+                stats = Stats()
+                if run(engine, result.node, stdin, stats) != run(engine, result.node, stdin):
+                    raise SystemExit(f"MISMATCH: {name} in the {engine} engine gives other output when measured")
+                if counted is None:
+                    counted = stats.calls, stats.loops
+                elif (stats.calls, stats.loops) != counted:
+                    raise SystemExit(f"MISMATCH: {name} in the {engine} engine counts {stats.calls}, {stats.loops}, "
+                                     f"the tree-walker {counted}")
+                compared += 1
+    print(f"Measured and unmeasured runs agree, and every engine counts the same calls and loops, on {compared} runs")
+
+
+def main():
+    check()
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ast = parse(call_program(iterations)).node
+
+    print(f"\n{iterations:,} calls in a loop")
+    for engine in Interpreter.ENGINES:
+        plain, _ = best_of(lambda: run(engine, ast), repeat=3)
+
+        def measured():
+            stats = Stats()
+            run(engine, ast, stats=stats)
+            return stats
+        counted, stats = best_of(measured, repeat=3)
+        if stats.calls['scale'] != iterations or stats.loops['calls'] != iterations:
+            raise SystemExit(f"FAILED: the {engine} engine counted {stats.calls}, {stats.loops}")
+
+        def traced():
+            stats = Stats(trace_memory=True)
+            with stats.measure():
+                run(engine, ast, stats=stats)
+            return stats
+        memory_seconds, stats = best_of(traced, repeat=1)
+        report(f'  {engine} unmeasured', plain, iterations, 'calls')
+        report(f'  {engine} measured', counted, iterations, 'calls')
+        report(f'  {engine} measured, tracemalloc', memory_seconds, iterations, 'calls')
+        print(f"    measuring costs {counted / plain:.2f}x, with tracemalloc {memory_seconds / plain:.2f}x"
+              f" (peak {stats.peak_memory / 1024:,.0f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# YARN literal scanning: the original character-by-character loop versus tokenizer.scan_string,
+# on long literals and on a SMOOSH-heavy program.
+#   python benchmarks/bench_strings.py [literal length]
+import sys
+
+from common import best_of, report
+
+from src.lexer import tokenizer
+
+
+def legacy_scan_string(code, pos):
+    """The pre-scan_string loop: one list append and one ':' check per character."""
+    escapes = {')': '\n', '>': '\t', 'o': '\a', '"': '"', ':': ':'}
+    string_value = []
+    while pos < len(code) and code[pos] != '"':
+        if code[pos] == ':' and pos + 1 < len(code) and code[pos + 1] in escapes:
+            string_value.append(escapes[code[pos + 1]])
+            pos += 2
+            continue
+        if code[pos] == '\n':
+            break
+        string_value.append(code[pos])
+        pos += 1
+    return ''.join(string_value), pos
+
+
+def smoosh_program(statements):
+    lines = ['HAI', 'I HAS A msg ITZ ""']
+    for i in range(statements):
+        lines.append(f'msg R SMOOSH "Item {i}::" AN " value:>{i * 7}:)" AN "done, thanks for waiting" MKAY')
+    lines.append('KTHXBYE')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    literal = ('All work and no play makes a LOLCODE program dull. Tab:> colon:: ' * (length // 64 + 1))[:length] + '"'
+    if legacy_scan_string(literal, 0) != tokenizer.scan_string(literal, 0):
+        print("MISMATCH: scanners disagree")
+        sys.exit(1)
+
+    print(f"One {length:,}-character literal")
+    seconds, _ = best_of(lambda: legacy_scan_string(literal, 0))
+    report('  character loop', seconds, length, 'chars')
+    seconds, _ = best_of(lambda: tokenizer.scan_string(literal, 0))
+    report('  scan_string', seconds, length, 'chars')
+
+    source = smoosh_program(20000)
+    print(f"\nSMOOSH-heavy program, {len(source):,} chars")
+    seconds, tokens = best_of(lambda: tokenizer.tokenize(source), repeat=3)
+    report('  tokenize', seconds, len(tokens), 'tokens')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# FOUND YR I IZ ... MKAY in tail position: the call runs in place of the one returning
+# (Function.execute in the tree and closure engines, TAILCALL in the vm) instead of nesting in it.
+# Compares both on an accumulator loop: calls per second, and peak memory at two depths (nested
+# calls keep a frame each, a chain of tail calls keeps two). Last, the loop runs [iterations] calls
+# deep, far past what the host stack allows. (test/test_tailcall.py checks that tail calls give
+# what nested calls give.)
+#   python benchmarks/bench_tailcall.py [iterations]
+import contextlib
+import sys
+import tracemalloc
+
+from bench_engines import run
+from common import best_of, report
+
+import src.interpreter.resolver as resolver
+from src.interpreter.interpreter import Interpreter
+from src.lexer import tokenizer
+from src.parser.parser import Parser, ReturnNode
+from src.vm.compiler import Compiler
+
+# Depth of the nested calls timed against tail calls, and Python frames allowed for them
+NESTED_DEPTH = 5000
+HOST_FRAMES = 200000
+# Depths compared for peak memory (tracemalloc is slow on a deep host stack)
+MEMORY_DEPTHS = (250, 1000)
+
+
+def loop_program(iterations):
+    """Sums 1 to iterations with an accumulator (functions cannot see their own name, so it is passed along)"""
+    return f"""HAI
+    HOW IZ I count YR n AN YR total AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR total
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR SUM OF total AN n AN YR self MKAY
+    IF U SAY SO
+
+    VISIBLE I IZ count YR {iterations} AN YR 0 AN YR count MKAY
+KTHXBYE
+"""
+
+def nested_return(self, node, block):
+    self.marker(block.on_return, block, self.expression(node.return_expression))
+
+
+@contextlib.contextmanager
+def nested_calls():
+    """Run FOUND YR of a call as a nested call (on trees parsed for it: both ways mark the nodes)"""
+    saved = resolver.tail_calls, Compiler.statement_ReturnNode
+    resolver.tail_calls = lambda statements: iter(())
+    Compiler.statement_ReturnNode = nested_return
+    # The compiler keeps the method it found for each node class
+    Compiler.statement_handlers.pop(ReturnNode, None)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(HOST_FRAMES)
+    try:
+        yield
+    finally:
+        resolver.tail_calls, Compiler.statement_ReturnNode = saved
+        Compiler.statement_handlers.pop(ReturnNode, None)
+        sys.setrecursionlimit(limit)
+
+
+def parse(source):
+    return Parser(tokenizer.tokenize(source)).parse().node
+
+
+def peak_memory(engine, iterations):
+    """Peak memory allocated while running loop_program(iterations)"""
+    ast = parse(loop_program(iterations))
+    tracemalloc.start()
+    try:
+        run(engine, ast)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f"{NESTED_DEPTH:,} calls deep")
+    for engine in Interpreter.ENGINES:
+        nested_ast, ast = parse(loop_program(NESTED_DEPTH)), parse(loop_program(NESTED_DEPTH))
+        with nested_calls():
+            nested_seconds, _ = best_of(lambda: run(engine, nested_ast), repeat=3)
+        seconds, _ = best_of(lambda: run(engine, ast), repeat=3)
+        report(f'  {engine} nested calls', nested_seconds, NESTED_DEPTH, 'calls')
+        report(f'  {engine} tail calls', seconds, NESTED_DEPTH, 'calls')
+        print(f"  {engine}: {nested_seconds / seconds:.2f}x faster")
+
+    print("\nPeak memory, " + " and ".join(f"{depth:,}" for depth in MEMORY_DEPTHS) + " calls deep")
+    for engine in Interpreter.ENGINES:
+        with nested_calls():
+            nested = [peak_memory(engine, depth) for depth in MEMORY_DEPTHS]
+        tail = [peak_memory(engine, depth) for depth in MEMORY_DEPTHS]
+        print(f"  {engine:<8} nested " + " / ".join(f"{size / 1024:,.0f} KiB" for size in nested)
+              + "    tail " + " / ".join(f"{size / 1024:,.0f} KiB" for size in tail))
+
+    print(f"\n{iterations:,} tail calls, with Python's default recursion limit")
+    ast = parse(loop_program(iterations))
+    for engine in Interpreter.ENGINES:
+        seconds, _ = best_of(lambda: run(engine, ast), repeat=1)
+        report(f'  {engine}', seconds, iterations, 'calls')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Token memory footprint: per-token dicts (the old representation) versus the slotted Token.
+#   python benchmarks/bench_token_memory.py [lines]
+import sys
+import tracemalloc
+
+from common import generated_program
+
+from src.lexer import tokenizer
+
+
+def as_dicts(tokens):
+    """The old representation: one dict (type/value/line/col/category) per token."""
+    return [{'type': t.type, 'value': t.value, 'line': t.line, 'col': t.col, 'category': t.category}
+            for t in tokens]
+
+
+def as_tokens(tokens):
+    return [tokenizer.Token(t.type, t.value, t.offset, t.source) for t in tokens]
+
+
+def traced_bytes(build):
+    """Bytes still allocated after build() returns, i.e. the size of what it built."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = generated_program(lines)
+    print(f"Lexing a generated program of {len(source.splitlines())} lines ({len(source):,} chars)\n")
+
+    # Both formats are rebuilt from the same stream so values, types and category
+    # strings are shared and only the per-token containers (plus the list) are counted
+    reference = tokenizer.tokenize(source)
+    dict_bytes, dicts = traced_bytes(lambda: as_dicts(reference))
+    token_bytes, tokens = traced_bytes(lambda: as_tokens(reference))
+
+    if [dict(t) for t in tokens] != dicts:
+        print("MISMATCH: token streams differ")
+        sys.exit(1)
+
+    count = len(tokens)
+    print(f"{'dict tokens':38} {dict_bytes / count:10.1f} bytes/token")
+    print(f"{'tokenizer.Token':38} {token_bytes / count:10.1f} bytes/token")
+    print(f"\n{count:,} tokens, {dict_bytes / token_bytes:.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Peak lexer memory: tokenize() on a string versus draining tokenize_iter() over a file.
+#   python benchmarks/bench_token_stream.py
+import os
+import sys
+import tempfile
+import tracemalloc
+from collections import deque
+
+from common import best_of, generated_program, report
+
+from src.lexer import tokenizer
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [5000, 20000, 80000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for lines in sizes:
+            path = os.path.join(tmp, f'program_{lines}.lol')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(generated_program(lines))
+
+            def lex_list():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return len(tokenizer.tokenize(f.read()))
+
+            def lex_stream():
+                with open(path, 'r', encoding='utf-8') as f:
+                    deque(tokenizer.tokenize_iter(f), maxlen=0)
+
+            count = lex_list()
+            print(f"{lines} lines, {count:,} tokens")
+            print(f"  {'tokenize (list)':36} {peak_bytes(lex_list) / 1024:10.0f} KiB peak")
+            print(f"  {'tokenize_iter (file, streamed)':36} {peak_bytes(lex_stream) / 1024:10.0f} KiB peak")
+            seconds, _ = best_of(lex_stream, repeat=3)
+            report('  tokenize_iter throughput', seconds, count, 'tokens')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Interpreter.visit dispatch: the original getattr(self, f'visit_{name}') lookup with an RTResult
+# per literal, versus the cached class -> handler table and constant literal results.
+# The program counts up and down like test/project-testcases/09_loops.lol.
+#   python benchmarks/bench_visit.py [iterations]
+import contextlib
+import io
+import sys
+
+from common import best_of, report
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, RTResult, SymbolTable
+from src.interpreter.values import Boolean, Noob, Number, String
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+
+class LegacyInterpreter(Interpreter):
+    """The dispatch and literal handling before the handler table."""
+    def visit(self, node, context):
+        method_name = f'visit_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_visit_method)
+        return method(node, context)
+
+    def visit_IntegerNode(self, node, context):
+        return RTResult().success(Number(int(node.token['value']), node.token['line']))
+
+    def visit_FloatNode(self, node, context):
+        return RTResult().success(Number(float(node.token['value']), node.token['line']))
+
+    def visit_BooleanNode(self, node, context):
+        return RTResult().success(Boolean(node.token['value'], node.token['line']))
+
+    def visit_StringNode(self, node, context):
+        return RTResult().success(String(node.token['value'], node.token['line']))
+
+    def visit_NoobNode(self, node, context):
+        return RTResult().success(Noob(node.line_number))
+
+
+def loop_program(iterations):
+    return f"""HAI
+    WAZZUP
+        I HAS A limit ITZ {iterations}
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+
+    IM IN YR asc UPPIN YR i WILE BOTH SAEM i AN SMALLR OF i AN DIFF OF limit AN 1
+        total R SUM OF total AN PRODUKT OF i AN 2
+    IM OUTTA YR asc
+
+    IM IN YR desc NERFIN YR i TIL BOTH SAEM i AN 0
+        total R DIFF OF total AN i
+    IM OUTTA YR desc
+
+    VISIBLE total
+KTHXBYE
+"""
+
+
+def run(interpreter_class, ast):
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = interpreter_class().visit(ast, context)
+    if result.error:
+        raise SystemExit(result.error.as_string())
+    return output.getvalue()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ast = Parser(tokenizer.tokenize(loop_program(iterations))).parse().node
+
+    legacy_seconds, expected = best_of(lambda: run(LegacyInterpreter, ast), repeat=3)
+    seconds, output = best_of(lambda: run(Interpreter, ast), repeat=3)
+    if output != expected:
+        print(f"MISMATCH: {output!r} != {expected!r}")
+        sys.exit(1)
+
+    print(f"Two loops of {iterations:,} iterations")
+    report('getattr dispatch', legacy_seconds, 2 * iterations, 'iterations')
+    report('handler table', seconds, 2 * iterations, 'iterations')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Shared helpers for the benchmark scripts in this directory.
+# Every script is meant to be run from the "source code" directory, e.g.
+#   python benchmarks/bench_lexer.py
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+TESTCASE_DIR = os.path.join(ROOT, 'test', 'project-testcases')
+
+
+def read_testcases():
+    """Return {filename: source} for every .lol file in test/project-testcases."""
+    sources = {}
+    for name in sorted(os.listdir(TESTCASE_DIR)):
+        if name.endswith('.lol'):
+            with open(os.path.join(TESTCASE_DIR, name), 'r', encoding='utf-8') as f:
+                sources[name] = f.read()
+    return sources
+
+
+def generated_program(target_lines):
+    """
+    Build one large, valid program by repeating the statement bodies of the
+    testcase files until it has roughly target_lines lines.
+    """
+    body = []
+    for source in read_testcases().values():
+        lines = source.splitlines()
+        inside = False
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('HAI'):
+                inside = True
+                continue
+            if stripped.startswith('KTHXBYE'):
+                inside = False
+                continue
+            if inside:
+                body.append(line)
+    out = ['HAI']
+    while len(out) < target_lines:
+        out.extend(body)
+    out.append('KTHXBYE')
+    return '\n'.join(out) + '\n'
+
+
+def parseable_program(target_lines):
+    """
+    Like generated_program, but the result also parses: the WAZZUP declarations of all
+    testcases are merged into one section and only the statement bodies are repeated.
+    """
+    declarations, body = [], []
+    for source in read_testcases().values():
+        section = None
+        for line in source.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('HAI') or stripped == 'BUHBYE':
+                section = body
+            elif stripped.startswith('KTHXBYE'):
+                section = None
+            elif stripped == 'WAZZUP':
+                section = declarations
+            elif section is declarations:
+                if stripped and stripped not in (d.strip() for d in declarations):
+                    declarations.append(line)
+            elif section is body:
+                body.append(line)
+    out = ['HAI', 'WAZZUP'] + declarations + ['BUHBYE']
+    while len(out) < target_lines:
+        out.extend(body)
+    out.append('KTHXBYE')
+    return '\n'.join(out) + '\n'
+
+
+def best_of(fn, repeat=5):
+    """Run fn() repeat times and return (best wall time in seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def report(label, seconds, count=None, unit='ops'):
+    line = f"{label:38} {seconds * 1000:10.2f} ms"
+    if count is not None and seconds > 0:
+        line += f"   {count / seconds:14,.0f} {unit}/s"
+    print(line)
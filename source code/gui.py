@@ -1,9 +1,6 @@
 import os
 import sys
-import queue
-import time
 import platform
-import builtins
 from pathlib import Path
 from PyQt5.QtGui import (QFont, QKeySequence, QTextCursor, QTextCharFormat, 
                          QColor, QIcon, QFontDatabase, QPixmap, QPainter)
@@ -14,9 +11,13 @@ from PyQt5.QtWidgets import (QWidget, QApplication, QMainWindow, QFileDialog,
                              QMenu, QTabWidget, QAction, QFrame, QPlainTextEdit)
 from PyQt5.QtCore import Qt, QThread, QSize, pyqtSignal
 from src.lexer import tokenizer
-from src.parser.parser import Parser
+from src.lexer.incremental import IncrementalLexer
+from src.parser.parser import Parser, ParseResult
 from src.interpreter.runtime import SymbolTable, Context
 from src.interpreter.interpreter import Interpreter
+from src.interpreter.stats import Stats
+from src.interpreter.streams import BatchedOutput, QueueInput
+from src.utils import parse_cache
 
 # ============================================================================
 # CONSTANTS
@@ -56,6 +57,8 @@ KEYWORD_COLORS = {
     "WIN": "#D7BA7D",
     "FAIL": "#D7BA7D",
 }
+# The same colors by token type, for highlighting from an editor's tokens
+TOKEN_COLORS = {tokenizer.TokenType(keyword.strip()): color for keyword, color in KEYWORD_COLORS.items()}
 
 
 # ============================================================================
@@ -93,7 +96,7 @@ class InteractiveConsole(QTextEdit):
     
     def __init__(self, font_family):
         super().__init__()
-        self.input_queue = queue.Queue()
+        self.input = QueueInput(self.request_input)
         self.waiting_for_input = False
         self.input_start_pos = 0
         self.font_family = font_family
@@ -149,6 +152,11 @@ class InteractiveConsole(QTextEdit):
         """Request input from user - thread-safe"""
         self.input_requested.emit()
     
+    def new_input(self):
+        """A fresh GIMMEH source for a run; what the user enters from now on goes to it"""
+        self.input = QueueInput(self.request_input)
+        return self.input
+    
     def keyPressEvent(self, event):
         """Handle keyboard input"""
         if not self.waiting_for_input:
@@ -178,8 +186,8 @@ class InteractiveConsole(QTextEdit):
             self.waiting_for_input = False
             self.setReadOnly(True)
             
-            # queue the input
-            self.input_queue.put(user_input)
+            # hand the line to the running program
+            self.input.put(user_input)
             event.accept()
             
         elif event.key() == Qt.Key_Backspace:
@@ -189,24 +197,6 @@ class InteractiveConsole(QTextEdit):
             super().keyPressEvent(event)
         else:
             super().keyPressEvent(event)
-    
-    def get_input(self, timeout=60):
-        """
-        Get input from user with timeout.
-        Blocks while processing Qt events to keep UI responsive.
-        """
-        self.request_input()
-        elapsed = 0
-        
-        while self.input_queue.empty() and elapsed < timeout:
-            QApplication.processEvents()
-            time.sleep(0.01)
-            elapsed += 0.01
-        
-        if self.input_queue.empty():
-            raise TimeoutError("Input timed out")
-        
-        return self.input_queue.get()
 
 
 # ============================================================================
@@ -221,6 +211,7 @@ class InterpreterWorker(QThread):
     output_ready = pyqtSignal(str, str)  # (text, color)
     update_tokens = pyqtSignal(list)
     update_symbols = pyqtSignal(object)
+    stats_ready = pyqtSignal(object)  # Stats.report() of the finished run
     finished = pyqtSignal()
     error_occurred = pyqtSignal(str)
     
@@ -228,24 +219,19 @@ class InterpreterWorker(QThread):
         super().__init__()
         self.content = content
         self.console_widget = console_widget
+        # GIMMEH blocks this thread (not the GUI's) until the console hands it a line
+        self.input = console_widget.new_input()
         self.filename = filename
         self.tokens = None
         self.symbol_table_obj = None
+        self.stats = Stats()
         self._is_running = True
     
-    def console_print(self, *args, **kwargs):
-        """Custom print function that routes to console widget"""
-        # Handle separator and end parameters just like built-in print
-        sep = kwargs.get('sep', ' ')
-        end = kwargs.get('end', '\n')
-        text = sep.join(str(arg) for arg in args)
-        # Add the end character(s)
-        text = text + end
-        self.output_ready.emit(text, COLORS['TEXT'])
-    
     def stop(self):
         """Stop the worker thread"""
         self._is_running = False
+        # a program waiting in GIMMEH reads end of input instead
+        self.input.close()
         self.wait()
     
     def run(self):
@@ -254,11 +240,18 @@ class InterpreterWorker(QThread):
             # tokenization
             self.output_ready.emit("=== LOLCODE INTERPRETER ===\n", COLORS['INFO'])
             
-            try:
-                self.tokens = tokenizer.tokenize(self.content, filename=self.filename or '<stdin>')
-            except Exception as e:
-                self.output_ready.emit(f"Tokenization Error: {str(e)}\n", COLORS['ERROR'])
-                return
+            # a saved file whose tokens and AST are cached skips lexing and parsing
+            with self.stats.phase('load cache'):
+                cached = parse_cache.load(self.filename, self.content) if self.filename else None
+            if cached is not None:
+                self.tokens, cached_ast = cached
+            else:
+                try:
+                    with self.stats.phase('tokenize'):
+                        self.tokens = tokenizer.tokenize(self.content, filename=self.filename or '<stdin>')
+                except Exception as e:
+                    self.output_ready.emit(f"Tokenization Error: {str(e)}\n", COLORS['ERROR'])
+                    return
             
             if not self.tokens:
                 self.output_ready.emit("Error: No tokens generated\n", COLORS['ERROR'])
@@ -274,14 +267,20 @@ class InterpreterWorker(QThread):
                 return
             
             # parsing
-            try:
-                parser = Parser(self.tokens, filename=self.filename or '<stdin>')
-                ast = parser.parse()
-            except Exception as e:
-                self.output_ready.emit(f"Parser Error: {str(e)}\n", COLORS['ERROR'])
-                import traceback
-                self.output_ready.emit(traceback.format_exc() + "\n", COLORS['ERROR'])
-                return
+            if cached is not None:
+                ast = ParseResult().success(cached_ast)
+            else:
+                try:
+                    parser = Parser(self.tokens, filename=self.filename or '<stdin>')
+                    with self.stats.phase('parse'):
+                        ast = parser.parse()
+                except Exception as e:
+                    self.output_ready.emit(f"Parser Error: {str(e)}\n", COLORS['ERROR'])
+                    import traceback
+                    self.output_ready.emit(traceback.format_exc() + "\n", COLORS['ERROR'])
+                    return
+                if self.filename and not ast.error:
+                    parse_cache.store(self.filename, self.content, self.tokens, ast.node)
             
             if hasattr(ast, 'error') and ast.error:
                 error_msg = (ast.error.as_string() if hasattr(ast.error, 'as_string') 
@@ -290,6 +289,7 @@ class InterpreterWorker(QThread):
                 return
             
             self.output_ready.emit("Parsing complete\n", COLORS['SUCCESS'])
+            self.stats.parsed(self.tokens, ast.node)
             
             if not self._is_running:
                 return
@@ -300,26 +300,20 @@ class InterpreterWorker(QThread):
                 context = Context('<program>')
                 context.symbol_table = self.symbol_table_obj
                 
-                interpreter = Interpreter(filename=self.filename or '<stdin>')
+                # VISIBLE output reaches the console in batches, one signal each
+                output = BatchedOutput(lambda text: self.output_ready.emit(text, COLORS['TEXT']))
+                interpreter = Interpreter(filename=self.filename or '<stdin>', output=output,
+                                          input=self.input, stats=self.stats)
                 self.output_ready.emit("--- Program Output ---\n", COLORS['INFO'])
                 
-                # redirect I/O to console
-                original_print = builtins.print
-                original_input = builtins.input
-                
-                builtins.print = self.console_print
-                builtins.input = lambda: self.console_widget.get_input()
-                
                 try:
-                    result = interpreter.visit(ast.node, context)
+                    with self.stats.phase('run'):
+                        result = interpreter.visit(ast.node, context)
                 except Exception as e:
                     self.output_ready.emit(f"Runtime Error: {str(e)}\n", COLORS['ERROR'])
                     import traceback
                     self.output_ready.emit(traceback.format_exc() + "\n", COLORS['ERROR'])
                     return
-                finally:
-                    builtins.print = original_print
-                    builtins.input = original_input
                 
                 # check for runtime errors
                 if result and hasattr(result, 'error') and result.error:
@@ -329,6 +323,12 @@ class InterpreterWorker(QThread):
                 else:
                     self.output_ready.emit("\n=== Execution complete ===\n", COLORS['SUCCESS'])
                 
+                # phase times, and the statistics for anyone listening
+                times = ', '.join(f"{name} {wall * 1000:.1f} ms"
+                                  for name, (wall, cpu) in self.stats.phases.items())
+                self.output_ready.emit(f"{times}\n", COLORS['INFO'])
+                self.stats_ready.emit(self.stats.report())
+                
                 # update symbol table
                 if self.symbol_table_obj:
                     self.update_symbols.emit(self.symbol_table_obj)
@@ -374,8 +374,11 @@ class CodeEditor(QPlainTextEdit):
         super().__init__()
         self.font_family = font_family
         self.line_number_area = LineNumberArea(self)
+        # tokens of the text, kept up to date edit by edit (None while it does not lex)
+        self.lexer = IncrementalLexer()
         
         # connect signals
+        self.document().contentsChange.connect(self.relex)
         self.document().blockCountChanged.connect(self.update_line_number_area_width)
         self.verticalScrollBar().valueChanged.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.update_line_number_area)
@@ -383,6 +386,27 @@ class CodeEditor(QPlainTextEdit):
         
         self.update_line_number_area_width(0)
     
+    def relex(self, position, removed, added):
+        """Re-lex only the lines around an edit of the document"""
+        lexer = self.lexer
+        # (without the paragraph separator Qt keeps at the end)
+        length = self.document().characterCount() - 1
+        try:
+            if position + removed > len(lexer.code) or len(lexer.code) - removed + added != length:
+                # Qt counts that separator in some changes, e.g. setPlainText
+                lexer.reset(self.toPlainText())
+                return
+            cursor = QTextCursor(self.document())
+            cursor.setPosition(position)
+            cursor.setPosition(position + added, QTextCursor.KeepAnchor)
+            inserted = cursor.selectedText().replace('\u2029', '\n').replace('\u00a0', ' ')
+            # (the same text is a change of format only, e.g. by highlight_syntax)
+            if lexer.code[position:position + removed] != inserted:
+                lexer.edit(position, removed, inserted)
+        except tokenizer.LexerError:
+            # an unfinished edit, such as a stray character; the next one lexes the whole text
+            pass
+    
     def line_number_area_width(self):
         """Calculate width needed for line numbers"""
         digits = len(str(max(1, self.document().blockCount())))
@@ -512,33 +536,49 @@ def highlight_syntax(text_input):
         
         char_count += len(line) + 1
     
-    # highlight keywords (comments will override)
-    for keyword, color in KEYWORD_COLORS.items():
-        index = 0
-        while index < len(content):
-            index = content.find(keyword, index)
-            if index == -1:
-                break
+    # highlight keywords: from the editor's tokens, which are never inside a comment or a
+    # string, when the text lexes; otherwise by searching for them
+    tokens = getattr(text_input, 'lexer', None) and text_input.lexer.tokens
+    if tokens is not None:
+        for token in tokens:
+            color = TOKEN_COLORS.get(token.type)
+            if color is None:
+                continue
+            cursor = text_input.textCursor()
+            cursor.setPosition(token.offset)
+            cursor.setPosition(token.offset + len(token.value), QTextCursor.KeepAnchor)
+            
+            keyword_fmt = QTextCharFormat()
+            keyword_fmt.setForeground(QColor(color))
+            cursor.setCharFormat(keyword_fmt)
+    else:
+        # (comments will override)
+        for keyword, color in KEYWORD_COLORS.items():
+            index = 0
+            while index < len(content):
+                index = content.find(keyword, index)
+                if index == -1:
+                    break
             
-            # check if keyword is inside a comment
-            line_start = content.rfind('\n', 0, index) + 1
-            line_end = content.find('\n', index)
-            if line_end == -1:
-                line_end = len(content)
-            line_text = content[line_start:line_end]
-            comment_pos = line_text.find(COMMENT_START)
+                # check if keyword is inside a comment
+                line_start = content.rfind('\n', 0, index) + 1
+                line_end = content.find('\n', index)
+                if line_end == -1:
+                    line_end = len(content)
+                line_text = content[line_start:line_end]
+                comment_pos = line_text.find(COMMENT_START)
             
-            # only highlight if not in comment
-            if comment_pos == -1 or (index - line_start) < comment_pos:
-                cursor = text_input.textCursor()
-                cursor.setPosition(index)
-                cursor.setPosition(index + len(keyword), QTextCursor.KeepAnchor)
+                # only highlight if not in comment
+                if comment_pos == -1 or (index - line_start) < comment_pos:
+                    cursor = text_input.textCursor()
+                    cursor.setPosition(index)
+                    cursor.setPosition(index + len(keyword), QTextCursor.KeepAnchor)
                 
-                keyword_fmt = QTextCharFormat()
-                keyword_fmt.setForeground(QColor(color))
-                cursor.setCharFormat(keyword_fmt)
+                    keyword_fmt = QTextCharFormat()
+                    keyword_fmt.setForeground(QColor(color))
+                    cursor.setCharFormat(keyword_fmt)
             
-            index += len(keyword)
+                index += len(keyword)
     
     # restore cursor position
     cursor = text_input.textCursor()
@@ -623,7 +663,7 @@ def update_token_view(table, tokens):
         table.insertRow(row_pos)
         
         # handle different token formats
-        if isinstance(token, dict):
+        if isinstance(token, (dict, tokenizer.Token)):
             lexeme = str(token.get('value', ''))
             category = str(token.get('category', ''))
         else:
@@ -1,8 +1,19 @@
 from src.lexer import tokenizer
-from src.parser.parser import Parser
 from src.interpreter.runtime import SymbolTable, Context
 from src.interpreter.interpreter import Interpreter
+from src.interpreter.resolver import resolve
+from src.interpreter.optimizer import optimize
+from src.interpreter.streams import BufferedOutput, BulkInput, FileInput, StandardInput
+from src.interpreter.stats import Stats
+from src.vm.machine import VirtualMachine
+from src.parser.tree_dump import dump_tree
+from src.utils import batch, parse_cache
+import argparse
+import contextlib
+import json
+import os
 import sys
+import time
 
 
 def print_tokens(tokens):
@@ -13,9 +24,63 @@ def print_tokens(tokens):
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Run LOLCODE programs.")
+    arg_parser.add_argument('files', nargs='*', help="LOLCODE files to run (default: the project testcases)")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help=f"always lex and parse, ignoring the {parse_cache.CACHE_DIR_NAME} directory")
+    arg_parser.add_argument('--engine', choices=Interpreter.ENGINES, default='tree',
+                            help="how to execute the AST: walk it ('tree', the default), compile it to closures "
+                                 "first ('closure') or to bytecode for the VM ('vm')")
+    arg_parser.add_argument('--check', action='store_true',
+                            help="instead of running, list the variables each file uses that are never declared")
+    arg_parser.add_argument('--max-depth', type=int, default=None, metavar='N',
+                            help="most nested HOW IZ I calls in the vm engine (--engine vm only), which does not use Python's "
+                                 f"stack for them; a FOUND YR of a call does not nest (default {VirtualMachine.MAX_DEPTH})")
+    arg_parser.add_argument('-O', '--optimize', action='store_true',
+                            help="fold constant expressions and drop O RLY? branches that can never run before running")
+    arg_parser.add_argument('--input', metavar='FILE',
+                            help="read GIMMEH lines from FILE instead of standard input")
+    arg_parser.add_argument('--batch', action='store_true',
+                            help="run the files (and the .lol files in any directories given) on a pool of processes, "
+                                 "comparing each file's output with its .out file, then print a summary; "
+                                 "a file's GIMMEHs read its .in file, else --input")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None, metavar='N',
+                            help="worker processes for --batch (default: one per CPU)")
+    arg_parser.add_argument('--tokens', action='store_true', help="print each file's tokens before running it")
+    arg_parser.add_argument('--ast', action='store_true', help="print each file's parse tree before running it")
+    arg_parser.add_argument('--symbols', action='store_true',
+                            help="print the variables each file's program leaves defined after running it")
+    arg_parser.add_argument('--stats', nargs='?', const='-', metavar='FILE',
+                            help="write a JSON report of each file to FILE (standard error if none is given): wall "
+                                 "and CPU time per phase, token and node counts, node visits, calls per function "
+                                 "and iterations per loop label")
+    arg_parser.add_argument('--trace-memory', action='store_true',
+                            help="add each file's peak memory to the --stats report (traced with tracemalloc, "
+                                 "which slows the run)")
+    args = arg_parser.parse_args()
+    if args.max_depth is not None and args.engine != 'vm':
+        arg_parser.error("--max-depth only applies to --engine vm")
+
+    if args.batch:
+        files = batch.collect(args.files or ["test/project-testcases"])
+        jobs = args.jobs or os.cpu_count() or 1
+        start = time.perf_counter()
+        results = list(batch.run_batch(files, jobs, engine=args.engine, max_depth=args.max_depth,
+                                       optimized=args.optimize, use_cache=not args.no_cache, input_path=args.input))
+        failures = batch.print_summary(results, time.perf_counter() - start, jobs)
+        sys.exit(1 if failures else 0)
+
+    # One source for every file's GIMMEHs: piped or redirected input is read in bulk, a terminal a line at a time
+    if args.input:
+        program_input = FileInput(args.input)
+    elif sys.stdin.isatty():
+        program_input = StandardInput()
+    else:
+        program_input = BulkInput()
+
     # Check if file path is provided as command-line argument
-    if len(sys.argv) > 1:
-        files = sys.argv[1:]
+    if args.files:
+        files = args.files
     else:
         # Default test files
         base = "test/project-testcases"
@@ -32,6 +97,9 @@ def main():
             f"{base}/10_functions.lol",
         ]
 
+    # Without a dump requested only the programs run, under a header each when there are several
+    header = args.tokens or args.ast or args.symbols or len(files) > 1
+    reports = []
     for path in files:
         try:
             with open(path, "r", encoding="utf-8") as f:
@@ -40,40 +108,85 @@ def main():
             print(f"Skipping missing file: {path}")
             continue
 
+        if not args.stats:
+            run_file(path, source, args, program_input, header)
+            continue
+        stats = Stats(trace_memory=args.trace_memory)
+        with stats.measure():
+            run_file(path, source, args, program_input, header, stats)
+        reports.append({'file': path, **stats.report()})
+
+    if args.stats:
+        report = json.dumps(reports, indent=2)
+        if args.stats == '-':
+            print(report, file=sys.stderr)
+        else:
+            with open(args.stats, 'w', encoding='utf-8') as f:
+                f.write(report + '\n')
+
+
+def phase(stats, name):
+    """stats.phase(name), or nothing without stats"""
+    return stats.phase(name) if stats is not None else contextlib.nullcontext()
+
+
+def run_file(path, source, args, program_input, header, stats=None):
+    """Lex, parse and run one file, printing what args ask for; stats, if given, measures it"""
+    if header:
         print(f"\n=== TEST for: {path} ===")
-        
-        # Stage 1: Lexer
-        try:
-            tokens = tokenizer.tokenize(source, filename=path)
+    
+    # Stage 1 and 2: Lexer and Parser (both skipped when a valid cache entry exists)
+    try:
+        tokens, AST, _ = parse_cache.tokenize_and_parse(path, source, use_cache=not args.no_cache, stats=stats)
+        if args.tokens:
             print(f"Total tokens: {len(tokens)}\n")
             print_tokens(tokens)
-        except tokenizer.LexerError as e:
-            print(e.as_string())
-            continue  # Skip to next file if lexer fails
-        except Exception as e:
-            print(f"ERROR: {e}")
-            continue
-        
-        # Stage 2: Parser (only if lexer succeeded)
-        parser = Parser(tokens, filename=path)
-        AST = parser.parse()
+    except tokenizer.LexerError as e:
+        print(e.as_string())
+        return  # Skip to next file if lexer fails
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return
+    
+    if args.ast:
         print("\nPARSE TREE")
-        
-        if AST.error:
-            print(AST.error.as_string())
-            continue  # Skip to next file if parser fails
-        else:
-            print(AST.node)
-        
-        # Stage 3: Interpreter (only if parser succeeded)
+    if AST.error:
+        print(AST.error.as_string())
+        return  # Skip to next file if parser fails
+    if args.ast:
+        # Written as it is produced, not built into one string first
+        dump_tree(AST.node, sys.stdout)
+    if stats is not None:
+        stats.parsed(tokens, AST.node)
+
+    # Resolve-time errors: names that fail whenever the statement using them runs
+    if args.check:
+        errors = resolve(AST.node, path).errors
+        print(f"\nRESOLVER CHECK: {len(errors)} problem(s)")
+        for error in errors:
+            print(error.as_string())
+        return
+    
+    # Optional pass between parsing and running; the parse tree above is the unoptimized one
+    if args.optimize:
+        with phase(stats, 'optimize'):
+            program = optimize(AST.node)
+    else:
+        program = AST.node
+
+    # Stage 3: Interpreter (only if parser succeeded)
+    if args.tokens or args.ast or args.symbols:
         print("\nINTERPRETER OUTPUT:")
-        try:
-            lolcode_interpreter = Interpreter(filename=path)
-            context = Context('<program>')
-            context.symbol_table = SymbolTable()
-            result = lolcode_interpreter.visit(AST.node, context)
-            
-            # Print symbol table for debugging
+    try:
+        lolcode_interpreter = Interpreter(filename=path, engine=args.engine, max_depth=args.max_depth,
+                                          output=BufferedOutput(), input=program_input, stats=stats)
+        context = Context('<program>')
+        context.symbol_table = SymbolTable()
+        with phase(stats, 'run'):
+            result = lolcode_interpreter.visit(program, context)
+        
+        # Print symbol table for debugging
+        if args.symbols:
             print("\n=== SYMBOL TABLE ===")
             for name, value in context.symbol_table.symbols.items():
                 # Map Python type names to LOLCODE type names
@@ -87,10 +200,12 @@ def main():
                 lolcode_type = type_map.get(type(value).__name__, type(value).__name__)
                 print(f"{name}: {value} ({lolcode_type})")
 
-            if result.error:
-                print(result.error.as_string())
-            # else:
-            #     print(f"\nProgram executed successfully")
-        except Exception as e:
-            print(f"ERROR: {e}")
+        if result.error:
+            print(result.error.as_string())
+        # else:
+        #     print(f"\nProgram executed successfully")
+    except Exception as e:
+        print(f"ERROR: {e}")
+
+
 main()
\ No newline at end of file
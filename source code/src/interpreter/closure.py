@@ -0,0 +1,683 @@
+import operator
+
+from src.lexer.tokenizer import TokenType
+from .resolver import Scope, defined_names, mark_function
+from .streams import STANDARD_INPUT, STANDARD_OUTPUT
+from .runtime import *
+from .values import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# CLOSURE ENGINE
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Instead of walking the AST on every execution, each node is compiled once into a Python closure
+# taking the context and returning the node's value. Everything that only depends on the node
+# (which operator to apply, literal values, child closures) is decided at compile time.
+#
+# Runtime errors are raised as Failure and turned back into an RTResult by ClosureCompiler.run,
+# so the engine behaves exactly like the tree-walking Interpreter: same values, same output, same
+# errors, and the same quirks (e.g. a failed assignment still stores None in the variable).
+
+ARITHMETIC_METHODS = {
+  TokenType.SUM_OF: 'added_by',
+  TokenType.DIFF_OF: 'subtracted_by',
+  TokenType.PRODUKT_OF: 'multiplied_by',
+  TokenType.QUOSHUNT_OF: 'divided_by',
+  TokenType.MOD_OF: 'modulo',
+  TokenType.BIGGR_OF: 'maximum',
+  TokenType.SMALLR_OF: 'minimum',
+}
+
+BOOLEAN_METHODS = {
+  TokenType.BOTH_OF: 'and_logic',
+  TokenType.EITHER_OF: 'or_logic',
+  TokenType.WON_OF: 'xor_logic',
+}
+
+COMPARISON_METHODS = {
+  TokenType.BOTH_SAEM: 'is_equal',
+  TokenType.DIFFRINT: 'is_not_equal',
+}
+
+# Value method -> (operand class, Python operator, result class). When both operands are exactly
+# of the operand class, the compiled operation applies the operator to their .value itself, which
+# is what the method does for them (QUOSHUNT OF always calls its method: it checks for zero)
+FAST_OPERATIONS = {
+  'added_by': (Number, operator.add, Number),
+  'subtracted_by': (Number, operator.sub, Number),
+  'multiplied_by': (Number, operator.mul, Number),
+  'modulo': (Number, operator.mod, Number),
+  'maximum': (Number, max, Number),
+  'minimum': (Number, min, Number),
+  'and_logic': (Boolean, operator.and_, Boolean),
+  'or_logic': (Boolean, operator.or_, Boolean),
+  'xor_logic': (Boolean, operator.xor, Boolean),
+  'is_equal': (Number, operator.eq, Boolean),
+  'is_not_equal': (Number, operator.ne, Boolean),
+}
+
+# Value method -> {value class: its function}, so a compiled operation finds the method of its
+# left operand with one dict lookup instead of getattr by name
+VALUE_CLASSES = (Noob, String, Number, Boolean, Function, Array)
+VALUE_METHODS = {
+  method: {value_class: getattr(value_class, method) for value_class in VALUE_CLASSES}
+  for method in (*ARITHMETIC_METHODS.values(), *BOOLEAN_METHODS.values(), *COMPARISON_METHODS.values())
+}
+
+# MAEK/IS NOW A type -> arguments of explicit_typecast
+TYPECAST_ARGUMENTS = {
+  'NUMBR': (Number,),
+  'NUMBAR': (Number, True),
+  'TROOF': (Boolean,),
+  'YARN': (String,),
+}
+
+
+class Failure(Exception):
+  """A runtime error raised out of a compiled closure"""
+  def __init__(self, error):
+    super().__init__(error)
+    self.error = error
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# COMPILER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+class ClosureCompiler:
+  # Node class -> compile_ function, filled in the first time each node class is compiled
+  handlers = {}
+
+  def __init__(self, filename='<stdin>', output=STANDARD_OUTPUT, input=STANDARD_INPUT, stats=None):
+    self.filename = filename
+    self.output = output
+    self.input = input
+    # A measured run (see stats.py) uses counting closures, compiled and cached apart from the
+    # others; they find the Stats in the context. While compiling them, the first statement of
+    # each loop body -> the loop's label
+    self.stats = stats
+    self.key = filename if stats is None else (filename, 'counting')
+    self.loop_heads = {}
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def run(self, node, context):
+    """Compile node (once per node and filename) and run it. Returns an RTResult like Interpreter.visit."""
+    try:
+      closure = node.closures[self.key]
+    except AttributeError:
+      node.closures = {}
+      closure = node.closures[self.key] = self.compile(node)
+    except KeyError:
+      closure = node.closures[self.key] = self.compile(node)
+
+    # A program and the calls it makes use this compiler's sink and source (closures are shared
+    # by every compiler of the filename, so they find them in the context)
+    program = node.__class__ is ProgramNode
+    if program:
+      context.output = self.output
+      context.input = self.input
+      context.stats = self.stats
+
+    res = RTResult()
+    try:
+      return res.success(closure(context))
+    except Failure as failure:
+      return res.failure(failure.error)
+    finally:
+      if program:
+        self.output.flush()
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile(self, node):
+    try:
+      handler = self.handlers[type(node)]
+    except KeyError:
+      handler = getattr(ClosureCompiler, f'compile_{type(node).__name__}', ClosureCompiler.no_compile_method)
+      self.handlers[type(node)] = handler
+    if self.stats is not None:
+      return self.counting(node, handler)
+    return handler(self, node)
+
+  def counting(self, node, handler):
+    """The closure of node, counting its runs (and those of a loop, for the first statement of its body)"""
+    cls = node.__class__
+    if cls is LoopNode and node.body_statements:
+      self.loop_heads[node.body_statements[0]] = node.label
+    closure = handler(self, node)
+    label = self.loop_heads.get(node)
+
+    if label is None:
+      def counted(context):
+        context.stats.visits[cls] += 1
+        return closure(context)
+    else:
+      def counted(context):
+        stats = context.stats
+        stats.visits[cls] += 1
+        stats.loops[label] += 1
+        return closure(context)
+    return counted
+
+  def compile_all(self, nodes):
+    return [self.compile(node) for node in nodes]
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def no_compile_method(self, node):
+    raise Exception(f'No compile_{type(node).__name__} method defined')
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_IntegerNode(self, node):
+    value = Number(int(node.token['value']), node.token['line'])
+    return lambda context: value
+
+  def compile_FloatNode(self, node):
+    value = Number(float(node.token['value']), node.token['line'])
+    return lambda context: value
+
+  def compile_BooleanNode(self, node):
+    value = Boolean(node.token['value'], node.token['line'])
+    return lambda context: value
+
+  def compile_StringNode(self, node):
+    value = String(node.token['value'], node.token['line'])
+    return lambda context: value
+
+  def compile_NoobNode(self, node):
+    value = Noob(node.line_number)
+    return lambda context: value
+
+  def compile_ConstantNode(self, node):
+    value = node.value
+    return lambda context: value
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def binary_operation(self, node, method, *argument):
+    """
+    Compile a binary operator applying the value method to its operands (passing argument, if
+    any, after the right operand). The method is bound here: the closure takes the fast path of
+    FAST_OPERATIONS when it can, and otherwise calls the left operand's method from VALUE_METHODS.
+    """
+    left = self.compile(node.left_node)
+    right = self.compile(node.right_node)
+    operand_class, apply, result_class = FAST_OPERATIONS.get(method, (None, None, None))
+    methods = VALUE_METHODS[method]
+    late = lambda value, *operands: getattr(value, method)(*operands)  # anything but a value
+
+    if argument:
+      argument, = argument
+      def run(context):
+        a = left(context)
+        b = right(context)
+        if a.__class__ is operand_class and b.__class__ is operand_class:
+          return result_class(apply(a.value, b.value)).set_context(a.context)
+        result, error = methods.get(a.__class__, late)(a, b, argument)
+        if error: raise Failure(error)
+        return result
+      return run
+
+    def run(context):
+      a = left(context)
+      b = right(context)
+      if a.__class__ is operand_class and b.__class__ is operand_class:
+        return result_class(apply(a.value, b.value)).set_context(a.context)
+      result, error = methods.get(a.__class__, late)(a, b)
+      if error: raise Failure(error)
+      return result
+    return run
+
+  def compile_ArithmeticBinaryOpNode(self, node):
+    method = ARITHMETIC_METHODS[node.operation['type']]
+    if method in ('added_by', 'multiplied_by'):
+      # SUM OF and PRODUKT OF take their line, for the errors of an elementwise UHS operation
+      return self.binary_operation(node, method, node.operation['line'])
+    return self.binary_operation(node, method)
+
+  def compile_BooleanBinaryOpNode(self, node):
+    return self.binary_operation(node, BOOLEAN_METHODS[node.operation['type']])
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_BooleanUnaryOpNode(self, node):
+    operand = self.compile(node.operand)
+
+    def run(context):
+      result, error = operand(context).not_logic()
+      if error: raise Failure(error)
+      return result
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_BooleanTernaryOpNode(self, node):
+    operands = self.compile_all(node.boolean_statements)
+    combine = {TokenType.ALL_OF: all, TokenType.ANY_OF: any}.get(node.operation['type'])
+
+    def run(context):
+      boolean_results = [operand(context) for operand in operands]
+      if combine is None:
+        return None
+      return Boolean(combine([boolean.value for boolean in boolean_results]))
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ComparisonOpNode(self, node):
+    return self.binary_operation(node, COMPARISON_METHODS[node.operation['type']], node.operation)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_StringConcatNode(self, node):
+    operands = self.compile_all(node.operands)
+
+    def run(context):
+      string_value = ""
+      for operand in operands:
+        # Perform implicit typecasting to String
+        operand_value, error = operand(context).typecast(String)
+        if error: raise Failure(error)
+        string_value += operand_value.value
+      return String(string_value)
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_VarAccessNode(self, node):
+    token = node.var_name_token
+    var_name = token['value']
+    filename = self.filename
+
+    def run(context):
+      symbol_table = context.symbol_table
+      slot = symbol_table.slots.get(var_name)
+      value = symbol_table.values[slot] if slot is not None else UNDEFINED
+      if value is UNDEFINED:
+        raise Failure(RuntimeError(token, f"Variable '{var_name}' is not defined.\nMake sure you declared it with 'I HAS A {var_name}' before using it.", filename))
+      return value if value is not None else symbol_table.get(var_name)
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_VarDeclarationNode(self, node):
+    var_name = node.var_name_token['value']
+
+    # If no value is provided, initialize with NOOB
+    if node.value_node is None:
+      def run(context):
+        value = Noob()
+        context.symbol_table.set(var_name, value)
+        return value
+      return run
+
+    value_node = self.compile(node.value_node)
+
+    def run(context):
+      value = value_node(context)
+      context.symbol_table.set(var_name, value)
+      return value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_VarAssignmentNode(self, node):
+    var_to_access = node.var_to_access
+    var_name = var_to_access['value']
+    value_to_assign = self.compile(node.value_to_assign)
+    filename = self.filename
+
+    def undefined():
+      return Failure(RuntimeError(var_to_access, f"Cannot assign to undefined variable '{var_name}'.\nDeclare it first with 'I HAS A {var_name}'.", filename))
+
+    def run(context):
+      symbol_table = context.symbol_table
+      try:
+        value = value_to_assign(context)
+      except Failure:
+        # The tree-walker checks the variable before the value's error, and stores the
+        # missing value anyway
+        if not symbol_table.found(var_name): raise undefined()
+        symbol_table.set(var_name, None)
+        raise
+      slot = symbol_table.slots.get(var_name)
+      if slot is None or symbol_table.values[slot] is UNDEFINED: raise undefined()
+      symbol_table.values[slot] = value
+      return value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_StatementListNode(self, node):
+    statements = self.compile_all(node.statements)
+
+    def run(context):
+      for statement in statements:
+        implicit_value = statement(context)
+        # Only update IT with actual values, not with None or control flow markers
+        if implicit_value is not None and not isinstance(implicit_value, (Break, Return)):
+          context.symbol_table.set('IT', implicit_value)
+      return None
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_VarDecListNode(self, node):
+    declarations = self.compile_all(node.variable_declarations)
+
+    def run(context):
+      for declaration in declarations:
+        declaration(context)
+      return None
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_PrintNode(self, node):
+    operands = self.compile_all(node.operands)
+    end = '' if node.suppress_newline else '\n'
+
+    def run(context):
+      context.output.write(''.join([str(operand(context)) for operand in operands]) + end)
+      # VISIBLE does not update IT variable
+      return None
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_TypecastNode(self, node):
+    source_value = self.compile(node.source_value)
+    arguments = TYPECAST_ARGUMENTS[node.desired_type]
+
+    def run(context):
+      converted_value, error = source_value(context).explicit_typecast(*arguments)
+      if error: raise Failure(error)
+      return converted_value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_SwitchCaseNode(self, node):
+    cases = list(zip(self.compile_all(node.cases), map(self.compile_all, node.cases_statements)))
+    default_case_statements = self.compile_all(node.default_case_statements)
+
+    def run(context):
+      basis = context.symbol_table.get('IT')
+      for case, statements in cases:
+        condition, error = basis.is_equal(case(context))
+        if error: raise Failure(error)
+
+        if condition.value:
+          for statement in statements:
+            if isinstance(statement(context), Break):
+              break
+          return basis
+
+      for statement in default_case_statements:
+        statement(context)
+      return basis
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_IfNode(self, node):
+    if_block_statements = self.compile_all(node.if_block_statements)
+    else_block_statements = self.compile_all(node.else_block_statements)
+    mebbe_cases = [(self.compile(condition), self.compile_all(statements)) for condition, statements in node.mebbe_cases]
+
+    def run(context):
+      basis = context.symbol_table.get('IT')
+      basis_value, error = basis.typecast(Boolean)
+      if error: raise Failure(error)
+
+      if basis_value.value:
+        block = if_block_statements
+      else:
+        # The first MEBBE whose condition is true, else NO WAI
+        block = else_block_statements
+        for condition, statements in mebbe_cases:
+          condition_bool, error = condition(context).typecast(Boolean)
+          if error: raise Failure(error)
+          if condition_bool.value:
+            block = statements
+            break
+
+      for statement in block:
+        statement_value = statement(context)
+        # Early return or break
+        if isinstance(statement_value, (Return, Break)):
+          return statement_value
+      return basis
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_LoopNode(self, node):
+    variable = node.variable
+    var_name = variable['value']
+    step = 1 if node.operation['type'] == TokenType.UPPIN else -1
+    body_statements = self.compile_all(node.body_statements)
+    filename = self.filename
+
+    condition = None
+    if node.clause_type and node.til_wile_expression is not None:
+      condition = self.compile(node.til_wile_expression)
+    # TIL repeats while the condition is FAIL, WILE while it is WIN
+    stop_when = {TokenType.TIL: True, TokenType.WILE: False}.get(node.clause_type)
+
+    def run(context):
+      symbol_table = context.symbol_table
+      if not symbol_table.found(var_name):
+        raise Failure(RuntimeError(variable, f"Loop variable '{var_name}' must be declared before the loop", context))
+      # Slots never move, so the counter's can be looked up once
+      slot = symbol_table.slots[var_name]
+      values = symbol_table.values
+
+      while True:
+        # Check termination condition BEFORE executing the body
+        if condition is not None:
+          termination_condition_bool, error = condition(context).typecast(Boolean)
+          if error: raise Failure(error)
+          if termination_condition_bool.value == stop_when:
+            return None
+
+        for statement in body_statements:
+          statement_value = statement(context)
+          if statement_value is not None and not isinstance(statement_value, (Break, Return)):
+            symbol_table.set('IT', statement_value)
+          elif isinstance(statement_value, Break):
+            return None
+
+        iterator = values[slot]
+        if iterator is None:
+          iterator = symbol_table.get(var_name)
+        if iterator is None:
+          raise Failure(RuntimeError(variable, f"Cannot store input in undefined variable '{var_name}'.\nDeclare it first with 'I HAS A {var_name}'.", filename))
+        iterator, error = iterator.typecast(Number)
+        if error: raise Failure(error)
+        values[slot] = Number(iterator.value + step)
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_FuncDefNode(self, node):
+    function_name = node.function_name['value']
+    params = [param.var_name_token['value'] for param in node.parameters]
+    body_statements = node.body_statements
+    # Every call's symbol table starts with a slot for each name the body can define
+    scope = Scope(params + defined_names(body_statements) + ['IT'])
+    mark_function(node)
+    reusable = node.reusable
+
+    def run(context):
+      function_value = Function(function_name, list(params), body_statements).set_context(context)
+      # Calls run the body with this engine too
+      function_value.engine = 'closure'
+      function_value.scope = scope
+      function_value.reusable = reusable
+      context.symbol_table.set(function_name, function_value)
+      return function_value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_FuncCallNode(self, node):
+    function_name = self.compile(node.function_name)
+    parameters = self.compile_all(node.parameters)
+
+    def run(context):
+      function_to_call = function_name(context)
+      result = function_to_call.execute([param(context) for param in parameters])
+      if result.error: raise Failure(result.error)
+      return result.value if result.value is not None else Noob()
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def array_index(self, node, index_expr):
+    """Closure evaluating index_expr to the integer index of an array element."""
+    index_expr = self.compile(index_expr)
+    token = node.array_name_token
+    filename = self.filename
+
+    def run(context):
+      index_number, error = index_expr(context).typecast(Number)
+      if error: raise Failure(error)
+      if not Number.is_integer(index_number.value):
+        raise Failure(RuntimeError(token, f"Array index must be an integer. Got {index_number.value}", filename))
+      return int(index_number.value)
+    return run
+
+  def array_lookup(self, node):
+    """Closure returning the Array named by node.array_name_token."""
+    token = node.array_name_token
+    array_name = token['value']
+    filename = self.filename
+
+    def run(context):
+      array = context.symbol_table.get(array_name)
+      if array is None:
+        raise Failure(RuntimeError(token, f"Array '{array_name}' is not defined", filename))
+      if not isinstance(array, Array):
+        raise Failure(RuntimeError(token, f"'{array_name}' is not an array", filename))
+      return array
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayDeclarationNode(self, node):
+    token = node.array_name_token
+    var_name = token['value']
+    element_type = node.element_type
+    size_expr = self.compile(node.size_expr)
+    filename = self.filename
+
+    def run(context):
+      size_number, error = size_expr(context).typecast(Number)
+      if error: raise Failure(error)
+      if not Number.is_integer(size_number.value) or size_number.value <= 0:
+        raise Failure(RuntimeError(token, f"Array size must be a positive integer. Got {size_number.value}", filename))
+
+      array = Array(element_type, int(size_number.value), token['line'])
+      array.set_context(context)
+      context.symbol_table.set(var_name, array)
+      return array
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayAccessNode(self, node):
+    lookup = self.array_lookup(node)
+    index = self.array_index(node, node.index_expr)
+
+    def run(context):
+      array = lookup(context)
+      element, error = array.get(index(context))
+      if error: raise Failure(error)
+      return element
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayConfineNode(self, node):
+    lookup = self.array_lookup(node)
+    value_expr = self.compile(node.value_expr)
+    index = self.array_index(node, node.index_expr)
+
+    def run(context):
+      array = lookup(context)
+      value = value_expr(context)
+      result, error = array.set(index(context), value)
+      if error: raise Failure(error)
+      return result
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayDischargeNode(self, node):
+    lookup = self.array_lookup(node)
+    index = self.array_index(node, node.index_expr)
+
+    def run(context):
+      array = lookup(context)
+      removed_value, error = array.remove(index(context))
+      if error: raise Failure(error)
+      return removed_value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayFillNode(self, node):
+    lookup = self.array_lookup(node)
+    value_expr = self.compile(node.value_expr)
+    line = node.array_name_token['line']
+
+    def run(context):
+      array = lookup(context)
+      result, error = array.fill(value_expr(context), line)
+      if error: raise Failure(error)
+      return result
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArraySliceNode(self, node):
+    lookup = self.array_lookup(node)
+    start = self.array_index(node, node.start_expr)
+    end = self.array_index(node, node.end_expr)
+    line = node.array_name_token['line']
+
+    def run(context):
+      array = lookup(context)
+      result, error = array.slice(start(context), end(context), line)
+      if error: raise Failure(error)
+      return result
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ArrayReduceNode(self, node):
+    array_expr = self.compile(node.array_expr)
+    method = ARITHMETIC_METHODS[node.operation['type']]
+    token = node.operation
+    filename = self.filename
+
+    def run(context):
+      array = array_expr(context)
+      if not isinstance(array, Array):
+        raise Failure(RuntimeError(token, f"{token['value']} UHS needs an array. Got {array.__class__.__name__}", filename))
+      result, error = array.reduced_by(method, token['line'])
+      if error: raise Failure(error)
+      return result
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_InputNode(self, node):
+    token = node.variable.var_name_token
+    var_name = token['value']
+    filename = self.filename
+
+    def run(context):
+      if not context.symbol_table.found(var_name):
+        raise Failure(RuntimeError(('Var Access Error', None, token['line']), f"Can't find a variable named '{var_name}'", filename))
+      # GIMMEH always reads a YARN, after showing any output still buffered
+      context.output.flush()
+      value = String(context.input.readline(), token['line'])
+      context.symbol_table.set(var_name, value)
+      return value
+    return run
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_BreakNode(self, node):
+    break_value = node.break_token['value']
+    return lambda context: Break(break_value).set_context(context)
+
+  def compile_ReturnNode(self, node):
+    if getattr(node, 'tail_call', False):
+      # Function.execute makes the call in place of the one returning
+      function_name = self.compile(node.return_expression.function_name)
+      parameters = self.compile_all(node.return_expression.parameters)
+      return lambda context: TailCall(function_name(context), [param(context) for param in parameters]).set_context(context)
+    return_expression = self.compile(node.return_expression)
+    return lambda context: Return(return_expression(context)).set_context(context)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def compile_ProgramNode(self, node):
+    sections = self.compile_all(node.sections)
+
+    def run(context):
+      for section in sections:
+        section(context)
+      return None
+    return run
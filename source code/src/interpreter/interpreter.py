@@ -2,58 +2,196 @@ from src.lexer.tokenizer import TokenType
 from src.parser import *
 from .runtime import *
 from .values import *
+from .closure import ClosureCompiler
+from .optimizer import ConstantNode
+from .resolver import resolve
+from .streams import STANDARD_INPUT, STANDARD_OUTPUT
+from src.parser.serialize import NODE_FIELDS
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# HELPERS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+def constant(make_value):
+  """
+  Decorator for the visit method of a node that cannot fail: make_value(self, node, context)
+  returns the node's value, which is computed once and then returned as a ConstantResult.
+  """
+  def visit(self, node, context):
+    try:
+      return node.constant_result
+    except AttributeError:
+      result = node.constant_result = ConstantResult(make_value(self, node, context))
+      return result
+  visit.__name__ = make_value.__name__
+  return visit
+
+# Nodes whose value depends only on the variables they read: no calls, arrays or input
+PURE_NODES = (
+  IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode, ConstantNode, VarAccessNode,
+  ArithmeticBinaryOpNode, BooleanBinaryOpNode, BooleanUnaryOpNode, BooleanTernaryOpNode,
+  ComparisonOpNode, StringConcatNode, TypecastNode,
+)
+
+def subnodes(node):
+  """node (a node or a list of them) and every node below it"""
+  stack = [node]
+  while stack:
+    node = stack.pop()
+    if isinstance(node, (list, tuple)):
+      stack.extend(node)
+    elif type(node) in NODE_FIELDS:
+      yield node
+      stack.extend(getattr(node, name) for name in NODE_FIELDS[type(node)])
+    elif isinstance(node, ConstantNode):
+      yield node
+
+def written_names(nodes):
+  """Names of the variables a statement among nodes may set (always including IT)"""
+  names = {'IT'}
+  for node in nodes:
+    if isinstance(node, VarDeclarationNode): names.add(node.var_name_token['value'])
+    elif isinstance(node, VarAssignmentNode): names.add(node.var_to_access['value'])
+    elif isinstance(node, LoopNode): names.add(node.variable['value'])
+    elif isinstance(node, InputNode): names.add(node.variable.var_name_token['value'])
+    elif isinstance(node, ArrayDeclarationNode): names.add(node.array_name_token['value'])
+    elif isinstance(node, FuncDefNode): names.add(node.function_name['value'])
+  return names
+
+def counted_loop(node):
+  """
+  How to run a LoopNode on the counted fast path (see Interpreter.run_counted_loop), or None.
+  It must compare its variable with BOTH SAEM or DIFFRINT to a pure bound that neither the body
+  nor the variable itself changes, and its body must not GTFO, FOUND YR or set the variable.
+  Returns (bound node, whether it stops when the variable equals the bound, whether the body
+  may read the variable, directly or through a function call).
+  """
+  condition, name = node.til_wile_expression, node.variable['value']
+  if not node.clause_type or not isinstance(condition, ComparisonOpNode):
+    return None
+  is_counter = lambda side: isinstance(side, VarAccessNode) and side.var_name_token['value'] == name
+  if is_counter(condition.left_node):
+    bound = condition.right_node
+  elif is_counter(condition.right_node):
+    bound = condition.left_node
+  else:
+    return None
+
+  body = list(subnodes(node.body_statements))
+  if any(isinstance(statement, (BreakNode, ReturnNode)) for statement in body):
+    return None
+  changing = written_names(body)
+  if name in changing:
+    return None
+  changing.add(name)
+  for part in subnodes(bound):
+    if not isinstance(part, PURE_NODES):
+      return None
+    if isinstance(part, VarAccessNode) and part.var_name_token['value'] in changing:
+      return None
+
+  stop_when_equal = (condition.operation['type'] == TokenType.BOTH_SAEM) == (node.clause_type == TokenType.TIL)
+  reads_counter = any(
+    isinstance(statement, (FuncCallNode, FuncDefNode))
+    or (isinstance(statement, VarAccessNode) and statement.var_name_token['value'] == name)
+    or getattr(statement, 'array_name_token', {'value': None})['value'] == name
+    for statement in body
+  )
+  return bound, stop_when_equal, reads_counter
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 # INTERPRETER
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 class Interpreter:
-  def __init__(self, filename='<stdin>'):
+  # Node class -> visit_ function, filled in the first time each node class is visited
+  handlers = {}
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls.handlers = {}
+
+  # 'tree' walks the AST on every visit; 'closure' compiles each node once into a Python closure;
+  # 'vm' compiles the program to bytecode for src.vm
+  ENGINES = ('tree', 'closure', 'vm')
+
+  def __init__(self, filename='<stdin>', engine='tree', max_depth=None, output=None, input=None, stats=None):
+    if engine not in self.ENGINES:
+      raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(self.ENGINES)}")
+    if max_depth is not None and engine != 'vm':
+      # The other engines nest calls on Python's stack, so Python's recursion limit bounds them
+      raise ValueError(f"max_depth only applies to the vm engine, not '{engine}'")
     self.filename = filename
+    self.engine = engine
+    # Sink of the VISIBLE output of the programs this interpreter runs (see streams.py)
+    self.output = output if output is not None else STANDARD_OUTPUT
+    # and source of what their GIMMEHs read
+    self.input = input if input is not None else STANDARD_INPUT
+    # Counters of what they do, when they are being measured (see stats.py)
+    self.stats = stats
+    if stats is not None:
+      stats.engine = engine
+    if engine == 'closure':
+      self.visit = ClosureCompiler(filename, self.output, self.input, stats).run
+    elif engine == 'vm':
+      from src.vm.machine import VirtualMachine
+      # The VM runs calls without recursing, up to max_depth of them nested
+      self.visit = VirtualMachine(filename, max_depth, self.output, self.input, stats).run
+    elif stats is not None:
+      self.visit = stats.counting_visit(self.visit)
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit(self, node, context):
-    method_name = f'visit_{type(node).__name__}'
-    method = getattr(self, method_name, self.no_visit_method)
-    return method(node, context)
+    try:
+      handler = self.handlers[type(node)]
+    except KeyError:
+      handler = self.handler_for(type(node))
+    return handler(self, node, context)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @classmethod
+  def handler_for(cls, node_class):
+    handler = getattr(cls, f'visit_{node_class.__name__}', cls.no_visit_method)
+    cls.handlers[node_class] = handler
+    return handler
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def no_visit_method(self, node, context):
     raise Exception(f'No visit_{type(node).__name__} method defined')
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
   def visit_IntegerNode(self, node, context):
     # print("Found integer node")
-    return RTResult().success(
-      Number(int(node.token['value']), node.token['line'])
-    )
+    return Number(int(node.token['value']), node.token['line'])
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
   def visit_FloatNode(self, node, context):
     # print("Found float node")
-    return RTResult().success(
-      Number(float(node.token['value']), node.token['line'])
-    )
+    return Number(float(node.token['value']), node.token['line'])
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
   def visit_BooleanNode(self, node, context):
     # print("Found boolean node")
-    return RTResult().success(
-      Boolean(node.token['value'], node.token['line'])
-    )
+    return Boolean(node.token['value'], node.token['line'])
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
   def visit_StringNode(self, node, context):
     # print("Found string node")
     # Quotes are already stripped by the tokenizer
-    return RTResult().success(
-      String(node.token['value'], node.token['line'])
-    )
+    return String(node.token['value'], node.token['line'])
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
   def visit_NoobNode(self, node, context):
-    return RTResult().success(
-      Noob(node.line_number)
-    )    
+    return Noob(node.line_number)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @constant
+  def visit_ConstantNode(self, node, context):
+    # An expression folded by optimizer.py
+    return node.value
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_ArithmeticBinaryOpNode(self, node, context):
@@ -64,14 +202,15 @@ class Interpreter:
     right = res.register(self.visit(node.right_node, context))
     if res.error: return res
 
+    # (SUM OF and PRODUKT OF take their line, for the errors of an elementwise UHS operation)
     if node.operation['type'] == TokenType.SUM_OF:
-      result, error = left.added_by(right)
+      result, error = left.added_by(right, node.operation['line'])
 
     elif node.operation['type'] == TokenType.DIFF_OF:
       result, error = left.subtracted_by(right)
     
     elif node.operation['type'] == TokenType.PRODUKT_OF:
-      result, error = left.multiplied_by(right) 
+      result, error = left.multiplied_by(right, node.operation['line'])
 
     elif node.operation['type'] == TokenType.QUOSHUNT_OF:
       result, error = left.divided_by(right)
@@ -183,12 +322,20 @@ class Interpreter:
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_VarAccessNode(self, node, context):
     res = RTResult()
-    var_name = node.var_name_token['value']
+    table = context.symbol_table
+    # Nodes resolved for this frame's scope know their slot (see resolver.py)
+    if getattr(node, 'scope', False) is table.scope:
+      slot = node.slot
+    else:
+      slot = table.slots.get(node.var_name_token['value'])
 
-    if not context.symbol_table.found(var_name):
+    value = table.values[slot] if slot is not None else UNDEFINED
+    if value is UNDEFINED:
+      var_name = node.var_name_token['value']
       return res.failure(RuntimeError(node.var_name_token, f"Variable '{var_name}' is not defined.\nMake sure you declared it with 'I HAS A {var_name}' before using it.", self.filename))
     
-    value = context.symbol_table.get(var_name)
+    if value is None:
+      value = table.get(node.var_name_token['value'])
     return res.success(value)
 
   # ───────────────────────────────────────────────────────────────────────────────────────────────
@@ -199,13 +346,15 @@ class Interpreter:
     # If no value is provided, initialize with NOOB
     if node.value_node is None: 
       value = Noob()
-      context.symbol_table.set(var_name, value)
-      return res.success(value)
-
-    value = res.register(self.visit(node.value_node, context))
-    if res.error: return res
+    else:
+      value = res.register(self.visit(node.value_node, context))
+      if res.error: return res
 
-    context.symbol_table.set(var_name, value)
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      table.store(node.slot, value)
+    else:
+      table.set(var_name, value)
     return res.success(value)
 
   # ───────────────────────────────────────────────────────────────────────────────────────────────
@@ -215,10 +364,16 @@ class Interpreter:
     var_to_access = node.var_to_access
     value_to_assign = res.register(self.visit(node.value_to_assign, context))
 
-    if not context.symbol_table.found(var_to_access['value']):
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      slot = node.slot
+    else:
+      slot = table.slots.get(var_to_access['value'])
+
+    if slot is None or table.values[slot] is UNDEFINED:
       return res.failure(RuntimeError(var_to_access, f"Cannot assign to undefined variable '{var_to_access['value']}'.\nDeclare it first with 'I HAS A {var_to_access['value']}'.", self.filename))
 
-    context.symbol_table.set(var_to_access['value'], value_to_assign)
+    table.values[slot] = value_to_assign
     return res.success(value_to_assign)
 
   # ───────────────────────────────────────────────────────────────────────────────────────────────
@@ -243,18 +398,17 @@ class Interpreter:
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_PrintNode(self, node, context):
     res = RTResult()
-    print_value = ""
+    parts = []
 
     for operand in node.operands:
       operand_value = res.register(self.visit(operand, context))
       if res.error: return res
-      print_value += str(operand_value)
+      parts.append(str(operand_value))
     
     # Print with or without newline based on suppress_newline flag
-    if node.suppress_newline:
-      print(print_value, end='')
-    else:
-      print(print_value)
+    if not node.suppress_newline:
+      parts.append('\n')
+    context.output.write(''.join(parts))
 
     # VISIBLE does not update IT variable, so return None
     return res.success(None)
@@ -379,15 +533,27 @@ class Interpreter:
     
     # Get the variable name from the token
     var_name = variable['value']
+    table = context.symbol_table
+    slot = node.slot if getattr(node, 'scope', False) is table.scope else table.slots.get(var_name)
     
     # Validate that the loop variable exists before starting the loop
-    if not context.symbol_table.found(var_name):
+    if slot is None or table.values[slot] is UNDEFINED:
       return res.failure(RuntimeError(
         variable,
         f"Loop variable '{var_name}' must be declared before the loop",
         context
       ))
 
+    # Counting up or down to a fixed bound, the common case, has its own path
+    try:
+      counted = node.counted
+    except AttributeError:
+      counted = node.counted = counted_loop(node)
+    if counted is not None:
+      result = self.run_counted_loop(node, counted, context, slot)
+      if result is not None:
+        return result
+
     # Proceed to the loop
     is_running = True
     while is_running:
@@ -433,7 +599,9 @@ class Interpreter:
         break
       
       # Incrementor/Decrementor - directly update the value in the symbol table
-      iterator = context.symbol_table.get(var_name)
+      iterator = table.values[slot]
+      if iterator is None:
+        iterator = table.get(var_name)
       if iterator is None:
         return res.failure(RuntimeError(variable, f"Cannot store input in undefined variable '{var_name}'.\nDeclare it first with 'I HAS A {var_name}'.", self.filename))
       
@@ -448,11 +616,51 @@ class Interpreter:
         new_value = Number(iterator.value - 1)
       
       # Set the new value in the symbol table
-      context.symbol_table.set(var_name, new_value)
+      table.values[slot] = new_value
 
     # Loops don't produce a meaningful value, so don't modify IT
     return res.success(None)
 
+  def run_counted_loop(self, node, counted, context, slot):
+    """
+    visit_LoopNode for a loop counted_loop accepted. The bound is evaluated once, and the
+    variable is kept as a plain number, stored back as a Number after every step only if the
+    body may read it and otherwise once the loop ends. Returns None, having run nothing, if the
+    variable or the bound is not a Number; the generic path then reports the error.
+    """
+    res = RTResult()
+    bound_node, stop_when_equal, reads_counter = counted
+    table = context.symbol_table
+    counter = table.values[slot]
+    if counter.__class__ is not Number:
+      return None
+    bound = res.register(self.visit(bound_node, context))
+    if res.error: return res
+    if bound.__class__ is not Number:
+      return None
+
+    value, bound = counter.value, bound.value
+    step = 1 if node.operation['type'] == TokenType.UPPIN else -1
+    body_statements = node.body_statements
+    moved = False
+    while (value == bound) != stop_when_equal:
+      for statement in body_statements:
+        statement_value = res.register(self.visit(statement, context))
+        if res.error: break
+        # Update IT with the statement result (the body has no GTFO or FOUND YR)
+        if statement_value is not None:
+          table.set('IT', statement_value)
+      if res.error: break
+      value += step
+      moved = True
+      if reads_counter:
+        table.values[slot] = Number(value)
+
+    if moved and not reads_counter:
+      table.values[slot] = Number(value)
+    if res.error: return res
+    return res.success(None)
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_FuncDefNode(self, node, context):
     res = RTResult()
@@ -469,6 +677,9 @@ class Interpreter:
     body_statements = node.body_statements
     
     function_value = Function(function_name, params, body_statements).set_context(context)
+    # Calls get a frame laid out for the body (see resolver.py)
+    function_value.scope = getattr(node, 'body_scope', None)
+    function_value.reusable = getattr(node, 'reusable', False)
     
     context.symbol_table.set(function_name, function_value)
     return res.success(function_value)
@@ -525,7 +736,11 @@ class Interpreter:
     array.set_context(context)
     
     # Store in symbol table
-    context.symbol_table.set(var_name, array)
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      table.store(node.slot, array)
+    else:
+      table.set(var_name, array)
     
     return res.success(array)
 
@@ -535,7 +750,11 @@ class Interpreter:
     array_name = node.array_name_token['value']
     
     # Get the array from symbol table
-    array = context.symbol_table.get(array_name)
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      array = table.lookup(node.slot, node.outer, array_name)
+    else:
+      array = table.get(array_name)
     if array is None:
       return res.failure(RuntimeError(
         node.array_name_token,
@@ -581,7 +800,11 @@ class Interpreter:
     array_name = node.array_name_token['value']
     
     # Get the array from symbol table
-    array = context.symbol_table.get(array_name)
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      array = table.lookup(node.slot, node.outer, array_name)
+    else:
+      array = table.get(array_name)
     if array is None:
       return res.failure(RuntimeError(
         node.array_name_token,
@@ -631,7 +854,11 @@ class Interpreter:
     array_name = node.array_name_token['value']
     
     # Get the array from symbol table
-    array = context.symbol_table.get(array_name)
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      array = table.lookup(node.slot, node.outer, array_name)
+    else:
+      array = table.get(array_name)
     if array is None:
       return res.failure(RuntimeError(
         node.array_name_token,
@@ -671,27 +898,130 @@ class Interpreter:
     
     return res.success(removed_value)
 
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_ArrayFillNode(self, node, context):
+    res = RTResult()
+    array_name = node.array_name_token['value']
+    
+    # Get the array from symbol table
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      array = table.lookup(node.slot, node.outer, array_name)
+    else:
+      array = table.get(array_name)
+    if array is None:
+      return res.failure(RuntimeError(
+        node.array_name_token,
+        f"Array '{array_name}' is not defined",
+        self.filename
+      ))
+    
+    # Check if it's actually an array
+    if not isinstance(array, Array):
+      return res.failure(RuntimeError(
+        node.array_name_token,
+        f"'{array_name}' is not an array",
+        self.filename
+      ))
+    
+    # Evaluate value expression
+    value = res.register(self.visit(node.value_expr, context))
+    if res.error: return res
+    
+    # Set every element (CONFINE without AT)
+    result, error = array.fill(value, node.array_name_token['line'])
+    if error: return res.failure(error)
+    
+    return res.success(result)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_ArraySliceNode(self, node, context):
+    res = RTResult()
+    array_name = node.array_name_token['value']
+    
+    # Get the array from symbol table
+    table = context.symbol_table
+    if getattr(node, 'scope', False) is table.scope:
+      array = table.lookup(node.slot, node.outer, array_name)
+    else:
+      array = table.get(array_name)
+    if array is None:
+      return res.failure(RuntimeError(
+        node.array_name_token,
+        f"Array '{array_name}' is not defined",
+        self.filename
+      ))
+    
+    # Check if it's actually an array
+    if not isinstance(array, Array):
+      return res.failure(RuntimeError(
+        node.array_name_token,
+        f"'{array_name}' is not an array",
+        self.filename
+      ))
+    
+    # Evaluate both ends like an index
+    bounds = []
+    for index_expr in (node.start_expr, node.end_expr):
+      index_value = res.register(self.visit(index_expr, context))
+      if res.error: return res
+      
+      index_number, error = index_value.typecast(Number)
+      if error: return res.failure(error)
+      
+      if not Number.is_integer(index_number.value):
+        return res.failure(RuntimeError(
+          node.array_name_token,
+          f"Array index must be an integer. Got {index_number.value}",
+          self.filename
+        ))
+      bounds.append(int(index_number.value))
+    
+    # Copy the elements into a new array
+    result, error = array.slice(*bounds, node.array_name_token['line'])
+    if error: return res.failure(error)
+    
+    return res.success(result)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_ArrayReduceNode(self, node, context):
+    res = RTResult()
+    array = res.register(self.visit(node.array_expr, context))
+    if res.error: return res
+    
+    if not isinstance(array, Array):
+      return res.failure(RuntimeError(
+        node.operation,
+        f"{node.operation['value']} UHS needs an array. Got {array.__class__.__name__}",
+        self.filename
+      ))
+    
+    if node.operation['type'] == TokenType.SUM_OF:
+      result, error = array.reduced_by('added_by', node.operation['line'])
+    
+    elif node.operation['type'] == TokenType.BIGGR_OF:
+      result, error = array.reduced_by('maximum', node.operation['line'])
+    
+    elif node.operation['type'] == TokenType.SMALLR_OF:
+      result, error = array.reduced_by('minimum', node.operation['line'])
+    
+    if error: return res.failure(error)
+    return res.success(result)
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_InputNode(self, node, context):
     res = RTResult()
     variable = node.variable
 
     # Check if the variable is defined in the symbol table
-    if context.symbol_table.found(variable.var_name_token['value']):
-      # Get user input directly using input() function
-      user_input_value = str(input())
+    table = context.symbol_table
+    if table.found(variable.var_name_token['value']):
+      # Read a line from the context's input source, after showing any output still buffered
+      context.output.flush()
 
       # GIMMEH should return YARN by default (as per specifications)
-      user_input_token = {
-        'type': TokenType.STRING,
-        'value': user_input_value,
-        'line': variable.var_name_token['line'],
-        'col': 0
-      }
-      user_input = StringNode(user_input_token)
-
-      # Assign the user input to the variable in the symbol table
-      value = res.register(self.visit(VarAssignmentNode(variable.var_name_token, user_input), context))
+      value = String(context.input.readline(), variable.var_name_token['line'])
+      table.values[table.slots[variable.var_name_token['value']]] = value
     else:
       # If the variable is not defined, return an error
       return res.failure(RuntimeError(
@@ -710,7 +1040,17 @@ class Interpreter:
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_ReturnNode(self, node, context):
     res = RTResult()
-    
+    if getattr(node, 'tail_call', False):
+      # Function.execute makes the call in place of the one returning (see resolver.tail_calls)
+      call = node.return_expression
+      function_to_call = res.register(self.visit(call.function_name, context))
+      if res.error: return res
+      parameters_to_pass = []
+      for param in call.parameters:
+        parameters_to_pass.append(res.register(self.visit(param, context)))
+        if res.error: return res
+      return res.success(TailCall(function_to_call, parameters_to_pass).set_context(context))
+
     return_value = res.register(self.visit(node.return_expression, context))
     if res.error: return res
     
@@ -719,7 +1059,25 @@ class Interpreter:
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_ProgramNode(self, node, context):
     res = RTResult()
-    for section in node.sections:
-        section_ = res.register(self.visit(section, context))
-        if res.error: return res
-    return res.success(None)
\ No newline at end of file
+    # Resolve the program for the names already in the symbol table (once per filename and
+    # set of names) and lay the table out for it
+    table = context.symbol_table
+    key = (self.filename, tuple(table.names))
+    scope = getattr(node, 'scope', None)
+    if scope is None or node.resolved_for != key:
+      scope = node.scope = resolve(node, self.filename, table.names)
+      node.resolved_for = key
+    if table.scope is not scope:
+      table.adopt(scope)
+
+    # The program and the calls it makes use this interpreter's sink, source and counters
+    context.output = self.output
+    context.input = self.input
+    context.stats = self.stats
+    try:
+      for section in node.sections:
+          section_ = res.register(self.visit(section, context))
+          if res.error: return res
+      return res.success(None)
+    finally:
+      self.output.flush()
\ No newline at end of file
@@ -0,0 +1,203 @@
+from src.parser.parser import *
+from src.parser.serialize import NODE_FIELDS
+from .closure import ARITHMETIC_METHODS, BOOLEAN_METHODS, COMPARISON_METHODS, TYPECAST_ARGUMENTS
+from .values import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPTIMIZER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# An optional pass between parsing and running a program (main.py -O). It rewrites the AST in
+# place:
+#
+#   Folding. An expression whose operands are all literals (or already folded) is replaced by a
+#   ConstantNode holding the Value the interpreter would compute, which is computed by calling
+#   the same values.py methods. If that gives an error (QUOSHUNT OF 1 AN 0, SUM OF "a" AN 1, ...)
+#   or raises, the expression is left as it is, so the error still happens at runtime, and only
+#   if the program gets there.
+#
+#   Dead branches. An O RLY? right after a statement whose value is a constant (in a statement
+#   list that stores each value in IT) always takes the same branch; the others are dropped. So
+#   are MEBBE cases whose condition is a constant FAIL, and everything after one that is a
+#   constant WIN.
+
+
+class ConstantNode:
+  """A folded expression, whose value is always value"""
+  def __init__(self, value):
+    self.value = value
+
+  def __repr__(self):
+    return f"Constant({self.value!r})"
+
+
+# Literal node class -> its Value, exactly as the interpreter builds it
+LITERALS = {
+  IntegerNode: lambda node: Number(int(node.token['value']), node.token['line']),
+  FloatNode: lambda node: Number(float(node.token['value']), node.token['line']),
+  BooleanNode: lambda node: Boolean(node.token['value'], node.token['line']),
+  StringNode: lambda node: String(node.token['value'], node.token['line']),
+  NoobNode: lambda node: Noob(node.line_number),
+}
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPTIMIZER PASS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+class Optimizer:
+  # Node class -> optimize_ method, or None for nodes that only need their children optimized
+  handlers = {}
+
+  def optimize(self, node):
+    """The optimized node: node itself, rewritten in place, or the node replacing it"""
+    if isinstance(node, list):
+      node[:] = [self.optimize(item) for item in node]
+      return node
+    if isinstance(node, tuple):
+      return tuple(self.optimize(item) for item in node)
+    try:
+      handler = self.handlers[type(node)]
+    except KeyError:
+      handler = self.handlers[type(node)] = getattr(Optimizer, f'optimize_{type(node).__name__}', None)
+    if handler is not None:
+      return handler(self, node)
+    for name in NODE_FIELDS.get(type(node), ()):
+      setattr(node, name, self.optimize(getattr(node, name)))
+    return node
+
+  def constant(self, node):
+    """The Value of node if it is a literal or a folded expression, else None"""
+    if isinstance(node, ConstantNode):
+      return node.value
+    literal = LITERALS.get(type(node))
+    return literal(node) if literal is not None else None
+
+  def fold(self, node, operands, evaluate):
+    """ConstantNode of evaluate(*values of operands) if they are all constant and it succeeds, else node"""
+    values = [self.constant(operand) for operand in operands]
+    if any(value is None for value in values):
+      return node
+    try:
+      value, error = evaluate(*values)
+    except Exception:
+      # Raises when the program runs, too
+      return node
+    if error:
+      return node
+    return ConstantNode(value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Expressions
+  def optimize_ArithmeticBinaryOpNode(self, node):
+    node.left_node = self.optimize(node.left_node)
+    node.right_node = self.optimize(node.right_node)
+    method = ARITHMETIC_METHODS[node.operation['type']]
+    return self.fold(node, (node.left_node, node.right_node), lambda left, right: getattr(left, method)(right))
+
+  def optimize_BooleanBinaryOpNode(self, node):
+    node.left_node = self.optimize(node.left_node)
+    node.right_node = self.optimize(node.right_node)
+    method = BOOLEAN_METHODS[node.operation['type']]
+    return self.fold(node, (node.left_node, node.right_node), lambda left, right: getattr(left, method)(right))
+
+  def optimize_BooleanUnaryOpNode(self, node):
+    node.operand = self.optimize(node.operand)
+    return self.fold(node, (node.operand,), lambda operand: operand.not_logic())
+
+  def optimize_BooleanTernaryOpNode(self, node):
+    node.boolean_statements = self.optimize(node.boolean_statements)
+    # ALL OF / ANY OF look at the Python truth of each value, without a TROOF typecast
+    combine = {TokenType.ALL_OF: all, TokenType.ANY_OF: any}.get(node.operation['type'])
+    if combine is None:
+      return node
+    return self.fold(node, node.boolean_statements, lambda *values: (Boolean(combine([value.value for value in values])), None))
+
+  def optimize_ComparisonOpNode(self, node):
+    node.left_node = self.optimize(node.left_node)
+    node.right_node = self.optimize(node.right_node)
+    method = COMPARISON_METHODS[node.operation['type']]
+    return self.fold(node, (node.left_node, node.right_node), lambda left, right: getattr(left, method)(right, node.operation))
+
+  def optimize_StringConcatNode(self, node):
+    node.operands = self.optimize(node.operands)
+
+    def concatenate(*values):
+      string_value = ""
+      for value in values:
+        value, error = value.typecast(String)
+        if error: return None, error
+        string_value += value.value
+      return String(string_value), None
+    return self.fold(node, node.operands, concatenate)
+
+  def optimize_TypecastNode(self, node):
+    node.source_value = self.optimize(node.source_value)
+    arguments = TYPECAST_ARGUMENTS.get(node.desired_type)
+    if arguments is None:
+      return node
+    return self.fold(node, (node.source_value,), lambda value: value.explicit_typecast(*arguments))
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Statements
+  def statements(self, statements, stores_it):
+    """Optimize a statement list in place; stores_it if the value of each statement becomes IT"""
+    it = None
+    for index, statement in enumerate(statements):
+      statement = statements[index] = self.optimize(statement)
+      if it is not None and isinstance(statement, IfNode):
+        self.prune(statement, it)
+      it = self.statement_value(statement) if stores_it else None
+    return statements
+
+  def statement_value(self, statement):
+    """The Value a statement always evaluates to, or None"""
+    if isinstance(statement, VarDeclarationNode):
+      return Noob() if statement.value_node is None else self.constant(statement.value_node)
+    if isinstance(statement, VarAssignmentNode):
+      return self.constant(statement.value_to_assign)
+    return self.constant(statement)
+
+  def prune(self, node, it):
+    """Drop the branches of an O RLY? that cannot run when IT is it"""
+    basis_value, error = it.typecast(Boolean)
+    if error:
+      return
+    if basis_value.value:
+      node.mebbe_cases = []
+      node.else_block_statements = []
+    else:
+      node.if_block_statements = []
+
+  def optimize_IfNode(self, node):
+    node.if_block_statements = self.optimize(node.if_block_statements)
+    node.else_block_statements = self.optimize(node.else_block_statements)
+    mebbe_cases = []
+    for condition, statements in node.mebbe_cases:
+      condition, statements = self.optimize(condition), self.optimize(statements)
+      value = self.constant(condition)
+      condition_bool, error = value.typecast(Boolean) if value is not None else (None, True)
+      if error:
+        mebbe_cases.append((condition, statements))
+      elif condition_bool.value:
+        # Always taken once reached, so it is the NO WAI now
+        node.else_block_statements = statements
+        break
+    node.mebbe_cases = mebbe_cases
+    return node
+
+  def optimize_StatementListNode(self, node):
+    self.statements(node.statements, True)
+    return node
+
+  def optimize_LoopNode(self, node):
+    node.til_wile_expression = self.optimize(node.til_wile_expression)
+    self.statements(node.body_statements, True)
+    return node
+
+  def optimize_FuncDefNode(self, node):
+    self.statements(node.body_statements, True)
+    return node
+
+
+def optimize(node):
+  """Fold constants and drop dead branches in node (usually a ProgramNode). Returns the new node."""
+  return Optimizer().optimize(node)
@@ -0,0 +1,215 @@
+from src.parser.parser import *
+from src.parser.serialize import NODE_FIELDS
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# RESOLVER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# A pass over the AST between parsing and running it. Every scope (the program and each HOW IZ I
+# body) gets a Scope listing the names it can define, numbered in a fixed order: the names that
+# were already there, the function's parameters, everything declared with I HAS A or HOW IZ I,
+# then IT. A SymbolTable made for the scope keeps its values in a list in that order.
+#
+# Nodes that read or write a variable are annotated with the Scope they belong to and the slot
+# of the variable in it (None if the scope never defines the name), and lookups that may fall
+# back to an enclosing scope with that scope's (depth, slot, scope). The interpreter indexes the
+# frame with these whenever the node's scope is the frame's.
+#
+# A reference to a name its scope never defines fails whenever it runs; those are collected as
+# errors without running anything. They are still only raised if the program reaches them.
+
+
+class Scope:
+  __slots__ = ('names', 'slots', 'parent', 'filename', 'errors')
+
+  def __init__(self, names, parent=None, filename='<stdin>'):
+    self.names = []
+    self.slots = {}
+    for name in names:
+      if name not in self.slots:
+        self.slots[name] = len(self.names)
+        self.names.append(name)
+    self.parent = parent
+    self.filename = filename
+    # Errors found while resolving this scope and the scopes nested in it, in source order
+    self.errors = parent.errors if parent is not None else []
+
+  def outer(self, name):
+    """(depth, slot, scope) of name in the nearest enclosing scope that defines it, or None."""
+    depth, scope = 1, self.parent
+    while scope is not None:
+      slot = scope.slots.get(name)
+      if slot is not None:
+        return (depth, slot, scope)
+      depth, scope = depth + 1, scope.parent
+    return None
+
+  def __repr__(self):
+    return f"<scope {self.names}>"
+
+
+def defined_names(nodes):
+  """Names a statement list can define in its own scope (not inside nested HOW IZ I bodies)."""
+  names = []
+  work = list(reversed(nodes))
+  while work:
+    node = work.pop()
+    if isinstance(node, (list, tuple)):
+      work.extend(reversed(node))
+      continue
+    fields = NODE_FIELDS.get(type(node))
+    if fields is None:
+      continue
+    if isinstance(node, VarDeclarationNode):
+      names.append(node.var_name_token['value'])
+    elif isinstance(node, ArrayDeclarationNode):
+      names.append(node.array_name_token['value'])
+    elif isinstance(node, FuncDefNode):
+      names.append(node.function_name['value'])
+      continue
+    work.extend(reversed([getattr(node, name) for name in fields]))
+  return names
+
+
+def tail_calls(statements):
+  """
+  The FOUND YR I IZ ... MKAY among a function body's statements whose call is the last thing the
+  function does: those directly in the body or in its O RLY? branches (a loop or a WTF? carries
+  on after a FOUND YR).
+  """
+  for statement in statements:
+    if isinstance(statement, ReturnNode) and isinstance(statement.return_expression, FuncCallNode):
+      yield statement
+    elif isinstance(statement, IfNode):
+      yield from tail_calls(statement.if_block_statements)
+      for _, mebbe_statements in statement.mebbe_cases:
+        yield from tail_calls(mebbe_statements)
+      yield from tail_calls(statement.else_block_statements)
+
+
+def mark_function(node):
+  """
+  Annotate a FuncDefNode for Function.execute: each FOUND YR in tail position (tail_calls) gets
+  tail_call = True, and node.reusable tells whether the frame of a finished call may be reused.
+  It may not if the body defines a function, which keeps the frame it was defined in as its
+  context.
+  """
+  for statement in tail_calls(node.body_statements):
+    statement.tail_call = True
+  work = list(node.body_statements)
+  while work:
+    item = work.pop()
+    if isinstance(item, (list, tuple)):
+      work.extend(item)
+    elif isinstance(item, FuncDefNode):
+      node.reusable = False
+      return
+    else:
+      work.extend(getattr(item, name) for name in NODE_FIELDS.get(type(item), ()))
+  node.reusable = True
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# RESOLVER PASS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+class Resolver:
+  # Node class -> resolve_ method, or None for nodes that only need their children resolved
+  handlers = {}
+
+  def resolve(self, node, scope):
+    if isinstance(node, (list, tuple)):
+      for item in node:
+        self.resolve(item, scope)
+      return
+    try:
+      handler = self.handlers[type(node)]
+    except KeyError:
+      handler = self.handlers[type(node)] = getattr(Resolver, f'resolve_{type(node).__name__}', None)
+    if handler is not None:
+      handler(self, node, scope)
+    else:
+      for name in NODE_FIELDS.get(type(node), ()):
+        self.resolve(getattr(node, name), scope)
+
+  def annotate(self, node, scope, name):
+    node.scope = scope
+    node.slot = scope.slots.get(name)
+    return node.slot
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def resolve_VarAccessNode(self, node, scope):
+    token = node.var_name_token
+    if self.annotate(node, scope, token['value']) is None:
+      scope.errors.append(RuntimeError(token, f"Variable '{token['value']}' is not defined.\nMake sure you declared it with 'I HAS A {token['value']}' before using it.", scope.filename))
+
+  def resolve_VarDeclarationNode(self, node, scope):
+    self.annotate(node, scope, node.var_name_token['value'])
+    self.resolve(node.value_node, scope)
+
+  def resolve_VarAssignmentNode(self, node, scope):
+    self.resolve(node.value_to_assign, scope)
+    token = node.var_to_access
+    if self.annotate(node, scope, token['value']) is None:
+      scope.errors.append(RuntimeError(token, f"Cannot assign to undefined variable '{token['value']}'.\nDeclare it first with 'I HAS A {token['value']}'.", scope.filename))
+
+  def resolve_LoopNode(self, node, scope):
+    token = node.variable
+    if self.annotate(node, scope, token['value']) is None:
+      scope.errors.append(RuntimeError(token, f"Loop variable '{token['value']}' must be declared before the loop", scope.filename))
+    self.resolve(node.til_wile_expression, scope)
+    self.resolve(node.body_statements, scope)
+
+  def resolve_InputNode(self, node, scope):
+    token = node.variable.var_name_token
+    if scope.slots.get(token['value']) is None:
+      scope.errors.append(RuntimeError(('Var Access Error', None, token['line']), f"Can't find a variable named '{token['value']}'", scope.filename))
+
+  def resolve_FuncDefNode(self, node, scope):
+    params = [param.var_name_token['value'] for param in node.parameters]
+    # Calls run with Interpreter's default filename
+    node.body_scope = Scope(params + defined_names(node.body_statements) + ['IT'], scope)
+    mark_function(node)
+    self.resolve(node.body_statements, node.body_scope)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def array(self, node, scope):
+    token = node.array_name_token
+    self.annotate(node, scope, token['value'])
+    node.outer = scope.outer(token['value'])
+    if node.slot is None and node.outer is None:
+      scope.errors.append(RuntimeError(token, f"Array '{token['value']}' is not defined", scope.filename))
+
+  def resolve_ArrayDeclarationNode(self, node, scope):
+    self.resolve(node.size_expr, scope)
+    self.annotate(node, scope, node.array_name_token['value'])
+
+  def resolve_ArrayAccessNode(self, node, scope):
+    self.array(node, scope)
+    self.resolve(node.index_expr, scope)
+
+  def resolve_ArrayConfineNode(self, node, scope):
+    self.array(node, scope)
+    self.resolve(node.value_expr, scope)
+    self.resolve(node.index_expr, scope)
+
+  def resolve_ArrayDischargeNode(self, node, scope):
+    self.array(node, scope)
+    self.resolve(node.index_expr, scope)
+
+  def resolve_ArrayFillNode(self, node, scope):
+    self.array(node, scope)
+    self.resolve(node.value_expr, scope)
+
+  def resolve_ArraySliceNode(self, node, scope):
+    self.array(node, scope)
+    self.resolve(node.start_expr, scope)
+    self.resolve(node.end_expr, scope)
+
+
+def resolve(node, filename='<stdin>', predefined=()):
+  """
+  Resolve node (usually a ProgramNode) as the top-level scope, whose symbol table already holds
+  the names in predefined. Returns the Scope; its errors cover the whole program.
+  """
+  scope = Scope(list(predefined) + defined_names([node]) + ['IT'], filename=filename)
+  Resolver().resolve(node, scope)
+  return scope
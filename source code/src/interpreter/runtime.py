@@ -1,3 +1,6 @@
+from .streams import STANDARD_INPUT, STANDARD_OUTPUT
+
+
 class RTResult:
     def __init__(self):
         self.value = None
@@ -14,6 +17,19 @@ class RTResult:
     def failure(self, error):
         self.error = error
         return self
+
+
+class ConstantResult:
+    """
+    The result of a node that cannot fail and always has the same value (a literal).
+    It is built on the first visit and kept on the node, so later visits allocate nothing.
+    Values are never changed in place, which makes sharing one between visits safe.
+    """
+    __slots__ = ('value',)
+    error = None
+
+    def __init__(self, value):
+        self.value = value
     
 
 class Context:
@@ -22,27 +38,130 @@ class Context:
         self.parent = parent
         self.parent_entry_pos = parent_entry_pos
         self.symbol_table = None
+        # Where VISIBLE writes and GIMMEH reads (see streams.py): a call's context shares its parent's
+        self.output = parent.output if parent is not None else STANDARD_OUTPUT
+        self.input = parent.input if parent is not None else STANDARD_INPUT
+        # and what counts its run, if anything (see stats.py)
+        self.stats = parent.stats if parent is not None else None
     
 
+# Value of a slot whose variable has not been defined yet
+UNDEFINED = type('Undefined', (), {'__repr__': lambda self: '<undefined>'})()
+
+
 class SymbolTable:
-    def __init__(self, parent=None):
-        self.symbols = {}
+    """
+    The frame of one scope (a program or a function call). Values are kept in a list and slots
+    maps each name to its index. A table made for a resolved Scope (see resolver.py) shares the
+    scope's layout, so the nodes resolved in that scope index values directly; a name outside
+    the layout gets a slot the first time it is set, on a private copy of the layout.
+    """
+    __slots__ = ('scope', 'slots', 'names', 'values', 'order', 'parent')
+
+    def __init__(self, parent=None, scope=None):
+        self.parent = parent
+        self.scope = None
+        self.slots = {}
+        self.names = []
+        self.values = []
+        self.order = []     # defined slots, in the order they were defined
+        if scope is not None:
+            self.adopt(scope)
+
+    def adopt(self, scope):
+        """Switch to the layout of scope, which starts with the names this table already has."""
+        self.scope = scope
+        self.slots = scope.slots
+        self.names = scope.names
+        self.values += [UNDEFINED] * (len(scope.names) - len(self.values))
+
+    def reset(self, parent):
+        """Empty the table for another call of the same function, under parent"""
         self.parent = parent
+        if self.scope is not None:
+            self.slots = self.scope.slots
+            self.names = self.scope.names
+        else:
+            self.slots = {}
+            self.names = []
+        self.values = [UNDEFINED] * len(self.names)
+        self.order.clear()
+
+    def fold(self, table):
+        """
+        Copy in the values of table that get returns, so that get here answers as it did in
+        table (whose parent must be this table or this table's parent)
+        """
+        for slot in table.order:
+            value = table.values[slot]
+            if value is not None:
+                self.set(table.names[slot], value)
+
+    @property
+    def symbols(self):
+        """name -> value of every defined variable, in the order they were defined"""
+        names, values = self.names, self.values
+        return {names[slot]: values[slot] for slot in self.order}
 
     def get(self, name):
-        value = self.symbols.get(name, None)
-        if value == None and self.parent:
+        slot = self.slots.get(name)
+        value = self.values[slot] if slot is not None else None
+        if (value is None or value is UNDEFINED) and self.parent:
             return self.parent.get(name)
-        return value
-    
+        return value if value is not UNDEFINED else None
+
+    def lookup(self, slot, outer, name):
+        """
+        get(name) for a reference resolved to slot of this table's scope (None if the scope
+        does not define name) and to outer = (depth, slot, scope) in the nearest enclosing scope
+        that does (or None).
+        """
+        value = self.values[slot] if slot is not None else None
+        if value is not None and value is not UNDEFINED:
+            return value
+        table = self
+        if outer is not None:
+            depth, outer_slot, outer_scope = outer
+            enclosing = self.parent
+            for _ in range(depth - 1):
+                if enclosing is None: break
+                enclosing = enclosing.parent
+            # A function passed as an argument runs under a different parent than the one it
+            # was resolved for; then only the names tell where to look
+            if enclosing is not None and enclosing.scope is outer_scope:
+                value = enclosing.values[outer_slot]
+                if value is not None and value is not UNDEFINED:
+                    return value
+                table = enclosing
+        return table.parent.get(name) if table.parent else None
+
     def found(self, name):
-        if name in self.symbols: return True
-        return False
-    
+        slot = self.slots.get(name)
+        return slot is not None and self.values[slot] is not UNDEFINED
+
     def set(self, name, value):
-        self.symbols[name] = value
-    
-    def remove(self, name):
-        del self.symbols[name]
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.add(name)
+        self.store(slot, value)
 
-    
\ No newline at end of file
+    def store(self, slot, value):
+        if self.values[slot] is UNDEFINED:
+            self.order.append(slot)
+        self.values[slot] = value
+
+    def add(self, name):
+        if self.scope is not None and self.names is self.scope.names:
+            self.slots = dict(self.slots)
+            self.names = list(self.names)
+        slot = self.slots[name] = len(self.names)
+        self.names.append(name)
+        self.values.append(UNDEFINED)
+        return slot
+
+    def remove(self, name):
+        slot = self.slots[name]
+        if self.values[slot] is UNDEFINED:
+            raise KeyError(name)
+        self.values[slot] = UNDEFINED
+        self.order.remove(slot)
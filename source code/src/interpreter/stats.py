@@ -0,0 +1,122 @@
+import contextlib
+import json
+import time
+import tracemalloc
+from collections import Counter
+
+from src.parser.parser import LoopNode
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# RUN STATISTICS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Opt-in measurements of one program (main.py --stats, or the GUI): wall and CPU time per phase,
+# token and node counts, and what the run did. Nothing is counted unless a Stats is given to the
+# Interpreter (Interpreter(stats=...)), which then runs the program in a counting form:
+#   tree     visit is wrapped to count node visits and loop iterations
+#   closure  the program is compiled (and cached) separately with counting closures
+#   vm       the program is compiled (and cached) separately with COUNT instructions
+# Calls are counted once per call in Function.execute (or by the COUNT opening a vm function).
+# A loop iteration is counted when the first statement of its body runs (the vm counts every
+# pass into the body, even an empty one). The vm has no node visits.
+#
+#   stats = Stats()
+#   with stats.measure():
+#     with stats.phase('tokenize'): ...
+#     Interpreter(..., stats=stats).visit(ast, context)
+#   stats.report()   # a dict, or stats.to_json()
+
+
+class Stats:
+  def __init__(self, trace_memory=False):
+    # Phase name -> [wall seconds, CPU seconds], in the order the phases first ran
+    self.phases = {}
+    self.tokens = None
+    self.nodes = None
+    self.engine = None
+    # Node class -> visits; function name -> calls; loop label -> iterations
+    self.visits = Counter()
+    self.calls = Counter()
+    self.loops = Counter()
+    # First statement of the body of each loop the tree-walker has entered -> its label
+    self.loop_heads = {}
+    self.trace_memory = trace_memory
+    self.peak_memory = None
+    # Interpreters that run function bodies for this Stats (Function.execute)
+    self.interpreters = {}
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  @contextlib.contextmanager
+  def phase(self, name):
+    """Time the block as phase name (added to earlier times of the same phase)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+      yield self
+    finally:
+      times = self.phases.setdefault(name, [0.0, 0.0])
+      times[0] += time.perf_counter() - wall
+      times[1] += time.process_time() - cpu
+
+  @contextlib.contextmanager
+  def measure(self):
+    """With trace_memory set, record the peak memory Python allocates in the block (tracemalloc)"""
+    if not self.trace_memory or tracemalloc.is_tracing():
+      yield self
+      return
+    tracemalloc.start()
+    try:
+      yield self
+    finally:
+      self.peak_memory = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+
+  def parsed(self, tokens, ast):
+    """Record the size of a program: its tokens (if known) and the nodes of its tree"""
+    from src.interpreter.interpreter import subnodes
+    if tokens is not None:
+      self.tokens = len(tokens)
+    self.nodes = sum(1 for _ in subnodes(ast))
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def interpreter(self, engine):
+    """The Interpreter that runs function bodies in engine while counting for this Stats"""
+    try:
+      return self.interpreters[engine]
+    except KeyError:
+      from src.interpreter.interpreter import Interpreter
+      interpreter = self.interpreters[engine] = Interpreter(engine=engine, stats=self)
+      return interpreter
+
+  def counting_visit(self, visit):
+    """visit (Interpreter.visit of the tree-walker), counting node visits and loop iterations"""
+    visits, loops, heads = self.visits, self.loops, self.loop_heads
+
+    def counted(node, context):
+      cls = node.__class__
+      visits[cls] += 1
+      if cls is LoopNode:
+        if node.body_statements:
+          heads[node.body_statements[0]] = node.label
+      else:
+        label = heads.get(node)
+        if label is not None:
+          loops[label] += 1
+      return visit(node, context)
+    return counted
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def report(self):
+    return {
+      'engine': self.engine,
+      'phases': {name: {'wall': wall, 'cpu': cpu} for name, (wall, cpu) in self.phases.items()},
+      'tokens': self.tokens,
+      'nodes': self.nodes,
+      'visits': (dict(sorted(((cls.__name__, count) for cls, count in self.visits.items()),
+                             key=lambda item: -item[1]))
+                 if self.engine != 'vm' else None),
+      'calls': dict(self.calls.most_common()),
+      'loops': dict(self.loops.most_common()),
+      'peak_memory': self.peak_memory,
+    }
+
+  def to_json(self, **kwargs):
+    return json.dumps(self.report(), **kwargs)
@@ -0,0 +1,202 @@
+import codecs
+import queue
+import sys
+import threading
+from collections import deque
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OUTPUT SINKS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Where VISIBLE writes. An Interpreter is given one (Interpreter(output=...)) and attaches it to
+# the context of the program it runs; function calls share it through their contexts. Each
+# VISIBLE is one write() of its whole text, newline included. A buffering sink also hands its
+# text over when the interpreter calls flush(): before GIMMEH reads and at the end of the program.
+
+
+class OutputSink:
+  def write(self, text):
+    raise NotImplementedError("Subclasses must implement this method")
+
+  def flush(self):
+    """Hand over whatever is buffered"""
+
+
+class StandardOutput(OutputSink):
+  """Unbuffered: each VISIBLE goes straight to sys.stdout (as it is at the time), like print"""
+  def write(self, text):
+    sys.stdout.write(text)
+
+
+class MemoryOutput(OutputSink):
+  """Keeps everything written, for getvalue()"""
+  def __init__(self):
+    self.parts = []
+
+  def write(self, text):
+    self.parts.append(text)
+
+  def getvalue(self):
+    return ''.join(self.parts)
+
+
+class BufferedOutput(OutputSink):
+  """
+  Collects VISIBLE text and writes it to stream (sys.stdout by default) in one call, once size
+  characters are buffered or interval seconds after the first of them was, whichever comes first.
+  The interval runs on a timer thread, so text written before a long computation still shows
+  while the program computes.
+  """
+  def __init__(self, stream=None, size=1 << 16, interval=0.1):
+    self.stream = stream if stream is not None else sys.stdout
+    self.size = size
+    self.interval = interval
+    self.parts = []
+    self.length = 0
+    self.timer = None
+    # the timer's flush and the program's writes come from different threads
+    self.lock = threading.Lock()
+
+  def write(self, text):
+    with self.lock:
+      self.parts.append(text)
+      self.length += len(text)
+      if self.length >= self.size:
+        self._flush()
+      elif self.timer is None:
+        self.timer = threading.Timer(self.interval, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+  def flush(self):
+    with self.lock:
+      self._flush()
+
+  def _flush(self):
+    if self.timer is not None:
+      # (a no-op when the timer itself is flushing)
+      self.timer.cancel()
+      self.timer = None
+    if self.parts:
+      text = ''.join(self.parts)
+      self.parts.clear()
+      self.length = 0
+      self.deliver(text)
+
+  def deliver(self, text):
+    self.stream.write(text)
+    self.stream.flush()
+
+
+class BatchedOutput(BufferedOutput):
+  """A BufferedOutput that hands each batch to emit(text) instead, e.g. a GUI signal"""
+  def __init__(self, emit, size=1 << 16, interval=0.05):
+    self.emit = emit
+    super().__init__(None, size, interval)
+
+  def deliver(self, text):
+    self.emit(text)
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# INPUT SOURCES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Where GIMMEH reads. Like the output sink, an Interpreter is given one (Interpreter(input=...))
+# and its program's contexts share it. readline() returns the next line without its newline and
+# raises EOFError once there are none left, as input() does.
+
+
+class InputSource:
+  def readline(self):
+    raise NotImplementedError("Subclasses must implement this method")
+
+
+class StandardInput(InputSource):
+  """input() on sys.stdin (as it is at the time): one line per read, with line editing on a terminal"""
+  def readline(self):
+    return input()
+
+
+class LineInput(InputSource):
+  """Lines supplied up front, e.g. a list"""
+  def __init__(self, lines):
+    self.lines = iter(lines)
+
+  def readline(self):
+    for line in self.lines:
+      return str(line)
+    raise EOFError("EOF when reading a line")
+
+
+class FileInput(LineInput):
+  """The lines of a file, read whole when the source is made"""
+  def __init__(self, path, encoding='utf-8'):
+    with open(path, 'r', encoding=encoding) as f:
+      lines = f.read().split('\n')
+    # a final newline does not start another line
+    if lines[-1] == '':
+      lines.pop()
+    super().__init__(lines)
+
+
+class BulkInput(InputSource):
+  """
+  Reads stream (sys.stdin's bytes by default) size bytes at a time and splits the lines out, in
+  place of a read per GIMMEH. A stream with read1, like a pipe or terminal, gives back what has
+  arrived without waiting for the rest of the chunk.
+  """
+  def __init__(self, stream=None, size=1 << 16, encoding=None):
+    if stream is None:
+      stream = sys.stdin.buffer
+      encoding = encoding or sys.stdin.encoding
+    self.read = getattr(stream, 'read1', stream.read)
+    self.size = size
+    self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')()
+    self.lines = deque()
+    self.partial = ''
+
+  def readline(self):
+    while not self.lines:
+      chunk = self.read(self.size)
+      if isinstance(chunk, bytes):
+        chunk = self.decoder.decode(chunk, final=not chunk)
+      if not chunk:
+        if self.partial:
+          line, self.partial = self.partial, ''
+          return line
+        raise EOFError("EOF when reading a line")
+      lines = (self.partial + chunk).split('\n')
+      self.partial = lines.pop()
+      self.lines.extend(lines)
+    line = self.lines.popleft()
+    return line[:-1] if line.endswith('\r') else line
+
+
+class QueueInput(InputSource):
+  """
+  Lines put() from another thread, e.g. a GUI's. A read with none waiting calls request() (to ask
+  for one) and blocks until a line arrives or close() is called.
+  """
+  def __init__(self, request=None):
+    self.request = request
+    self.lines = queue.Queue()
+
+  def put(self, line):
+    self.lines.put(line)
+
+  def close(self):
+    """Every read from now on, once the lines already put are read, raises EOFError"""
+    self.lines.put(None)
+
+  def readline(self):
+    if self.lines.empty() and self.request is not None:
+      self.request()
+    line = self.lines.get()
+    if line is None:
+      self.lines.put(None)
+      raise EOFError("EOF when reading a line")
+    return line
+
+
+# The sink and source of a context that no Interpreter has given them
+STANDARD_OUTPUT = StandardOutput()
+STANDARD_INPUT = StandardInput()
@@ -1,7 +1,20 @@
 import re
+from array import array
+from functools import reduce
+from itertools import repeat
+import operator
 from .runtime import *
 from src.parser.parser import *
 
+try:
+  import numpy
+except ImportError:  # Optional: bulk array operations then run on the array module alone
+  numpy = None
+
+# YARNs that implicitly cast to a NUMBR / NUMBAR
+INTEGER_YARN = re.compile(r'^-?\d+$')
+FLOAT_YARN = re.compile(r'^-?\d*\.\d+$')
+
 class Value:
   def __init__(self, line_number=None):
     self.line_number = line_number
@@ -21,15 +34,18 @@ class Value:
 
   # ════════════════════════════════════════════════════════════════════════════════════════════════
   # Number Arithmetic operations (ensure result is always a Number)
-  def added_by(self, other):
+  def added_by(self, other, line_number=None):
     # Typecast both operands to Number before performing the addition
     self, error = self.typecast(Number) 
     if error: return None, error
 
-    other, error = other.typecast(Number)
-    if error: return None, error
+    other_number, error = other.typecast(Number)
+    if error:
+      # SUM OF a value and a UHS adds the value to every element (line_number: of the SUM OF)
+      if isinstance(other, Array): return other.added_by(self, line_number)
+      return None, error
 
-    result = self.value + other.value
+    result = self.value + other_number.value
 
     return Number(result).set_context(self.context), None
 
@@ -45,15 +61,17 @@ class Value:
 
     return Number(result).set_context(self.context), None
 
-  def multiplied_by(self, other):
+  def multiplied_by(self, other, line_number=None):
     # Typecast both operands to Number before performing the multiplication
     self, error = self.typecast(Number) 
     if error: return None, error
 
-    other, error = other.typecast(Number)
-    if error: return None, error
+    other_number, error = other.typecast(Number)
+    if error:
+      if isinstance(other, Array): return other.multiplied_by(self, line_number)
+      return None, error
 
-    result = self.value * other.value
+    result = self.value * other_number.value
 
     return Number(result).set_context(self.context), None
 
@@ -226,11 +244,19 @@ class Return(Value):
   def explicit_typecast(self, target_class, to_float=False): pass
 
 
+class TailCall(Return):
+  """A FOUND YR I IZ ... MKAY in tail position: the call Function.execute makes in place of the returning one"""
+  def __init__(self, function, arguments, line_number=None):
+    self.function = function
+    self.arguments = arguments
+    super().__init__(None, line_number)
+
+
 class Noob(Value):
   def __init__(self, line_number=None):
     self.value = None
     self.line_number = line_number
-    super().__init__(line_number)
+    self.context = None
 
   def typecast(self, target_class):
     # NOOBs can be implicitly typecast into TROOF
@@ -278,7 +304,7 @@ class String(Value):
   def __init__(self, value, line_number=None):
     self.value = value
     self.line_number = line_number
-    super().__init__(line_number)
+    self.context = None
 
   def typecast(self, target_class):
     # No need to typecast for String-to-String
@@ -293,9 +319,9 @@ class String(Value):
     # any non-numerical, non-hyphen, non-period characters
     elif target_class == Number:
       # Check if string contains only valid numeric characters: digits, hyphen (at start), and period
-      if re.match(r'^-?\d+$', self.value):  # Integer format
+      if INTEGER_YARN.match(self.value):  # Integer format
         return Number(int(self.value)).set_context(self.context) , None
-      elif re.match(r'^-?\d*\.\d+$', self.value):  # Float format
+      elif FLOAT_YARN.match(self.value):  # Float format
         return Number(float(self.value)).set_context(self.context) , None
       else:
         # String contains non-numeric characters
@@ -358,7 +384,9 @@ class Number(Value):
   def __init__(self, value, line_number=None):
     self.value = value
     self.line_number = line_number
-    super().__init__(line_number)
+    # Everything Value.__init__ does, without the extra calls: values are created for every
+    # operation and every array element read
+    self.context = None
 
   def typecast(self, target_class):
     # No need to typecast for Number-to-Number
@@ -372,7 +400,7 @@ class Number(Value):
     elif target_class == String:
       if Number.is_integer(self.value):
         # Casting NUMBRs to YARN will just convert the value into a string of characters
-        return String(str(int(self.value))).set_context(self.context) , None
+        return String(str(self.value)).set_context(self.context) , None
       elif Number.is_float(self.value):
         # Casting NUMBARs to YARN will truncate the decimal portion up to two decimal places
         return String(f"{self.value:.2f}").set_context(self.context) , None
@@ -409,7 +437,7 @@ class Number(Value):
     elif target_class == String:
       if Number.is_integer(self.value):
         # Casting NUMBRs to YARN will just convert the value into a string of characters
-        return String(str(int(self.value))).set_context(self.context) , None
+        return String(str(self.value)).set_context(self.context) , None
       elif Number.is_float(self.value):
         # Casting NUMBARs to YARN will truncate the decimal portion up to two decimal places
         return String(f"{self.value:.2f}").set_context(self.context) , None
@@ -420,11 +448,15 @@ class Number(Value):
         f"Cannot convert Number ({self.value}) to {target_class.__name__}.\nThis type conversion is not supported."
       )
 
+  # A NUMBR holds a Python int and a NUMBAR a float, so the kind of a Number is the type of its
+  # value; neither check formats the number
   def is_integer(value_to_check):
-    return bool(re.match(r'^-?\d+$', str(value_to_check)))  
+    return value_to_check.__class__ is int
 
   def is_float(value_to_check):
-    return bool(re.match(r'^-?\d*\.\d*$', str(value_to_check)))
+    # The floats whose str() is plain digits with a decimal point: not inf or nan, and not
+    # small or large enough to be written with an exponent
+    return value_to_check.__class__ is float and (value_to_check == 0 or 1e-4 <= abs(value_to_check) < 1e16)
 
   #Implement Implicit Typecase here
   def __repr__(self):
@@ -444,7 +476,7 @@ class Boolean(Value):
       # TYPECAST if needed
       self.value = bool(value_representation)
 
-    super().__init__(line_number)
+    self.context = None
 
   def typecast(self, target_class):
     # No need to typecast for Boolean-to-Boolean
@@ -493,59 +525,160 @@ class Boolean(Value):
 
 
 class Function(Value):
+  # Interpreter engine that runs the body (see Interpreter.ENGINES)
+  engine = 'tree'
+  # Resolved Scope of the body, if any: calls then get a symbol table laid out for it
+  scope = None
+  # Slot of each parameter in the call's symbol table (None: set by name), once known
+  parameter_slots = None
+  # Whether the frame of a finished call may be reused (see call_context); set from the
+  # FuncDefNode (resolver.mark_function)
+  reusable = False
+  # One Interpreter per engine runs the bodies of all calls
+  interpreters = {}
+
   def __init__(self, function_name, parameters, body_statements):
     self.function_name = function_name
     self.parameters = parameters
     self.body_statements = body_statements
+    # Contexts of finished calls, with their symbol tables, ready for the next ones
+    self.frames = []
     super().__init__()
 
-  def execute(self, passed_parameters):
-    from src.interpreter.interpreter import Interpreter
-
-    res = RTResult()
-    interpreter = Interpreter()
+  def call_context(self):
+    """A Context for a call, whose symbol table is empty and laid out for the body"""
+    if self.frames:
+      new_context = self.frames.pop()
+      new_context.parent = self.context
+      new_context.output = self.context.output
+      new_context.input = self.context.input
+      new_context.stats = self.context.stats
+      new_context.symbol_table.reset(self.context.symbol_table)
+      return new_context
     new_context = Context(self.function_name, parent=self.context)
-    new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
+    new_context.symbol_table = SymbolTable(new_context.parent.symbol_table, self.scope)
+    return new_context
 
-    if len(passed_parameters) > len(self.parameters):
-      return res.failure(RuntimeError(
+  def arguments_error(self, count):
+    """The error for calling the function with count arguments, or None"""
+    if count > len(self.parameters):
+      return RuntimeError(
         ("Function Call", "Function", None),
-        f"Too many arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {len(passed_parameters)}.\nExtra arguments: {len(passed_parameters) - len(self.parameters)}"
-      ))
+        f"Too many arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {count}.\nExtra arguments: {count - len(self.parameters)}"
+      )
     
-    if len(passed_parameters) < len(self.parameters):
-      return res.failure(RuntimeError(
+    if count < len(self.parameters):
+      return RuntimeError(
         ("Function Call", "Function", None),
-        f"Not enough arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {len(passed_parameters)}.\nMissing arguments: {len(self.parameters) - len(passed_parameters)}"
-      ))
-    
-    for i in range(len(passed_parameters)):
-      param_name = self.parameters[i]
-      param_value = passed_parameters[i]
+        f"Not enough arguments for function '{self.function_name}'.\nExpected {len(self.parameters)} parameter(s), but got {count}.\nMissing arguments: {len(self.parameters) - count}"
+      )
+    return None
 
-      param_value.set_context(new_context)
-      new_context.symbol_table.set(param_name, param_value)
-      
+  def execute(self, passed_parameters):
+    function, new_context, merged = self, None, None
+    # Each pass is one call; a FOUND YR I IZ ... MKAY in tail position (a TailCall) makes the
+    # next one in place of its own, so tail recursion runs in constant host stack
+    while True:
+      error = function.arguments_error(len(passed_parameters))
+      if error: return RTResult().failure(error)
+
+      if new_context is None:
+        new_context = function.call_context()
+      table = new_context.symbol_table
+
+      stats = new_context.stats
+      if stats is None:
+        try:
+          interpreter = Function.interpreters[function.engine]
+        except KeyError:
+          from src.interpreter.interpreter import Interpreter
+          interpreter = Function.interpreters[function.engine] = Interpreter(engine=function.engine)
+      else:
+        # A measured run counts the call and runs the body with counting
+        stats.calls[function.function_name] += 1
+        interpreter = stats.interpreter(function.engine)
+      if function.parameter_slots is None:
+        function.parameter_slots = [table.slots.get(param_name) for param_name in function.parameters]
+      reusable = function.reusable
+
+      for param_name, slot, param_value in zip(function.parameters, function.parameter_slots, passed_parameters):
+        # Only a Function reads its context, so only a Function argument moves into this one
+        # (and then keeps the frame)
+        if isinstance(param_value, Function):
+          param_value.set_context(new_context)
+          reusable = False
+        if slot is None:
+          table.set(param_name, param_value)
+        else:
+          table.store(slot, param_value)
+        
+      result = function.run_body(interpreter.visit, new_context)
+      tail_call = result.value
+      if tail_call.__class__ is not TailCall:
+        if reusable:
+          function.frames.append(new_context)
+        return result
+
+      callee, arguments = tail_call.function, tail_call.arguments
+      if not isinstance(callee, Function):
+        return callee.execute(arguments)
+      if function.can_fold(new_context, passed_parameters, callee, arguments):
+        # Its values go into one merged frame above it and it is emptied for the call: a chain
+        # of tail calls keeps two frames
+        if new_context.parent is not merged:
+          merged = Context(function.function_name, parent=new_context.parent)
+          merged.symbol_table = SymbolTable(table.parent, function.scope)
+        merged.symbol_table.fold(table)
+        new_context.parent = merged
+        table.reset(merged.symbol_table)
+      else:
+        if reusable:
+          function.frames.append(new_context)
+        new_context = None
+      function, passed_parameters = callee, arguments
+
+  def can_fold(self, new_context, passed_parameters, callee, arguments):
+    """
+    Whether the tail call callee(arguments), made by a call of this function running in
+    new_context with passed_parameters, may run in new_context itself once its values are folded
+    into the merged frame above it (SymbolTable.fold) and it is emptied.
+
+    The invariant: after the fold, every lookup answers as it would have without it, so nothing
+    may still read the emptied frame for its old values. The callee's frame would have had
+    new_context as its parent; folding keeps those answers, so callee must be this function with
+    new_context as its context (it was passed in as an argument). Only Functions read frames
+    (as their contexts), and the frame is the context of:
+      - the functions its body defines; there must be none (reusable)
+      - its Function arguments (moved into it by execute); each must be passed on to the callee,
+        which moves it into the callee's frame, here new_context refilled
+    """
+    if callee is not self or not self.reusable or callee.context is not new_context:
+      return False
+    return all(any(argument is value for argument in arguments)
+               for value in passed_parameters if isinstance(value, Function))
+
+  def run_body(self, visit, new_context):
     return_value = Noob()  # Default return value
     
     for statement in self.body_statements:
-      value = res.register(interpreter.visit(statement, new_context))
-      if res.error: return res
+      result = visit(statement, new_context)
+      if result.error: return RTResult().failure(result.error)
+      value = result.value
 
-      # Check for early return (FOUND YR)
+      # Check for early return (FOUND YR), or a call to make in place of this one
       if isinstance(value, Return):
-        return res.success(value.value)
+        return RTResult().success(value if value.__class__ is TailCall else value.value)
       
       # Check for GTFO (break) - in a function, acts like return with NOOB
       if isinstance(value, Break):
-        return res.success(Noob())
+        return RTResult().success(Noob())
       
       # Update IT and return_value to the last expression result (ignoring None)
-      if value is not None and not isinstance(value, (Break, Return)):
+      if value is not None:
         return_value = value
         new_context.symbol_table.set('IT', value)  # Set IT variable for O RLY? and other statements
 
-    return res.success(return_value)
+    return RTResult().success(return_value)
 
 #   def typecast(self, target_class): return True
 #   def explicit_typecast(self, target_class, to_float=False): return True
@@ -555,14 +688,138 @@ class Function(Value):
 
 
 # ════════════════════════════════════════════════════════════════════════════════════════════════
+def bitmap(size, value):
+  """A bitmap of size bits, all set or all clear; the unused bits of the last byte are clear"""
+  if not value:
+    return bytearray((size + 7) >> 3)
+  bits = bytearray(b'\xff') * (size >> 3)
+  if size & 7:
+    bits.append((1 << (size & 7)) - 1)
+  return bits
+
+def bitmap_slice(bits, start, end):
+  """Bits start to end of bits, as a new bitmap"""
+  value = int.from_bytes(bits, 'little') >> start & ((1 << (end - start)) - 1)
+  return bytearray(value.to_bytes((end - start + 7) >> 3, 'little'))
+
+# Operators of the bulk array operations, by the method of a single element
+OPERATORS = {'added_by': operator.add, 'multiplied_by': operator.mul, 'maximum': max, 'minimum': min}
+NUMPY_OPERATORS = {'added_by': 'add', 'multiplied_by': 'multiply'}
+INT64 = (-2**63, 2**63 - 1)
+
+
 class Array(Value):
+  """
+  A UHS array. Elements are stored unboxed and only become Values when they are read:
+    NUMBR   array('q'), plus a bitmap of the NOOB slots
+    NUMBAR  array('d'), plus bitmaps of the NOOB slots and of the slots holding a NUMBR
+    TROOF   bytearray of 0 (FAIL), 1 (WIN) or TROOF_NOOB
+    YARN    list of str, None for NOOB
+  A NUMBR too big for its slot (64 bits, or 53 in a NUMBAR array) turns the whole array into a
+  list of Values (boxed).
+  """
+  TROOF_NOOB = 2
+
   def __init__(self, element_type, size, line_number=None):
     self.element_type = element_type  # 'NUMBR', 'NUMBAR', 'YARN', 'TROOF'
     self.size = size
-    self.elements = [Noob() for _ in range(size)]  # Initialize with NOOB values
+    # Every element starts as NOOB
+    self.noobs = self.integers = None
+    if element_type == 'NUMBR':
+      self.elements = array('q', bytes(8 * size))
+      self.noobs = bitmap(size, True)
+    elif element_type == 'NUMBAR':
+      self.elements = array('d', bytes(8 * size))
+      self.noobs = bitmap(size, True)
+      self.integers = bitmap(size, False)
+    elif element_type == 'TROOF':
+      self.elements = bytearray([self.TROOF_NOOB]) * size
+    else:
+      element_type = 'YARN'
+      self.elements = [None] * size
+    self.storage = element_type
     self.line_number = line_number
     super().__init__(line_number)
 
+  # box(index) returns the Value of the element at index, made at line_number if given.
+  # unbox(index, value) stores value (already type checked), or NOOB when value is None. Both
+  # dispatch on self.storage.
+  def box(self, index, line_number=None):
+    return self.BOX[self.storage](self, index, line_number)
+
+  def unbox(self, index, value):
+    self.UNBOX[self.storage](self, index, value)
+
+  def box_NUMBR(self, index, line_number=None):
+    if self.noobs[index >> 3] >> (index & 7) & 1:
+      return Noob(line_number)
+    return Number(self.elements[index], line_number)
+
+  def unbox_NUMBR(self, index, value):
+    if value is None:
+      self.noobs[index >> 3] |= 1 << (index & 7)
+    elif -0x8000000000000000 <= value.value <= 0x7fffffffffffffff:
+      self.elements[index] = value.value
+      self.noobs[index >> 3] &= ~(1 << (index & 7))
+    else:
+      self.to_boxed(index, value)
+
+  def box_NUMBAR(self, index, line_number=None):
+    if self.noobs[index >> 3] >> (index & 7) & 1:
+      return Noob(line_number)
+    if self.integers[index >> 3] >> (index & 7) & 1:
+      return Number(int(self.elements[index]), line_number)
+    return Number(self.elements[index], line_number)
+
+  def unbox_NUMBAR(self, index, value):
+    bit = 1 << (index & 7)
+    if value is None:
+      self.noobs[index >> 3] |= bit
+      return
+    number = value.value
+    if number.__class__ is not int:
+      self.integers[index >> 3] &= ~bit
+    elif -0x20000000000000 <= number <= 0x20000000000000:
+      self.integers[index >> 3] |= bit
+    else:
+      return self.to_boxed(index, value)
+    self.elements[index] = number
+    self.noobs[index >> 3] &= ~bit
+
+  def box_TROOF(self, index, line_number=None):
+    element = self.elements[index]
+    return Noob(line_number) if element == self.TROOF_NOOB else Boolean(element == 1, line_number)
+
+  def unbox_TROOF(self, index, value):
+    self.elements[index] = self.TROOF_NOOB if value is None else int(value.value)
+
+  def box_YARN(self, index, line_number=None):
+    element = self.elements[index]
+    return Noob(line_number) if element is None else String(element, line_number)
+
+  def unbox_YARN(self, index, value):
+    self.elements[index] = None if value is None else value.value
+
+  def box_boxed(self, index, line_number=None):
+    # (the Values are shared with the array, so only a NOOB is made anew)
+    value = self.elements[index]
+    if line_number is not None and value.__class__ is Noob:
+      return Noob(line_number)
+    return value
+
+  def unbox_boxed(self, index, value):
+    self.elements[index] = value if value is not None else Noob()
+
+  def to_boxed(self, index, value):
+    """Switch to a list of Values, for a NUMBR too big for the typed storage"""
+    self.elements = [self.box(i) for i in range(self.size)]
+    self.noobs = self.integers = None
+    self.storage = 'boxed'
+    self.elements[index] = value
+
+  BOX = {'NUMBR': box_NUMBR, 'NUMBAR': box_NUMBAR, 'TROOF': box_TROOF, 'YARN': box_YARN, 'boxed': box_boxed}
+  UNBOX = {'NUMBR': unbox_NUMBR, 'NUMBAR': unbox_NUMBAR, 'TROOF': unbox_TROOF, 'YARN': unbox_YARN, 'boxed': unbox_boxed}
+
   def get(self, index):
     """Get element at index"""
     if not isinstance(index, int):
@@ -577,7 +834,7 @@ class Array(Value):
         f"Array index {index} out of bounds. Array size is {self.size} (valid indices: 0 to {self.size-1})"
       )
     
-    return self.elements[index], None
+    return self.BOX[self.storage](self, index), None
 
   def set(self, index, value):
     """Set element at index (CONFINE operation)"""
@@ -593,7 +850,14 @@ class Array(Value):
         f"Array index {index} out of bounds. Array size is {self.size} (valid indices: 0 to {self.size-1})"
       )
     
-    # Type check the value being added
+    error = self.type_error(value)
+    if error: return None, error
+    
+    self.UNBOX[self.storage](self, index, value)
+    return value, None
+
+  def type_error(self, value, line_number=None):
+    """The error for storing value in this array (at line_number, else its declaration), or None if its type matches"""
     type_match = False
     if self.element_type == 'NUMBR' and isinstance(value, Number) and Number.is_integer(value.value):
       type_match = True
@@ -605,13 +869,11 @@ class Array(Value):
       type_match = True
     
     if not type_match:
-      return None, RuntimeError(
-        ('Array Type Error', None, self.line_number, None),
+      return RuntimeError(
+        ('Array Type Error', None, self.line_number if line_number is None else line_number, None),
         f"Cannot add {value.__class__.__name__} to array of type {self.element_type}"
       )
-    
-    self.elements[index] = value
-    return value, None
+    return None
 
   def remove(self, index):
     """Remove element at index (DISCHARGE operation) - sets to NOOB"""
@@ -627,10 +889,169 @@ class Array(Value):
         f"Array index {index} out of bounds. Array size is {self.size} (valid indices: 0 to {self.size-1})"
       )
     
-    removed_value = self.elements[index]
-    self.elements[index] = Noob()  # Reset to NOOB
+    removed_value = self.box(index)
+    self.unbox(index, None)  # Reset to NOOB
     return removed_value, None
 
+  # ═══════════════════════════════════════════════════════════════════════════════════════════════
+  # Bulk operations. Each gives the same result as the equivalent loop over the elements, but
+  # arrays holding only numbers of their own type (packed) are handled by C loops over the whole
+  # storage, or by NumPy when it is installed. Anything else goes element by element. Each takes the
+  # line of the operation, for its errors (the array's declaration line when it is not given).
+  def packed(self):
+    """The typed storage, if every element is a NUMBR (NUMBR array) or a NUMBAR (NUMBAR array)"""
+    if self.storage == 'NUMBR' and not any(self.noobs):
+      return self.elements
+    if self.storage == 'NUMBAR' and not any(self.noobs) and not any(self.integers):
+      return self.elements
+    return None
+
+  def fill(self, value, line_number=None):
+    """Set every element to value (CONFINE without AT)"""
+    error = self.type_error(value, line_number)
+    if error: return None, error
+
+    single = Array(self.element_type, 1)
+    single.unbox(0, value)
+    self.storage = single.storage
+    if single.storage == 'boxed':
+      self.elements = [value] * self.size
+      self.noobs = self.integers = None
+      return value, None
+
+    self.elements = single.elements * self.size
+    if single.noobs is not None:
+      self.noobs = bitmap(self.size, False)
+    if single.integers is not None:
+      self.integers = bitmap(self.size, single.integers[0])
+    return value, None
+
+  def slice(self, start, end, line_number=None):
+    """A new array holding a copy of elements start up to (not including) end"""
+    if not 0 <= start < end <= self.size:
+      return None, RuntimeError(
+        ('Array Error', None, self.line_number if line_number is None else line_number, None),
+        f"Array slice {start} TIL {end} out of bounds. Array size is {self.size} (valid slices: 0 TIL 1 to {self.size - 1} TIL {self.size})"
+      )
+
+    result = Array(self.element_type, 0, self.line_number)
+    result.size = end - start
+    result.storage = self.storage
+    result.elements = self.elements[start:end]
+    if self.noobs is not None:
+      result.noobs = bitmap_slice(self.noobs, start, end)
+    if self.integers is not None:
+      result.integers = bitmap_slice(self.integers, start, end)
+    return result, None
+
+  def added_by(self, other, line_number=None):
+    return self.elementwise('added_by', other, line_number)
+
+  def multiplied_by(self, other, line_number=None):
+    return self.elementwise('multiplied_by', other, line_number)
+
+  def elementwise(self, method, other, line_number=None):
+    """
+    SUM OF / PRODUKT OF with a UHS: a new array holding method applied to every element and other,
+    or the element of other at the same index when it is an array of the same size. The result is
+    a NUMBAR array if either side is NUMBAR or any result is, a NUMBR array otherwise.
+    """
+    if isinstance(other, Array):
+      if other.size != self.size:
+        return None, RuntimeError(
+          ('Array Error', None, self.line_number if line_number is None else line_number, None),
+          f"Arrays of size {self.size} and {other.size} cannot be combined elementwise"
+        )
+      operand = other.packed()
+      floats = 'NUMBAR' in (self.element_type, other.element_type)
+    else:
+      number, error = other.typecast(Number)
+      operand = number.value if not error else None
+      floats = self.element_type == 'NUMBAR' or operand.__class__ is float
+
+    packed = self.packed()
+    if packed is not None and operand is not None:
+      result = Array('NUMBAR' if floats else 'NUMBR', self.size, self.line_number)
+      elements = self.packed_elementwise(method, packed, operand, floats)
+      if elements is not None:
+        result.elements = elements
+        result.noobs = bitmap(self.size, False)
+        return result, None
+
+    # Element by element
+    results = []
+    for index in range(self.size):
+      element = self.box(index, line_number)
+      value, error = getattr(element, method)(other.box(index, line_number) if isinstance(other, Array) else other)
+      if error: return None, error
+      floats = floats or value.value.__class__ is float
+      results.append(value)
+    result = Array('NUMBAR' if floats else 'NUMBR', self.size, self.line_number)
+    for index, value in enumerate(results):
+      result.unbox(index, value)
+    return result, None
+
+  def packed_elementwise(self, method, packed, operand, floats):
+    """The typed storage of elementwise() on packed elements, or None if a NUMBR would not fit"""
+    typecode = 'd' if floats else 'q'
+    if numpy is not None:
+      left = numpy.frombuffer(packed, dtype=packed.typecode)
+      right = numpy.frombuffer(operand, dtype=operand.typecode) if isinstance(operand, array) else operand
+      if floats or self.fits_int64(method, left, right):
+        values = getattr(numpy, NUMPY_OPERATORS[method])(left, right, dtype=typecode)
+        return array(typecode, values.tobytes())
+      return None
+    operands = operand if isinstance(operand, array) else repeat(operand, self.size)
+    try:
+      return array(typecode, map(OPERATORS[method], packed, operands))
+    except OverflowError:
+      return None
+
+  @staticmethod
+  def fits_int64(method, left, right):
+    """Whether NumPy can combine the NUMBR arrays (or NUMBR) left and right without overflowing"""
+    if isinstance(right, int):
+      if not INT64[0] <= right <= INT64[1]:
+        return False
+      right_bounds = (right, right)
+    else:
+      right_bounds = (int(right.min()), int(right.max()))
+    left_bounds = (int(left.min()), int(left.max()))
+    if method == 'added_by':
+      extremes = (left_bounds[0] + right_bounds[0], left_bounds[1] + right_bounds[1])
+    else:
+      extremes = [a * b for a in left_bounds for b in right_bounds]
+    return INT64[0] <= min(extremes) and max(extremes) <= INT64[1]
+
+  def reduced_by(self, method, line_number=None):
+    """
+    SUM OF / BIGGR OF / SMALLR OF UHS: the elements combined from left to right with method
+    ('added_by', 'maximum' or 'minimum'), starting from the first element as a Number.
+    """
+    packed = self.packed()
+    if packed is not None:
+      if numpy is not None and method == 'added_by':
+        values = numpy.frombuffer(packed, dtype=packed.typecode)
+        if packed.typecode == 'd':
+          # accumulate adds from left to right, like the loop; sum() would add pairwise
+          return Number(float(numpy.add.accumulate(values)[-1])), None
+        if len(packed) * max(abs(int(values.min())), abs(int(values.max()))) <= INT64[1]:
+          return Number(int(values.sum())), None
+      if method == 'added_by':
+        # sum() of floats compensates for rounding, which a loop of SUM OF does not
+        total = sum(packed) if packed.typecode == 'q' else reduce(operator.add, packed)
+      else:
+        # max() and min() keep the first of equal elements, like BIGGR OF and SMALLR OF
+        total = OPERATORS[method](packed)
+      return Number(total), None
+
+    total, error = self.box(0, line_number).typecast(Number)
+    if error: return None, error
+    for index in range(1, self.size):
+      total, error = getattr(total, method)(self.box(index, line_number))
+      if error: return None, error
+    return total, None
+
   def typecast(self, target_class):
     # Arrays cannot be typecast
     return None, RuntimeError(
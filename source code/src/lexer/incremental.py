@@ -0,0 +1,145 @@
+from src.lexer import tokenizer
+from src.lexer.tokenizer import TokenType, LexerError
+from src.lexer.source import SourceIndex
+
+# A multi-word keyword such as IF U SAY SO may be split over several lines (its \s+ also
+# matches newlines), so lexing one line can look ahead into the next non-blank lines.
+# Re-lexing therefore starts this many non-blank lines above the edit.
+KEYWORD_SPAN_LINES = max(pattern.count(r'\s+') for _, pattern, *_ in tokenizer.TOKEN_SPEC)
+
+
+def _first_token_from(tokens, offset):
+    """Index of the first token starting at or after offset (tokens are ordered by offset)."""
+    low, high = 0, len(tokens)
+    while low < high:
+        mid = (low + high) // 2
+        if tokens[mid].offset < offset:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+def _is_clean_line(tokens, line_start, index):
+    """
+    True when the lexer starts the line at line_start in its initial state: the first line,
+    or a line right after a NEWLINE token (so it is not inside an OBTW...TLDR comment, a
+    multi-line keyword or an ellipsis continuation). index is _first_token_from(tokens, line_start).
+    """
+    if line_start == 0:
+        return True
+    if index == 0:
+        return False
+    previous = tokens[index - 1]
+    return previous.type is TokenType.NEWLINE and previous.offset == line_start - 1
+
+
+def _restart_point(code, tokens, offset):
+    """
+    Find where re-lexing has to start for an edit at offset in code.
+    Returns (start offset of that line, index of its first token).
+    """
+    start = code.rfind('\n', 0, offset) + 1
+
+    # Step back over KEYWORD_SPAN_LINES non-blank lines, whose keywords may reach the edit
+    non_blank = 0
+    while start > 0 and non_blank < KEYWORD_SPAN_LINES:
+        previous_start = code.rfind('\n', 0, start - 1) + 1
+        if code[previous_start:start - 1].strip():
+            non_blank += 1
+        start = previous_start
+
+    # Then keep going until the line is not inside a token or comment that spans lines
+    while True:
+        index = _first_token_from(tokens, start)
+        if _is_clean_line(tokens, start, index):
+            return start, index
+        if index == 0:
+            return 0, 0
+        previous = tokens[index - 1]
+        if previous.type is TokenType.NEWLINE:
+            start = previous.offset + 1
+        else:
+            start = code.rfind('\n', 0, previous.offset) + 1
+
+
+def retokenize(code, tokens, offset, removed, inserted, filename='<stdin>'):
+    """
+    Re-lex code after replacing code[offset:offset + removed] with inserted.
+    tokens must be the result of tokenize(code). Only the lines around the edit are lexed
+    again: lexing stops at the first line boundary after the edit where the old token
+    stream starts a line in the same (clean) state, and the rest of the old tokens are
+    reused, moved to the new SourceIndex and shifted by the change in length.
+    Returns (new_code, new_tokens); new_tokens equals tokenize(new_code). Reused tokens
+    are updated in place, so the old token list should not be used afterwards.
+    Raises LexerError exactly where a full tokenize() of new_code would.
+    """
+    if offset < 0 or removed < 0 or offset + removed > len(code):
+        raise ValueError(f"Edit ({offset}, {removed}) is outside the source (length {len(code)})")
+
+    new_code = code[:offset] + inserted + code[offset + removed:]
+    index = SourceIndex(new_code, filename)
+    delta = len(inserted) - removed
+    # Resync only at line starts past the inserted text
+    edit_end = offset + len(inserted)
+
+    restart_offset, restart_index = _restart_point(code, tokens, offset)
+
+    relexed = []
+    resync_index = None
+    chunks = iter([new_code[restart_offset:]])
+    for token in tokenizer._scan(chunks, index, filename, restart_offset):
+        relexed.append(token)
+        if token.type is TokenType.NEWLINE and token.offset >= edit_end:
+            # The next line starts clean here; reuse the old tokens if they do too
+            old_start = token.offset + 1 - delta
+            old_index = _first_token_from(tokens, old_start)
+            if _is_clean_line(tokens, old_start, old_index):
+                resync_index = old_index
+                break
+
+    if resync_index is None:
+        return new_code, tokens[:restart_index] + relexed
+
+    tail = tokens[resync_index:]
+    for token in tail:
+        token.offset += delta
+        token.source = index
+    return new_code, tokens[:restart_index] + relexed + tail
+
+
+class IncrementalLexer:
+    """
+    Keeps the tokens of an editor buffer up to date as it is edited.
+    Call edit() with each change (e.g. from QTextDocument.contentsChange) and read .tokens.
+    """
+    def __init__(self, code='', filename='<stdin>'):
+        self.filename = filename
+        self.reset(code)
+
+    def reset(self, code):
+        """
+        Replace the whole buffer, lexing all of it, and return the new token list. If it
+        raises LexerError, the next edit lexes the whole buffer again.
+        """
+        self.code = code
+        self.tokens = None
+        self.tokens = tokenizer.tokenize(code, self.filename)
+        return self.tokens
+
+    def edit(self, offset, removed, inserted):
+        """
+        Apply an edit and return the new token list. If it raises LexerError the buffer
+        text is still updated; the next edit then lexes the whole buffer again.
+        """
+        if self.tokens is None:
+            self.code = self.code[:offset] + inserted + self.code[offset + removed:]
+            self.tokens = tokenizer.tokenize(self.code, self.filename)
+            return self.tokens
+        try:
+            self.code, self.tokens = retokenize(self.code, self.tokens, offset, removed, inserted, self.filename)
+        except LexerError:
+            self.code = self.code[:offset] + inserted + self.code[offset + removed:]
+            self.tokens = None
+            raise
+        return self.tokens
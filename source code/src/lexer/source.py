@@ -0,0 +1,147 @@
+import sys
+from array import array
+from bisect import bisect_right
+
+
+class SourceIndex:
+    """
+    Line-start offsets of one source file, built once, so a character offset can be turned
+    into (line, col) with a binary search instead of tracking line/col for every token.
+    The text is kept when it is available (not for streamed files) so errors can quote
+    the offending line.
+    """
+    __slots__ = ('line_starts', 'length', 'text', 'filename')
+
+    def __init__(self, text=None, filename='<stdin>'):
+        self.line_starts = array('q', [0])
+        self.length = 0
+        self.text = text
+        self.filename = filename
+        if text:
+            self.extend(text)
+
+    def extend(self, chunk):
+        """Index the next chunk of a source that is read piece by piece."""
+        starts = self.line_starts
+        base = self.length
+        find = chunk.find
+        newline = find('\n')
+        while newline != -1:
+            starts.append(base + newline + 1)
+            newline = find('\n', newline + 1)
+        self.length += len(chunk)
+
+    def track(self, chunks):
+        """Pass chunks through, indexing each one as it is read."""
+        for chunk in chunks:
+            self.extend(chunk)
+            yield chunk
+
+    def line_of(self, offset):
+        return bisect_right(self.line_starts, offset)
+
+    def position(self, offset):
+        """(line, col) of a character offset, both 1-based."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def offset(self, line, col=1):
+        """Character offset of a 1-based (line, col) position."""
+        return self.line_starts[line - 1] + col - 1
+
+    def line_text(self, line):
+        """Text of a 1-based line without its newline, or None if it is not available."""
+        if self.text is None or not 1 <= line <= len(self.line_starts):
+            return None
+        start = self.line_starts[line - 1]
+        end = self.text.find('\n', start)
+        return self.text[start:] if end == -1 else self.text[start:end]
+
+    def excerpt(self, line, col):
+        """The source line with a caret under col, for error messages ('' if unavailable)."""
+        text = self.line_text(line)
+        if text is None:
+            return ''
+        # Keep tabs so the caret lines up under the same characters
+        padding = ''.join(c if c == '\t' else ' ' for c in text[:max(col - 1, 0)])
+        return f"  {text}\n  {padding}^\n"
+
+
+class StreamIndex:
+    """
+    Line-start offsets of a file lexed while it is read (tokenize_iter of a file object).
+    Only the lines the lexer still has buffered are kept: discard drops the ones it has
+    passed. Its tokens get the SourceLine of their line instead of the index, so neither
+    grows with the input. Streamed text is not kept, so errors cannot quote the line.
+    """
+    __slots__ = ('line_starts', 'first_line', 'length', 'filename')
+
+    text = None
+
+    def __init__(self, filename='<stdin>'):
+        self.line_starts = array('q', [0])
+        self.first_line = 1  # line number of line_starts[0]
+        self.length = 0
+        self.filename = filename
+
+    extend = SourceIndex.extend
+    track = SourceIndex.track
+
+    def discard(self, offset):
+        """Forget the lines before the one holding offset."""
+        passed = bisect_right(self.line_starts, offset) - 1
+        if passed > 0:
+            del self.line_starts[:passed]
+            self.first_line += passed
+
+    def line_of(self, offset):
+        return bisect_right(self.line_starts, offset) + self.first_line - 1
+
+    def position(self, offset):
+        """(line, col) of a character offset on a line still kept, both 1-based."""
+        index = bisect_right(self.line_starts, offset)
+        return index + self.first_line - 1, offset - self.line_starts[index - 1] + 1
+
+    def source_line(self, offset):
+        """The SourceLine of the line holding offset, and the offset where the next line starts."""
+        index = bisect_right(self.line_starts, offset)
+        end = self.line_starts[index] if index < len(self.line_starts) else sys.maxsize
+        return SourceLine(index + self.first_line - 1, self.line_starts[index - 1]), end
+
+    def excerpt(self, line, col):
+        return ''
+
+
+class SourceLine:
+    """
+    The number and start offset of one line of a streamed file, shared by the tokens on it
+    in place of an index of the whole file. Answers the same questions as a SourceIndex for
+    offsets on its line.
+    """
+    __slots__ = ('line', 'start')
+
+    text = None
+
+    def __init__(self, line, start):
+        self.line = line
+        self.start = start
+
+    def line_of(self, offset):
+        return self.line
+
+    def position(self, offset):
+        return self.line, offset - self.start + 1
+
+    def excerpt(self, line, col):
+        return ''
+
+
+def line_starts_of(source_lines):
+    """
+    SourceIndex line starts rebuilt from the SourceLines of some tokens. A line that no
+    token is on starts where the next one does, which places every token the same.
+    """
+    starts = array('q', [0])
+    for source_line in sorted(set(source_lines), key=lambda source_line: source_line.line):
+        starts.extend([source_line.start] * (source_line.line - len(starts)))
+    return starts
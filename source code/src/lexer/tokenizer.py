@@ -1,18 +1,25 @@
 import re
+import sys
+import unicodedata
 from enum import Enum
+from src.lexer.source import SourceIndex, StreamIndex
 
 # Lexer Error class for consistent error formatting
 class LexerError(Exception):
-    def __init__(self, message, line, col, filename='<stdin>'):
+    def __init__(self, message, line, col, filename='<stdin>', source=None):
         self.message = message
         self.line = line
         self.col = col
         self.filename = filename
+        self.source = source  # SourceIndex, used to quote the offending line
         super().__init__(message)
     
     def as_string(self):
         # Match the format: Line X:Y\nLexerError: message
-        return f"Line {self.line}:{self.col}\nLexerError: {self.message}\n"
+        msg = f"Line {self.line}:{self.col}\nLexerError: {self.message}\n"
+        if self.source is not None:
+            msg += self.source.excerpt(self.line, self.col)
+        return msg
 
 # Token types
 class TokenType(Enum):
@@ -204,15 +211,80 @@ TOKEN_SPEC = [
     (None, r'[ \t]+'),
 ]
 
-def create_token(token_type, value, line, col):
+class Token:
+    """
+    A single lexeme. Slotted so large token streams stay small; the category is not stored
+    per token but looked up from the (interned) CATEGORY_MAP entry for its type.
+    Only the start offset is stored: line and col are computed on demand from the
+    SourceIndex shared by every token of a file (or, for a streamed file, the SourceLine
+    shared by every token of a line).
+    Still supports the dict-style access (token['value'], token.get('col', 0)) used everywhere.
+    """
+    __slots__ = ('type', 'value', 'offset', 'source')
+
+    FIELDS = ('type', 'value', 'line', 'col', 'category')
+
+    def __init__(self, token_type, value, offset, source):
+        self.type = token_type
+        self.value = value
+        self.offset = offset
+        self.source = source
+
+    @property
+    def category(self):
+        return TOKEN_CATEGORIES.get(self.type, self.type)
+
+    @property
+    def line(self):
+        return self.source.line_of(self.offset)
+
+    @property
+    def col(self):
+        return self.source.position(self.offset)[1]
+
+    def __getitem__(self, key):
+        if key in Token.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in ('type', 'value'):
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        if key in Token.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key):
+        return key in Token.FIELDS
+
+    def __iter__(self):
+        return iter(Token.FIELDS)
+
+    def __len__(self):
+        return len(Token.FIELDS)
+
+    def keys(self):
+        return Token.FIELDS
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in Token.FIELDS]
+
+    def __eq__(self, other):
+        if isinstance(other, (Token, dict)):
+            return all(self[key] == other.get(key) for key in Token.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+def create_token(token_type, value, offset, source):
     
-    return {
-        'type': token_type,
-        'value': value,
-        'line': line,
-        'col': col,
-        'category': None,
-}
+    return Token(token_type, value, offset, source)
 
 CATEGORY_MAP = { # TokenType: Category Name
 
@@ -340,173 +412,369 @@ CATEGORY_MAP = { # TokenType: Category Name
 
 }
 
+# Category strings are interned once per type, so every Token of a type shares one string
+TOKEN_CATEGORIES = {token_type: sys.intern(category) for token_type, category in CATEGORY_MAP.items()}
+
+# Master pattern: every TOKEN_SPEC entry becomes one named alternative (T0, T1, ...)
+# of a single regex, compiled once at import time. Python's alternation is ordered,
+# so the first entry that matches still wins, exactly like trying TOKEN_SPEC in order.
+def _spec_alternatives(spec):
+    alternatives = []
+    for index, (token_type, pattern, *flags) in enumerate(spec):
+        if flags and flags[0] & re.DOTALL:
+            pattern = f'(?s:{pattern})'
+        alternatives.append(f'(?P<T{index}>{pattern})')
+    return alternatives
+
+# Characters that get a dedicated, smaller alternation (anything else uses MASTER_REGEX)
+DISPATCH_CHARS = [chr(code) for code in range(128)] + ['…']
+
+_CATEGORY_CLASSES = {
+    'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W',
+}
+
+def _first_chars(parsed):
+    """
+    Characters (out of DISPATCH_CHARS) a parsed pattern can start with.
+    Returns (chars, nullable), or None when the pattern uses a construct we do not analyse,
+    in which case the alternative is kept for every character.
+    """
+    chars = set()
+    for op, arg in parsed:
+        name = str(op)
+        if name == 'AT':
+            continue  # zero-width assertions (\b) consume nothing
+        if name == 'LITERAL':
+            chars.add(chr(arg))
+            return chars, False
+        if name == 'NOT_LITERAL':
+            chars.update(c for c in DISPATCH_CHARS if ord(c) != arg)
+            return chars, False
+        if name == 'IN':
+            members = _class_chars(arg)
+            if members is None:
+                return None
+            chars.update(members)
+            return chars, False
+        if name == 'ANY':
+            chars.update(DISPATCH_CHARS)
+            return chars, False
+        if name == 'SUBPATTERN':
+            result = _first_chars(arg[-1])
+        elif name == 'BRANCH':
+            result = (set(), False)
+            for branch in arg[1]:
+                sub = _first_chars(branch)
+                if sub is None:
+                    return None
+                result = (result[0] | sub[0], result[1] or sub[1])
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT'):
+            minimum, _, sub_pattern = arg
+            result = _first_chars(sub_pattern)
+            if result is not None and minimum == 0:
+                result = (result[0], True)
+        else:
+            return None
+        if result is None:
+            return None
+        chars.update(result[0])
+        if not result[1]:
+            return chars, False
+    return chars, True
+
+def _class_chars(items):
+    pattern = []
+    negate = False
+    for op, arg in items:
+        name = str(op)
+        if name == 'NEGATE':
+            negate = True
+        elif name == 'LITERAL':
+            pattern.append(re.escape(chr(arg)))
+        elif name == 'RANGE':
+            pattern.append(f'{re.escape(chr(arg[0]))}-{re.escape(chr(arg[1]))}')
+        elif name == 'CATEGORY' and str(arg) in _CATEGORY_CLASSES:
+            pattern.append(_CATEGORY_CLASSES[str(arg)])
+        else:
+            return None
+    char_class = re.compile(f"[{'^' if negate else ''}{''.join(pattern)}]")
+    return {c for c in DISPATCH_CHARS if char_class.match(c)}
+
+def _build_dispatch_table(spec, alternatives):
+    """
+    Map each dispatch character to a regex holding only the alternatives that can start
+    with it (still in TOKEN_SPEC order), so a match no longer tries all ~80 patterns.
+    """
+    try:
+        from re import _parser as sre_parse
+    except ImportError:  # Python < 3.11
+        import sre_parse
+    first_sets = []
+    for index, (token_type, pattern, *flags) in enumerate(spec):
+        try:
+            first = _first_chars(sre_parse.parse(pattern, flags[0] if flags else 0))
+        except Exception:
+            first = None
+        # A nullable or unanalysable pattern could start anywhere
+        first_sets.append(None if first is None or first[1] else first[0])
+
+    table = {}
+    compiled = {}
+    for char in DISPATCH_CHARS:
+        indices = tuple(i for i, first in enumerate(first_sets) if first is None or char in first)
+        if indices not in compiled:
+            compiled[indices] = re.compile('|'.join(alternatives[i] for i in indices)) if indices else None
+        table[char] = compiled[indices]
+    return table
+
+_ALTERNATIVES = _spec_alternatives(TOKEN_SPEC)
+MASTER_REGEX = re.compile('|'.join(_ALTERNATIVES))
+DISPATCH_TABLE = _build_dispatch_table(TOKEN_SPEC, _ALTERNATIVES)
+
+
+# Group name -> token type; the type is None for skipped lexemes such as whitespace
+# and BTW comments.
+GROUP_TYPES = {f'T{index}': token_type for index, (token_type, *_) in enumerate(TOKEN_SPEC)}
+
+# Files are read CHUNK_SIZE characters at a time (rounded to whole lines). A match is only
+# attempted while at least LOOKAHEAD_MARGIN characters are buffered past the current position,
+# so multi-word keywords (whose \s+ may span lines) are never cut at a chunk boundary.
+CHUNK_SIZE = 64 * 1024
+LOOKAHEAD_MARGIN = 4096
+
+def _read_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield the source text in blocks that end on a line boundary (except possibly the last)."""
+    if isinstance(source, str):
+        if source:
+            yield source
+        return
+    pending = []
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        cut = chunk.rfind('\n') + 1
+        if cut == 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        yield ''.join(pending)
+        pending = [chunk[cut:]]
+    tail = ''.join(pending)
+    if tail:
+        yield tail
+
+def _fill(chunks, text, minimum):
+    """Append chunks to text until it holds at least minimum characters. Returns (text, eof)."""
+    parts = [text] if text else []
+    size = len(text)
+    while size < minimum:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return ''.join(parts), True
+        parts.append(chunk)
+        size += len(chunk)
+    return (parts[0] if len(parts) == 1 else ''.join(parts)), False
+
+# Inside a YARN literal: a run of plain characters, which is copied as one slice
+STRING_RUN = re.compile(r'[^":\n]+')
+# :(<hex>) is a Unicode code point, :[<name>] a Unicode character name
+HEX_ESCAPE = re.compile(r':\(([0-9A-Fa-f]+)\)')
+NAME_ESCAPE = re.compile(r':\[([^\]\n]*)\]')
+
+# Single-character escapes :) :> :o :" ::
+STRING_ESCAPES = {
+    ')': '\n',   # newline
+    '>': '\t',   # tab
+    'o': '\a',   # bell/beep
+    '"': '"',    # literal quote
+    ':': ':',    # literal colon
+}
+
+def scan_string(code, pos, index=None, base=0, filename='<stdin>'):
+    """
+    Scan YARN literal content starting at code[pos], up to (not including) the closing
+    quote or the end of the line. Plain runs are copied as slices and escapes decoded.
+    Returns (value, end position). index and base are only used to place errors.
+    """
+    parts = []
+    run_match = STRING_RUN.match
+    code_length = len(code)
+    while True:
+        run = run_match(code, pos)
+        if run is not None:
+            parts.append(run.group())
+            pos = run.end()
+        if pos >= code_length or code[pos] != ':':
+            # The closing quote or the end of the line
+            break
+        next_char = code[pos + 1] if pos + 1 < code_length else ''
+        escape = STRING_ESCAPES.get(next_char)
+        if escape is not None:
+            parts.append(escape)
+            pos += 2
+        elif next_char == '(':
+            match = HEX_ESCAPE.match(code, pos)
+            code_point = int(match.group(1), 16) if match else None
+            if code_point is None or code_point > 0x10FFFF:
+                line, col = index.position(base + pos) if index else (0, 0)
+                raise LexerError("Invalid hex escape in string (expected :(<hex code point>))", line, col, filename, index)
+            if 0xD800 <= code_point <= 0xDFFF:
+                # Surrogates are not characters, and VISIBLE could not write them
+                line, col = index.position(base + pos) if index else (0, 0)
+                raise LexerError(f"Invalid hex escape in string (:({match.group(1)}) is a surrogate, not a character)", line, col, filename, index)
+            parts.append(chr(code_point))
+            pos = match.end()
+        elif next_char == '[':
+            match = NAME_ESCAPE.match(code, pos)
+            try:
+                parts.append(unicodedata.lookup(match.group(1)))
+            except (AttributeError, KeyError):
+                line, col = index.position(base + pos) if index else (0, 0)
+                raise LexerError("Unknown Unicode character name in string (expected :[<character name>])", line, col, filename, index)
+            pos = match.end()
+        else:
+            # Not an escape: the colon is kept as-is
+            parts.append(':')
+            pos += 1
+    return ''.join(parts), pos
+
 def tokenize(code, filename='<stdin>'):
     """
     Tokenize LOLCODE source code.
     Returns a list of tokens.
     """
-    tokens = []
-    line = 1
-    col = 1
+    return list(tokenize_iter(code, filename))
+
+def tokenize_iter(source, filename='<stdin>'):
+    """
+    Tokenize LOLCODE source lazily, yielding one token at a time.
+    source is either a string or a text file object, which is read in chunks so memory use
+    does not grow with the input. Ellipsis line continuations are folded as tokens are produced.
+    All tokens of a string share one SourceIndex (token.source) that maps their offsets to
+    line/col; those of a file object share one SourceLine per line (see StreamIndex).
+    """
+    if isinstance(source, str):
+        index = SourceIndex(source, filename)
+        return _scan(iter([source] if source else []), index, filename)
+    index = StreamIndex(filename)
+    return _scan(index.track(_read_chunks(source)), index, filename)
+
+def _scan(chunks, index, filename, base=0):
+    """
+    The lexer loop behind tokenize_iter. chunks yields the text to lex, which starts at
+    character offset base of the file described by index (a SourceIndex, or the StreamIndex
+    of a streamed file); lexing must begin at the start of a line.
+    """
+    code = ''
+    code_length = 0
+    eof = False
+    # Reading more input is needed once pos passes refill_at (unless the input is exhausted)
+    refill_at = 0
+    # pos is relative to code, which starts at offset base of the file
     pos = 0
     in_string = False
+    # An ellipsis swallows the NEWLINE right after it (one token of lookahead)
+    pending_ellipsis = False
+    dispatch_table = DISPATCH_TABLE
+    group_types = GROUP_TYPES
+    # Keyword and identifier lexemes repeat a lot; share one string per distinct lexeme of
+    # the text buffered (the table is cleared on every refill, so it stays small)
+    lexemes = {}
+    # What tokens get as their source: the index, or for a streamed file the SourceLine of
+    # the line before line_end (the index then only keeps the lines still buffered)
+    streamed = isinstance(index, StreamIndex)
+    source, line_end = index, (-1 if streamed else sys.maxsize)
+    # Offset of the last token that is not a NEWLINE (used to reject inline OBTW comments)
+    last_significant = None
     
-    while pos < len(code):
-        match_found = False
-        
+    while True:
+        if pos >= refill_at and not eof:
+            # Keep the previous character so \b still sees what precedes pos
+            keep = pos - 1 if pos else 0
+            code, eof = _fill(chunks, code[keep:], code_length - keep + CHUNK_SIZE)
+            code_length = len(code)
+            refill_at = code_length - LOOKAHEAD_MARGIN
+            pos -= keep
+            base += keep
+            lexemes.clear()
+            if streamed:
+                index.discard(base)
+        if pos >= code_length:
+            break
+
         # Special handling for string content when inside quotes
         if in_string and code[pos] != '"':
-            # Capture all content until the next quote, handling escape sequences
-            string_start = pos
-            string_col = col
-            string_value = []
-            
-            while pos < len(code) and code[pos] != '"':
-                if code[pos] == ':':
-                    # Check for escape sequences
-                    if pos + 1 < len(code):
-                        next_char = code[pos + 1]
-                        if next_char == ')':
-                            # :) represents newline
-                            string_value.append('\n')
-                            pos += 2
-                            col += 2
-                            continue
-                        elif next_char == '>':
-                            # :> represents tab
-                            string_value.append('\t')
-                            pos += 2
-                            col += 2
-                            continue
-                        elif next_char == 'o':
-                            # :o represents bell/beep (we'll use \a)
-                            string_value.append('\a')
-                            pos += 2
-                            col += 2
-                            continue
-                        elif next_char == '"':
-                            # :" represents literal quote
-                            string_value.append('"')
-                            pos += 2
-                            col += 2
-                            continue
-                        elif next_char == ':':
-                            # :: represents literal colon
-                            string_value.append(':')
-                            pos += 2
-                            col += 2
-                            continue
-                        elif next_char in ('(', '['):
-                            # :( and :[ are for unicode/hex - for now just keep as-is
-                            string_value.append(code[pos])
-                            pos += 1
-                            col += 1
-                            continue
-                
-                # Regular character
-                if code[pos] == '\n':
-                    # Strings can't span multiple lines without escape
-                    break
-                string_value.append(code[pos])
-                pos += 1
-                col += 1
-            
-            if string_value:
-                value = ''.join(string_value)
-                tok = create_token(TokenType.STRING, value, line, string_col)
-                tok['category'] = CATEGORY_MAP.get(TokenType.STRING, TokenType.STRING)
-                tokens.append(tok)
-            match_found = True
-        else:
-            # Try each token pattern
-            for token_type, pattern, *flags in TOKEN_SPEC:
-                regex_flags = flags[0] if flags else 0
-                regex = re.compile(pattern, regex_flags)
-                match = regex.match(code, pos)
-                
-                if match:
-                    value = match.group()
-                    
-                    # Skip whitespace (token_type is None)
-                    if token_type is not None:
-                        # Check for malformed comment keywords that got matched as identifiers
-                        if token_type == TokenType.IDENTIFIER and value.startswith(('BTW', 'OBTW', 'TLDR')):
-                            raise LexerError(f"Invalid comment keyword '{value}'", line, col, filename)
-                        
-                        # Validate multiline comment placement
-                        if token_type == TokenType.COMMENT:
-                            # Check if the previous non-whitespace token is a newline or if we're at start
-                            # This ensures OBTW...TLDR only appears between statements
-                            if tokens:
-                                # Look back to find the last non-newline token
-                                last_significant_token = None
-                                for t in reversed(tokens):
-                                    if t['type'] != TokenType.NEWLINE:
-                                        last_significant_token = t
-                                        break
-                                
-                                # If there's a significant token on the same line, it's inline - not allowed
-                                if last_significant_token and last_significant_token['line'] == line:
-                                    raise LexerError(f"Multiline comments (OBTW...TLDR) cannot appear inline within statements.\nThey must be placed on their own lines between statements.", line, col, filename)
-                            
-                            # Skip adding the comment token - we don't need it in the token stream
-                            # Update position tracking and continue without adding token
-                            newline_count = value.count('\n')
-                            if newline_count == 0:
-                                col += len(value)
-                            else:
-                                line += newline_count
-                                col = len(value) - value.rfind('\n')
-                            pos = match.end()
-                            match_found = True
-                            break
-                        
-                        # Track when we enter/exit string mode
-                        if token_type == TokenType.QUOTE:
-                            in_string = not in_string
-                        
-                        tok = create_token(token_type, value, line, col)
-                        if tok['type'] in CATEGORY_MAP:
-                            tok['category'] = CATEGORY_MAP[tok['type']]
-                        else:
-                            tok['category'] = tok['type']
-                        tokens.append(tok)
-                    
-                    # Update pos tracking
-                    newline_count = value.count('\n')
-                    if newline_count == 0:
-                        col += len(value)
-                    else:
-                        line += newline_count
-                        col = len(value) - value.rfind('\n')
-                        
-                    pos = match.end()
-                    match_found = True
-                    break
-        
-        if not match_found:
+            string_start = base + pos
+            value, pos = scan_string(code, pos, index, base, filename)
+            if value:
+                last_significant = string_start
+                pending_ellipsis = False
+                if string_start >= line_end:
+                    source, line_end = index.source_line(string_start)
+                yield Token(TokenType.STRING, value, string_start, source)
+            elif pos < code_length and code[pos] == '\n':
+                # The string was never closed before the end of the line
+                line, col = index.position(base + pos)
+                raise LexerError("Unterminated string literal (missing closing '\"')", line, col, filename, index)
+            continue
+
+        regex = dispatch_table.get(code[pos], MASTER_REGEX)
+        match = regex.match(code, pos) if regex is not None else None
+        if match is None:
             # Handle unexpected character
             char = code[pos]
-            raise LexerError(f"Unexpected character '{char}'", line, col, filename)
-    
-    # Post-process: Handle ellipsis line continuation
-    # Ellipsis (...  or …) at end of line allows continuation to next line
-    # Remove ellipsis token and the immediately following newline token
-    filtered_tokens = []
-    i = 0
-    while i < len(tokens):
-        token = tokens[i]
-        if token['type'] == TokenType.ELLIPSIS:
-            # Skip the ellipsis token
-            # Also skip the next token if it's a newline
-            if i + 1 < len(tokens) and tokens[i + 1]['type'] == TokenType.NEWLINE:
-                i += 2  # Skip both ellipsis and newline
+            line, col = index.position(base + pos)
+            raise LexerError(f"Unexpected character '{char}'", line, col, filename, index)
+
+        token_type = group_types[match.lastgroup]
+
+        # Skip whitespace (token_type is None)
+        if token_type is not None:
+            value = match.group()
+            # Check for malformed comment keywords that got matched as identifiers
+            if token_type is TokenType.IDENTIFIER and value.startswith(('BTW', 'OBTW', 'TLDR')):
+                if not eof and value.startswith('OBTW'):
+                    # An OBTW whose TLDR is not buffered yet: read further and match again
+                    keep = pos - 1 if pos else 0
+                    code, eof = _fill(chunks, code[keep:], 2 * (code_length - keep) + CHUNK_SIZE)
+                    code_length = len(code)
+                    refill_at = code_length - LOOKAHEAD_MARGIN
+                    pos -= keep
+                    base += keep
+                    lexemes.clear()
+                    if streamed:
+                        index.discard(base)
+                    continue
+                line, col = index.position(base + pos)
+                raise LexerError(f"Invalid comment keyword '{value}'", line, col, filename, index)
+            
+            if token_type is TokenType.COMMENT:
+                # Validate multiline comment placement: OBTW...TLDR may only appear between
+                # statements, so no significant token may precede it on the same line
+                if last_significant is not None and index.line_of(last_significant) == index.line_of(base + pos):
+                    line, col = index.position(base + pos)
+                    raise LexerError(f"Multiline comments (OBTW...TLDR) cannot appear inline within statements.\nThey must be placed on their own lines between statements.", line, col, filename, index)
+                # The comment itself is not part of the token stream
             else:
-                i += 1  # Just skip ellipsis
-        else:
-            filtered_tokens.append(token)
-            i += 1
-    
-    return filtered_tokens
-
-
+                # Track when we enter/exit string mode
+                if token_type is TokenType.QUOTE:
+                    in_string = not in_string
+                
+                if token_type is not TokenType.NEWLINE:
+                    last_significant = base + pos
+                if token_type is TokenType.ELLIPSIS:
+                    # Ellipsis (... or …) at end of line continues the statement on the next line
+                    pending_ellipsis = True
+                elif pending_ellipsis and token_type is TokenType.NEWLINE:
+                    pending_ellipsis = False
+                else:
+                    pending_ellipsis = False
+                    offset = base + pos
+                    if offset >= line_end:
+                        source, line_end = index.source_line(offset)
+                    yield Token(token_type, lexemes.setdefault(value, value), offset, source)
+            
+        pos = match.end()
@@ -1,6 +1,9 @@
+from collections import deque
 from src.lexer import tokenizer
 
 TokenType = tokenizer.TokenType
+# Tokens come from the lexer as Token objects; hand-built ones may still be plain dicts
+TokenLike = (dict, tokenizer.Token)
 
 # PARSER NOTES
 
@@ -298,10 +301,42 @@ class ArrayDischargeNode:
   def __repr__(self):
     return f"DISCHARGE({self.array_name_token['value']} AT {self.index_expr})"
 
+class ArrayFillNode:
+  def __init__(self, value_expr, array_name_token):
+    self.value_expr = value_expr
+    self.array_name_token = array_name_token
+
+  def __repr__(self):
+    return f"CONFINE({self.value_expr} IN {self.array_name_token['value']})"
+
+class ArraySliceNode:
+  def __init__(self, array_name_token, start_expr, end_expr):
+    self.array_name_token = array_name_token
+    self.start_expr = start_expr
+    self.end_expr = end_expr
+
+  def __repr__(self):
+    return f"ArraySlice({self.array_name_token['value']}[{self.start_expr} TIL {self.end_expr}])"
+
+class ArrayReduceNode:
+  def __init__(self, operation, array_expr):
+    self.operation = operation  # SUM OF, BIGGR OF or SMALLR OF
+    self.array_expr = array_expr
+
+  def __repr__(self):
+    return f"{self.operation['value']} UHS {self.array_expr}"
+
 #------------------------------------------------------------------------------------------------
 # ERRORS
 #------------------------------------------------------------------------------------------------
 
+def source_excerpt(token):
+  """The token's source line with a caret under it, or '' when the source is not available"""
+  if isinstance(token, tokenizer.Token) and token.source is not None:
+    line, col = token.source.position(token.offset)
+    return token.source.excerpt(line, col)
+  return ''
+
 class Error:
   def __init__(self, token, details, error_name):
       self.token = token
@@ -324,10 +359,10 @@ class InvalidSyntaxError(Error):
     self.parse_stack = parse_stack or []
 
   def as_string(self):
-    base_cat = self.category or (self.start_token.get('category') if isinstance(self.start_token, dict) else None) or (self.start_token.get('type').value if isinstance(self.start_token, dict) else 'UNKNOWN')
-    lexeme = self.start_token['value'] if isinstance(self.start_token, dict) else '<UNKNOWN>'
-    line = self.start_token['line'] if isinstance(self.start_token, dict) else 0
-    col = self.start_token.get('col', 0) if isinstance(self.start_token, dict) else 0
+    base_cat = self.category or (self.start_token.get('category') if isinstance(self.start_token, TokenLike) else None) or (self.start_token.get('type').value if isinstance(self.start_token, TokenLike) else 'UNKNOWN')
+    lexeme = self.start_token['value'] if isinstance(self.start_token, TokenLike) else '<UNKNOWN>'
+    line = self.start_token['line'] if isinstance(self.start_token, TokenLike) else 0
+    col = self.start_token.get('col', 0) if isinstance(self.start_token, TokenLike) else 0
     
     # Format: Line X:Y, SyntaxError: message (consistent with lexer/runtime errors)
     msg = f'Line {line}:{col}\n'
@@ -355,11 +390,11 @@ class InvalidSyntaxError(Error):
       for ctx in self.parse_stack:
         ctx_filename = ctx.get('filename', '<stdin>')
         ctx_line = ctx.get('line', 0)
-        ctx_col = ctx['token'].get('col', 0) if isinstance(ctx.get('token'), dict) else 0
+        ctx_col = ctx['token'].get('col', 0) if isinstance(ctx.get('token'), TokenLike) else 0
         traceback += f'  File "{ctx_filename}", line {ctx_line}:{ctx_col}, in {ctx["function"]}\n'
       msg = traceback + msg
     
-    return msg + "\n"
+    return msg + "\n" + source_excerpt(self.start_token)
 
 class RuntimeError(Error):
   def __init__(self, token, details, filename='<stdin>'):
@@ -368,7 +403,7 @@ class RuntimeError(Error):
   
   def as_string(self):
     # Handle different token formats
-    if isinstance(self.token, dict):
+    if isinstance(self.token, TokenLike):
       line = self.token.get('line', 'unknown')
       col = self.token.get('col', 0)
       value = self.token.get('value', '<unknown>')
@@ -377,33 +412,84 @@ class RuntimeError(Error):
       msg += f'RuntimeError: {self.details}\n'
       if value and value != '<unknown>':
         msg += f'  at: {repr(value)}\n'
-      return msg
+      return msg + source_excerpt(self.token)
     elif isinstance(self.token, tuple):
       # Handle tuple format: (category, subcategory, line_number, token)
       category = self.token[0] if len(self.token) > 0 else 'Unknown'
       line = self.token[2] if len(self.token) > 2 else 'unknown'
       token = self.token[3] if len(self.token) > 3 else None
-      col = token.get('col', 0) if isinstance(token, dict) else 0
+      col = token.get('col', 0) if isinstance(token, TokenLike) else 0
       # Simplified format: just line number
       msg = f'Line {line}:{col}\n'
       msg += f'RuntimeError: {self.details}\n'
       if category and category != 'Unknown':
         msg += f'  Category: {category}\n'
-      return msg
+      return msg + source_excerpt(token)
     else:
       # Fallback format
       msg = f'RuntimeError: {self.details}\n'
       return msg
 
     
+#------------------------------------------------------------------------------------------------
+# TOKEN BUFFER
+#------------------------------------------------------------------------------------------------
+
+class TokenBuffer:
+  """
+  Small sliding window over a token list or a tokenize_iter() generator.
+  Tokens are pulled only when the parser looks ahead, and just the last few consumed
+  tokens are kept (for peek(-1) and one step of backtracking).
+  """
+  def __init__(self, tokens, history=2):
+    self.source = iter(tokens)
+    self.lookahead = deque()
+    self.history = deque([None], maxlen=history)  # consumed tokens, most recent last
+    self.current = None
+    self.index = -1
+    self.exhausted = False  # advanced past the last token
+
+  def advance(self):
+    self.index += 1
+    token = self.lookahead.popleft() if self.lookahead else next(self.source, None)
+    if token is None:
+      # Past the end the current token stays the last one, as with an out-of-range index
+      self.history.append(None if self.exhausted else self.current)
+      self.exhausted = True
+      return self.current
+    if self.index > 0:
+      self.history.append(self.current)
+    self.current = token
+    return token
+
+  def retreat(self):
+    """Step back one token (only valid right after advance() returned a new token)."""
+    self.lookahead.appendleft(self.current)
+    self.current = self.history.pop() if self.history else None
+    self.index -= 1
+    return self.current
+
+  def peek(self, offset=1):
+    if offset < 0:
+      return self.history[offset] if -offset <= len(self.history) else None
+    if offset == 0:
+      return None if self.exhausted else self.current
+    while len(self.lookahead) < offset:
+      token = next(self.source, None)
+      if token is None:
+        return None
+      self.lookahead.append(token)
+    return self.lookahead[offset - 1]
+
 #------------------------------------------------------------------------------------------------
 # PARSER
 #------------------------------------------------------------------------------------------------
 
 class Parser:
   def __init__(self, tokens, filename='<stdin>'):
-    self.tokens = tokens
-    self.token_index = -1
+    # tokens may be a list or any iterable of tokens (e.g. tokenizer.tokenize_iter(file))
+    self.tokens = TokenBuffer(tokens)
+    self.current_token = None
     self.parse_stack = []  # Stack to track parsing context
     self.control_flow_stack = []  # Stack to track control flow contexts (switch/loop/function) for GTFO validation
     self.filename = filename
@@ -454,30 +540,41 @@ class Parser:
         found = self.current_token['value']
     
     # If parse_stack is empty, create a minimal stack with filename from parser
-    parse_stack = list(self.parse_stack) if self.parse_stack else [{'filename': self.filename, 'line': start_token.get('line', 0) if isinstance(start_token, dict) else 0, 'token': start_token, 'function': 'parse', 'expected': None}]
+    parse_stack = list(self.parse_stack) if self.parse_stack else [{'filename': self.filename, 'line': start_token.get('line', 0) if isinstance(start_token, TokenLike) else 0, 'token': start_token, 'function': 'parse', 'expected': None}]
     
     return InvalidSyntaxError(
       start_token,
       details='',
       expected=expected,
       found=found,
-      category=category or (start_token.get('category') if isinstance(start_token, dict) else None),
+      category=category or (start_token.get('category') if isinstance(start_token, TokenLike) else None),
       context_kind=context_kind,
       start_token=start_token,
       failing_token=failing_token or self.current_token,
       parse_stack=parse_stack
     )
 
+  @property
+  def token_index(self):
+    return self.tokens.index
+
+  def at_end(self):
+    """True once the parser has advanced past the last token"""
+    return self.tokens.exhausted
+
+  def at_last_token(self):
+    """True when no token follows the current one"""
+    return self.tokens.peek() is None
+
   def peek(self, offset=1):
-    index = self.token_index + offset
-    if 0 <= index < len(self.tokens):
-      return self.tokens[index]
-    return None
+    return self.tokens.peek(offset)
 
   def advance(self):
-    self.token_index += 1
-    if (self.token_index < len(self.tokens)):
-      self.current_token = self.tokens[self.token_index]
+    self.current_token = self.tokens.advance()
+    return self.current_token
+
+  def retreat(self):
+    self.current_token = self.tokens.retreat()
     return self.current_token
 
   def parse(self):
@@ -538,14 +635,14 @@ class Parser:
 
     # Parse function definitions after KTHXBYE
     # Skip newlines after KTHXBYE
-    while (self.token_index < len(self.tokens) and 
+    while (not self.at_end() and 
            self.current_token and 
            self.current_token['type'] == TokenType.NEWLINE):
       self.advance()
     
     # Collect functions defined after KTHXBYE
     functions_after = []
-    while (self.token_index < len(self.tokens) and
+    while (not self.at_end() and
            self.current_token and 
            self.current_token['type'] == TokenType.HOW_IZ_I):
       func_def = res.register(self.function_definition())
@@ -555,7 +652,7 @@ class Parser:
       functions_after.append(func_def)
       
       # Skip newlines after function definition
-      while (self.token_index < len(self.tokens) and
+      while (not self.at_end() and
              self.current_token and 
              self.current_token['type'] == TokenType.NEWLINE):
         self.advance()
@@ -583,11 +680,11 @@ class Parser:
     res = ParseResult()
     variable_declarations = []
 
-    while (self.current_token['type'] != TokenType.BUHBYE and self.token_index < len(self.tokens) - 1):
+    while (self.current_token['type'] != TokenType.BUHBYE and not self.at_last_token()):
       # Skip leading newlines
       while self.current_token['type'] == TokenType.NEWLINE:
         self.advance()
-      if self.current_token['type'] == TokenType.BUHBYE or self.token_index >= len(self.tokens) - 1:
+      if self.current_token['type'] == TokenType.BUHBYE or self.at_last_token():
         break
       
       variable_declaration = res.register(self.variable_declaration())
@@ -697,13 +794,13 @@ class Parser:
     res = ParseResult()
     statements = []
 
-    while (self.current_token['type'] != TokenType.KTHXBYE and self.token_index < len(self.tokens) - 1):
+    while (self.current_token['type'] != TokenType.KTHXBYE and not self.at_last_token()):
       # Skip leading newlines
       while self.current_token['type'] == TokenType.NEWLINE:
         self.advance()
       
       # Check again after skipping newlines
-      if self.current_token['type'] == TokenType.KTHXBYE or self.token_index >= len(self.tokens) - 1:
+      if self.current_token['type'] == TokenType.KTHXBYE or self.at_last_token():
         break
       
       prev_token_index = self.token_index  # Track position before parsing
@@ -811,8 +908,7 @@ class Parser:
         
         if self.current_token['type'] in (TokenType.R, TokenType.IS_NOW_A):
             # if assignment, backtrack
-            self.token_index -= 1
-            self.current_token = self.tokens[self.token_index]
+            self.retreat()
             res.node = res.register(self.assignment_statement())
             if res.error or res.node:
               self.pop_context()
@@ -1008,8 +1104,9 @@ class Parser:
       string_token = self.current_token
       self.advance() # Eat string content
     else:
-      # Empty string case - create a token with empty value
-      string_token = {'type': TokenType.STRING, 'value': '', 'line': opening_quote['line']}
+      # Empty string case - create a token with empty value. Unlike the dict it once was, it is a
+      # full Token (with the opening quote's col and a category), so it serializes like any other
+      string_token = tokenizer.Token(TokenType.STRING, '', opening_quote.offset, opening_quote.source)
 
     # Expect closing quote
     if self.current_token['type'] != TokenType.QUOTE:
@@ -1029,6 +1126,16 @@ class Parser:
 
     self.advance() # Eath
 
+    # SUM OF / BIGGR OF / SMALLR OF UHS <array>: reduction of a whole array
+    if self.current_token['type'] == TokenType.UHS and operation['type'] in (TokenType.SUM_OF, TokenType.BIGGR_OF, TokenType.SMALLR_OF):
+      self.advance() # Eat UHS
+      array_expr = res.register(self.arithmetic_expression())
+      self.pop_context()
+      if res.error: return res
+      if array_expr is None:
+        return res.failure(self.syntax_error(operation, 'array expression', self.current_token['value'], category='Arithmetic Operation', context_kind='arithmetic'))
+      return res.success(ArrayReduceNode(operation, array_expr))
+
     # Parse the left operand
     left = res.register(self.arithmetic_expression())
     if res.error:
@@ -1458,7 +1565,7 @@ class Parser:
   def array_operation(self):
     self.push_context('array_operation', 'CONFINE / DISCHARGE')
     res = ParseResult()
-    # Grammar: <array_operation> ::= CONFINE <nestable_expr> IN uhsident AT <index_expr> | DISCHARGE uhsident AT <index_expr>
+    # Grammar: <array_operation> ::= CONFINE <nestable_expr> IN uhsident AT <index_expr> | CONFINE <nestable_expr> IN uhsident | DISCHARGE uhsident AT <index_expr>
 
     if self.current_token['type'] == TokenType.CONFINE:
       self.advance() # Eat CONFINE
@@ -1485,6 +1592,11 @@ class Parser:
       array_name_token = self.current_token
       self.advance() # Eat identifier
 
+      # Without AT the value goes in every element
+      if self.current_token['type'] == TokenType.NEWLINE:
+        self.pop_context()
+        return res.success(ArrayFillNode(value_expr, array_name_token))
+
       # Expect AT
       if self.current_token['type'] != TokenType.AT:
         self.pop_context()
@@ -1537,7 +1649,7 @@ class Parser:
   def array_access(self):
     self.push_context('array_access', 'array[index]')
     res = ParseResult()
-    # Grammar: <array_access> ::= uhsident [ <index_expr> ]
+    # Grammar: <array_access> ::= uhsident [ <index_expr> ] | uhsident [ <index_expr> TIL <index_expr> ]
 
     if self.current_token['type'] != TokenType.IDENTIFIER:
       self.pop_context()
@@ -1561,6 +1673,15 @@ class Parser:
       self.pop_context()
       return res.failure(self.syntax_error(self.current_token, 'index expression', self.current_token['value'], category='Array Access', context_kind='array_access'))
 
+    # A slice: array[start TIL end]
+    end_expr = None
+    if self.current_token['type'] == TokenType.TIL:
+      self.advance() # Eat TIL
+      end_expr = res.register(self.index_expression())
+      if res.error:
+        self.pop_context()
+        return res
+
     # Expect RBRACKET
     if self.current_token['type'] != TokenType.RBRACKET:
       self.pop_context()
@@ -1568,6 +1689,8 @@ class Parser:
     self.advance() # Eat ]
 
     self.pop_context()
+    if end_expr is not None:
+      return res.success(ArraySliceNode(array_name_token, index_expr, end_expr))
     return res.success(ArrayAccessNode(array_name_token, index_expr))
 
   def index_expression(self):
@@ -0,0 +1,435 @@
+from array import array
+import gc
+import hashlib
+from itertools import repeat
+import struct
+import sys
+
+from src.lexer import tokenizer
+from src.lexer.source import SourceIndex, SourceLine, line_starts_of
+from src.parser import parser
+
+TokenType = tokenizer.TokenType
+Token = tokenizer.Token
+
+#------------------------------------------------------------------------------------------------
+# COMPACT BINARY AST FORMAT
+#------------------------------------------------------------------------------------------------
+#
+# dump(ast) -> bytes and load(data) -> ast. The value may be any AST node, or lists/tuples
+# of nodes and tokens (e.g. (tokens, ast)). Layout, all integers little-endian:
+#
+#   MAGIC, FORMAT_VERSION (1 byte), SCHEMA_DIGEST (8 bytes)
+#   constant pool   varint count, then per string: varint byte length + UTF-8 bytes
+#   line starts     varint count + uint32 array (the SourceIndex of the tokens)
+#   token table     varint count, then three arrays: type (1 byte, index into TokenType),
+#                   value (uint32 pool index), offset (uint32)
+#   node stream     postfix opcodes: operands come first, then the opcode that combines them
+#
+# Node classes are tagged by their position in NODE_FIELDS and store those fields in order.
+# Strings are interned through the constant pool, so every identifier is stored once.
+
+MAGIC = b'LOLA'
+FORMAT_VERSION = 2
+
+# Node class -> the attributes that are serialized, in order
+NODE_FIELDS = {
+  parser.IntegerNode: ('token',),
+  parser.FloatNode: ('token',),
+  parser.BooleanNode: ('token',),
+  parser.StringNode: ('token', 'value'),
+  parser.NoobNode: ('line_number',),
+  parser.StringConcatNode: ('operands',),
+  parser.ArithmeticBinaryOpNode: ('left_node', 'operation', 'right_node'),
+  parser.BooleanBinaryOpNode: ('left_node', 'operation', 'right_node'),
+  parser.BooleanUnaryOpNode: ('operation', 'operand'),
+  parser.BooleanTernaryOpNode: ('operation', 'boolean_statements'),
+  parser.ComparisonOpNode: ('left_node', 'operation', 'right_node'),
+  parser.VarAccessNode: ('var_name_token',),
+  parser.VarDeclarationNode: ('var_name_token', 'value_node'),
+  parser.VarAssignmentNode: ('var_to_access', 'value_to_assign'),
+  parser.StatementListNode: ('statements',),
+  parser.VarDecListNode: ('variable_declarations',),
+  parser.PrintNode: ('operands', 'suppress_newline'),
+  parser.TypecastNode: ('source_value', 'desired_type'),
+  parser.SwitchCaseNode: ('cases', 'cases_statements', 'default_case_statements'),
+  parser.IfNode: ('if_block_statements', 'else_block_statements', 'mebbe_cases'),
+  parser.LoopNode: ('label', 'operation', 'variable', 'clause_type', 'til_wile_expression', 'body_statements'),
+  parser.FuncDefNode: ('function_name', 'parameters', 'body_statements'),
+  parser.FuncCallNode: ('function_name', 'parameters'),
+  parser.InputNode: ('variable',),
+  parser.BreakNode: ('break_token',),
+  parser.ReturnNode: ('return_expression',),
+  parser.ProgramNode: ('sections',),
+  parser.ArrayDeclarationNode: ('array_name_token', 'element_type', 'size_expr'),
+  parser.ArrayAccessNode: ('array_name_token', 'index_expr'),
+  parser.ArrayConfineNode: ('value_expr', 'array_name_token', 'index_expr'),
+  parser.ArrayDischargeNode: ('array_name_token', 'index_expr'),
+  parser.ArrayFillNode: ('value_expr', 'array_name_token'),
+  parser.ArraySliceNode: ('array_name_token', 'start_expr', 'end_expr'),
+  parser.ArrayReduceNode: ('operation', 'array_expr'),
+}
+
+TOKEN_TYPES = list(TokenType)
+TOKEN_TYPE_INDEX = {token_type: index for index, token_type in enumerate(TOKEN_TYPES)}
+
+# Data loaded with a different node or token layout would decode into garbage, so the layout
+# itself is part of the header
+SCHEMA_DIGEST = hashlib.sha256(repr((
+  [token_type.name for token_type in TOKEN_TYPES],
+  [(cls.__name__, fields) for cls, fields in NODE_FIELDS.items()],
+)).encode()).digest()[:8]
+
+HEADER = MAGIC + bytes([FORMAT_VERSION]) + SCHEMA_DIGEST
+
+NODE_CLASSES = list(NODE_FIELDS)
+
+# Opcodes of the node stream
+OP_NONE = 0
+OP_TRUE = 1
+OP_FALSE = 2
+OP_INT = 3        # zigzag varint
+OP_FLOAT = 4      # 8-byte double
+OP_STR = 5        # varint pool index
+OP_TOKEN = 6      # varint token index
+OP_TOKENS = 7     # varint start, varint count: a list of consecutive tokens
+OP_TOKEN_TYPE = 8 # varint index into TokenType
+OP_LIST = 9       # varint item count
+OP_TUPLE = 10     # varint item count
+OP_NODE = 16      # OP_NODE + position of the class in NODE_FIELDS
+OP_LEAF = OP_NODE + len(NODE_CLASSES)
+                  # OP_LEAF + class position, varint token index: a node whose first field is
+                  # that token, with the other fields on the stack. It follows the OP_NODE range,
+                  # so a node class added to NODE_FIELDS moves it (and the SCHEMA_DIGEST)
+# Opcodes are single bytes, so the two ranges must fit in one
+assert OP_LEAF + len(NODE_CLASSES) <= 256, "too many node classes for one-byte opcodes"
+
+NODE_OPCODES = {cls: OP_NODE + index for index, cls in enumerate(NODE_CLASSES)}
+LEAF_OPCODES = {cls: OP_LEAF + index for index, cls in enumerate(NODE_CLASSES)}
+
+# Fixed-width arrays use 4-byte unsigned items
+UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+FLOAT = struct.Struct('<d')
+
+
+class FormatError(ValueError):
+  """The data is not a (compatible) serialized AST"""
+
+
+def _write_varint(out, value):
+  while value > 0x7F:
+    out.append((value & 0x7F) | 0x80)
+    value >>= 7
+  out.append(value)
+
+def _read_varint(data, pos):
+  result = 0
+  shift = 0
+  while True:
+    byte = data[pos]
+    pos += 1
+    result |= (byte & 0x7F) << shift
+    if byte < 0x80:
+      return result, pos
+    shift += 7
+
+def _uint32_bytes(values):
+  packed = array(UINT32, values)
+  if sys.byteorder == 'big':
+    packed.byteswap()
+  return packed.tobytes()
+
+def _uint32_array(data, pos, count):
+  end = pos + 4 * count
+  values = array(UINT32)
+  values.frombytes(data[pos:end])
+  if sys.byteorder == 'big':
+    values.byteswap()
+  return values, end
+
+
+#------------------------------------------------------------------------------------------------
+# DUMP
+#------------------------------------------------------------------------------------------------
+
+class _Encoder:
+  def __init__(self):
+    self.pool = {}     # string -> pool index
+    self.tokens = {}   # id(token) -> token index
+    self.token_list = []
+    self.source = None
+    self.stream = bytearray()
+
+  def string(self, value):
+    index = self.pool.get(value)
+    if index is None:
+      index = self.pool[value] = len(self.pool)
+    return index
+
+  def token(self, token):
+    index = self.tokens.get(id(token))
+    if index is None:
+      if token.source is not None and self.source is None:
+        self.source = token.source
+      index = self.tokens[id(token)] = len(self.token_list)
+      self.token_list.append(token)
+      self.string(token.value)
+    return index
+
+  def encode(self, root):
+    # Iterative post-order walk, so deeply nested expressions do not hit the recursion limit
+    out = self.stream
+    work = [(root, False)]
+    while work:
+      value, children_done = work.pop()
+      if type(children_done) in LEAF_OPCODES:
+        # value is the first field of the node children_done
+        out.append(LEAF_OPCODES[type(children_done)])
+        _write_varint(out, self.token(value))
+        continue
+      if children_done:
+        # All operands are in the stream; emit the opcode that combines them
+        if type(value) is list:
+          out.append(OP_LIST)
+          _write_varint(out, len(value))
+        elif type(value) is tuple:
+          out.append(OP_TUPLE)
+          _write_varint(out, len(value))
+        else:
+          out.append(NODE_OPCODES[type(value)])
+        continue
+
+      kind = type(value)
+      if kind in NODE_OPCODES:
+        fields = NODE_FIELDS[kind]
+        first = getattr(value, fields[0])
+        if type(first) is Token:
+          # Literals and variable references are most of the tree: their token goes into
+          # the node's own opcode instead of a separate OP_TOKEN
+          work.append((first, value))
+          fields = fields[1:]
+        else:
+          work.append((value, True))
+        for name in reversed(fields):
+          work.append((getattr(value, name), False))
+      elif kind is Token:
+        out.append(OP_TOKEN)
+        _write_varint(out, self.token(value))
+      elif kind is list or kind is tuple:
+        if kind is list and value and all(type(item) is Token for item in value):
+          indices = [self.token(item) for item in value]
+          if indices[-1] - indices[0] == len(indices) - 1 and indices == list(range(indices[0], indices[-1] + 1)):
+            out.append(OP_TOKENS)
+            _write_varint(out, indices[0])
+            _write_varint(out, len(indices))
+            continue
+        work.append((value, True))
+        for item in reversed(value):
+          work.append((item, False))
+      elif value is None:
+        out.append(OP_NONE)
+      elif value is True:
+        out.append(OP_TRUE)
+      elif value is False:
+        out.append(OP_FALSE)
+      elif kind is int:
+        out.append(OP_INT)
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+      elif kind is float:
+        out.append(OP_FLOAT)
+        out += FLOAT.pack(value)
+      elif kind is str:
+        out.append(OP_STR)
+        _write_varint(out, self.string(value))
+      elif kind is TokenType:
+        out.append(OP_TOKEN_TYPE)
+        _write_varint(out, TOKEN_TYPE_INDEX[value])
+      else:
+        raise TypeError(f"Cannot serialize {kind.__name__} in an AST")
+
+  def getvalue(self):
+    out = bytearray(HEADER)
+    _write_varint(out, len(self.pool))
+    for value in self.pool:
+      encoded = value.encode('utf-8', 'surrogatepass')
+      _write_varint(out, len(encoded))
+      out += encoded
+
+    if self.source is None:
+      line_starts = [0]
+    elif isinstance(self.source, SourceLine):
+      # Tokens of a streamed file only know their own lines
+      line_starts = line_starts_of(token.source for token in self.token_list)
+    else:
+      line_starts = self.source.line_starts
+    _write_varint(out, len(line_starts))
+    out += _uint32_bytes(line_starts)
+
+    tokens = self.token_list
+    _write_varint(out, len(tokens))
+    out += bytes(TOKEN_TYPE_INDEX[token.type] for token in tokens)
+    out += _uint32_bytes(self.pool[token.value] for token in tokens)
+    out += _uint32_bytes(token.offset for token in tokens)
+
+    out += self.stream
+    return bytes(out)
+
+
+def dump(ast):
+  """Serialize an AST (or a list/tuple of nodes and tokens) to bytes."""
+  encoder = _Encoder()
+  encoder.encode(ast)
+  return encoder.getvalue()
+
+
+#------------------------------------------------------------------------------------------------
+# LOAD
+#------------------------------------------------------------------------------------------------
+
+def load(data, source=None):
+  """
+  Rebuild the value passed to dump(). Tokens are attached to source (a SourceIndex) when
+  given, otherwise to a SourceIndex restored from the stored line offsets, without text.
+  Raises FormatError for data written by another format version or node layout.
+  """
+  if not data.startswith(HEADER):
+    raise FormatError("Not a serialized AST of this version")
+  pos = len(HEADER)
+  intern = sys.intern
+
+  count, pos = _read_varint(data, pos)
+  pool = []
+  for _ in range(count):
+    length, pos = _read_varint(data, pos)
+    pool.append(intern(data[pos:pos + length].decode('utf-8', 'surrogatepass')))
+    pos += length
+
+  count, pos = _read_varint(data, pos)
+  line_starts, pos = _uint32_array(data, pos, count)
+  if source is None:
+    source = SourceIndex()
+    source.line_starts = array('q', line_starts)
+    source.length = line_starts[-1]
+
+  count, pos = _read_varint(data, pos)
+  types = map(TOKEN_TYPES.__getitem__, data[pos:pos + count])
+  pos += count
+  values, pos = _uint32_array(data, pos, count)
+  offsets, pos = _uint32_array(data, pos, count)
+
+  # Loading only creates objects and never cycles; the collector would just rescan them
+  gc_was_enabled = gc.isenabled()
+  gc.disable()
+  try:
+    tokens = list(map(Token, types, map(pool.__getitem__, values), offsets, repeat(source)))
+    return _decode_stream(data, pos, pool, tokens)
+  except (IndexError, KeyError, struct.error) as e:
+    raise FormatError(f"Corrupt serialized AST: {e}") from None
+  finally:
+    if gc_was_enabled:
+      gc.enable()
+
+
+def _decode_stream(data, pos, pool, tokens):
+  node_types = [(cls, NODE_FIELDS[cls], len(NODE_FIELDS[cls])) for cls in NODE_CLASSES]
+  new = object.__new__
+  stack = []
+  push = stack.append
+  end = len(data)
+
+  # Opcodes are tested roughly in order of frequency, and one- and two-byte varints (any
+  # index below 16384) are decoded inline
+  while pos < end:
+    op = data[pos]
+    pos += 1
+
+    if op >= OP_LEAF:
+      operand = data[pos]
+      pos += 1
+      if operand & 0x80:
+        byte = data[pos]
+        pos += 1
+        operand = (operand & 0x7F) | (byte << 7)
+        if byte & 0x80:
+          operand, pos = _read_varint(data, pos - 2)
+      cls, fields, size = node_types[op - OP_LEAF]
+      node = new(cls)
+      attributes = node.__dict__
+      attributes[fields[0]] = tokens[operand]
+      if size > 1:
+        size -= 1
+        attributes.update(zip(fields[1:], stack[-size:]))
+        del stack[-size:]
+      push(node)
+      continue
+
+    if op >= OP_NODE:
+      cls, fields, size = node_types[op - OP_NODE]
+      node = new(cls)
+      if size == 1:
+        node.__dict__[fields[0]] = stack.pop()
+      elif size:
+        node.__dict__.update(zip(fields, stack[-size:]))
+        del stack[-size:]
+      push(node)
+      continue
+
+    if op == OP_TOKEN:
+      operand = data[pos]
+      pos += 1
+      if operand & 0x80:
+        byte = data[pos]
+        pos += 1
+        operand = (operand & 0x7F) | (byte << 7)
+        if byte & 0x80:
+          operand, pos = _read_varint(data, pos - 2)
+      push(tokens[operand])
+      continue
+
+    # Every other opcode but the constants takes a varint operand
+    if op > OP_FALSE and op != OP_FLOAT:
+      operand = data[pos]
+      pos += 1
+      if operand & 0x80:
+        byte = data[pos]
+        pos += 1
+        operand = (operand & 0x7F) | (byte << 7)
+        if byte & 0x80:
+          operand, pos = _read_varint(data, pos - 2)
+
+    if op == OP_LIST:
+      if operand:
+        items = stack[-operand:]
+        del stack[-operand:]
+        push(items)
+      else:
+        push([])
+    elif op == OP_FALSE:
+      push(False)
+    elif op == OP_STR:
+      push(pool[operand])
+    elif op == OP_TOKENS:
+      length, pos = _read_varint(data, pos)
+      push(tokens[operand:operand + length])
+    elif op == OP_NONE:
+      push(None)
+    elif op == OP_TRUE:
+      push(True)
+    elif op == OP_INT:
+      push(operand >> 1 if not operand & 1 else -(operand >> 1) - 1)
+    elif op == OP_FLOAT:
+      push(FLOAT.unpack_from(data, pos)[0])
+      pos += FLOAT.size
+    elif op == OP_TOKEN_TYPE:
+      push(TOKEN_TYPES[operand])
+    elif op == OP_TUPLE:
+      items = tuple(stack[-operand:]) if operand else ()
+      if operand:
+        del stack[-operand:]
+      push(items)
+    else:
+      raise FormatError(f"Unknown opcode {op}")
+
+  if len(stack) != 1:
+    raise FormatError("Corrupt serialized AST: unbalanced node stream")
+  return stack[0]
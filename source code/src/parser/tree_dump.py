@@ -0,0 +1,74 @@
+from . import parser
+from .serialize import NODE_FIELDS
+
+# The parse tree as main.py --ast prints it, the same text as repr(node) but produced a piece at a
+# time: repr of a large program builds one string holding the whole tree, and every node's repr
+# builds the string of its subtree first.
+#
+# Nodes that hold statements are streamed: their own __repr__ runs on a copy whose child nodes and
+# lists are replaced by placeholders, the text around the placeholders is yielded and the children
+# are streamed where they stood. Everything below a statement is small and is repr'd whole.
+
+STREAMED = {
+  parser.ProgramNode, parser.StatementListNode, parser.VarDecListNode, parser.IfNode,
+  parser.SwitchCaseNode, parser.LoopNode, parser.FuncDefNode,
+}
+
+MARK = '\x00'
+
+
+class _Hole:
+  def __init__(self, index):
+    self.index = index
+
+  def __repr__(self):
+    return f'{MARK}{self.index}{MARK}'
+
+
+def iter_repr(value):
+  """Yield repr(value) in pieces"""
+  cls = type(value)
+  if cls in STREAMED:
+    yield from _iter_node(value)
+  elif cls is list or cls is tuple:
+    yield '[' if cls is list else '('
+    for index, item in enumerate(value):
+      if index:
+        yield ', '
+      yield from iter_repr(item)
+    yield ']' if cls is list else (',)' if len(value) == 1 else ')')
+  else:
+    yield repr(value)
+
+
+def _iter_node(node):
+  children = []
+  shell = object.__new__(type(node))
+  shell.__dict__.update(node.__dict__)
+  for field in NODE_FIELDS[type(node)]:
+    value = getattr(node, field)
+    # (an empty list stays: a repr may test whether it is)
+    if type(value) in NODE_FIELDS or (type(value) in (list, tuple) and value):
+      setattr(shell, field, _Hole(len(children)))
+      children.append(value)
+
+  # text, child index, text, child index, ..., text (a node's repr need not show every child)
+  pieces = repr(shell).split(MARK)
+  if len(pieces) % 2 == 0 or not all(piece.isdigit() for piece in pieces[1::2]):
+    # a MARK in the node's own text
+    yield repr(node)
+    return
+  for position, piece in enumerate(pieces):
+    if position % 2 == 0:
+      if piece:
+        yield piece
+    else:
+      yield from iter_repr(children[int(piece)])
+
+
+def dump_tree(node, stream):
+  """Write repr(node) and a newline to stream, a piece at a time"""
+  write = stream.write
+  for piece in iter_repr(node):
+    write(piece)
+  write('\n')
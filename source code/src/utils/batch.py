@@ -0,0 +1,138 @@
+# src/utils/batch.py
+# Runs many .lol files on a pool of worker processes (main.py --batch).
+#
+# Each worker lexes, parses and runs one file with its VISIBLE output captured and hands back a
+# BatchResult: the output (followed by the error, if the file failed), a status and how long it
+# took. A file's expected output is <name>.out next to <name>.lol; a file with one passes when its
+# output matches it exactly. GIMMEH reads <name>.in, or the batch's input file, or nothing.
+import difflib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.lexer import tokenizer
+from src.interpreter.runtime import SymbolTable, Context
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.optimizer import optimize
+from src.interpreter.streams import FileInput, LineInput, MemoryOutput
+from src.utils import parse_cache
+
+GOLDEN_SUFFIX = '.out'
+INPUT_SUFFIX = '.in'
+
+# Statuses: matched its .out, differs from its .out, ran without error (no .out), failed (no .out)
+PASS, FAIL, OK, ERROR = 'pass', 'FAIL', 'ok', 'error'
+
+
+class BatchResult:
+    def __init__(self, path, status, output, seconds, expected=None):
+        self.path = path
+        self.status = status
+        self.output = output
+        self.seconds = seconds
+        self.expected = expected
+
+    def diff(self):
+        """Unified diff of the expected output against the output, for a FAIL"""
+        return ''.join(difflib.unified_diff(self.expected.splitlines(True), self.output.splitlines(True),
+                                            os.path.splitext(self.path)[0] + GOLDEN_SUFFIX, 'output'))
+
+
+def collect(paths):
+    """The .lol files among paths, and in the directories among them, in order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, names in os.walk(path):
+                subdirectories[:] = sorted(name for name in subdirectories if name != parse_cache.CACHE_DIR_NAME)
+                files.extend(os.path.join(directory, name) for name in sorted(names) if name.endswith('.lol'))
+        else:
+            files.append(path)
+    return files
+
+
+def read_expected(path):
+    try:
+        with open(os.path.splitext(path)[0] + GOLDEN_SUFFIX, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def program_input(path, input_path=None):
+    """Where the GIMMEHs of path read: its .in file, else input_path, else nothing"""
+    own = os.path.splitext(path)[0] + INPUT_SUFFIX
+    if os.path.exists(own):
+        return FileInput(own)
+    if input_path is not None:
+        return FileInput(input_path)
+    return LineInput(())
+
+
+def execute(path, engine='tree', max_depth=None, optimized=False, use_cache=True, input_path=None):
+    """Lex, parse and run path. Returns (output, failed): what main.py prints after INTERPRETER OUTPUT."""
+    output = MemoryOutput()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        tokens, AST, _ = parse_cache.tokenize_and_parse(path, source, use_cache=use_cache)
+        if AST.error:
+            return AST.error.as_string() + '\n', True
+        program = optimize(AST.node) if optimized else AST.node
+        interpreter = Interpreter(filename=path, engine=engine, max_depth=max_depth,
+                                  output=output, input=program_input(path, input_path))
+        context = Context('<program>')
+        context.symbol_table = SymbolTable()
+        result = interpreter.visit(program, context)
+        if result.error:
+            output.write(result.error.as_string() + '\n')
+            return output.getvalue(), True
+    except tokenizer.LexerError as e:
+        return e.as_string() + '\n', True
+    except Exception as e:
+        output.write(f"ERROR: {e}\n")
+        return output.getvalue(), True
+    return output.getvalue(), False
+
+
+def run_file(path, options):
+    """Worker: execute path with options (keyword arguments of execute) and judge its output"""
+    start = time.perf_counter()
+    output, failed = execute(path, **options)
+    seconds = time.perf_counter() - start
+    expected = read_expected(path)
+    if expected is not None:
+        status = PASS if output == expected else FAIL
+    else:
+        status = ERROR if failed else OK
+    return BatchResult(path, status, output, seconds, expected)
+
+
+def run_batch(paths, jobs=None, **options):
+    """Run every file in paths on jobs worker processes (one per CPU by default), yielding BatchResults in order"""
+    jobs = jobs or os.cpu_count() or 1
+    # Hand the files out a few dozen at a time: one at a time costs a round trip each, one block
+    # per worker leaves the others idle once the quick ones are done
+    chunksize = max(1, min(32, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(run_file, paths, [options] * len(paths), chunksize=chunksize)
+
+
+def print_summary(results, wall_seconds, jobs):
+    """The table main.py --batch ends with; returns the number of files that did not pass or run"""
+    width = max([len(result.path) for result in results] + [4])
+    print(f"\n{'FILE':<{width}}  {'STATUS':<6}  {'TIME':>10}")
+    for result in results:
+        print(f"{result.path:<{width}}  {result.status:<6}  {result.seconds * 1000:>7.1f} ms")
+
+    for result in results:
+        if result.status == FAIL:
+            print(f"\n--- {result.path} differs from its expected output")
+            print(result.diff(), end='')
+
+    counts = {status: sum(result.status == status for result in results) for status in (PASS, FAIL, OK, ERROR)}
+    busy = sum(result.seconds for result in results)
+    print(f"\n{len(results)} files: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    print(f"{wall_seconds:.2f} s on {jobs} worker(s), {busy:.2f} s of work"
+          + (f" ({busy / wall_seconds:.1f}x)" if wall_seconds > 0 else ""))
+    return counts[FAIL] + counts[ERROR]
@@ -0,0 +1,161 @@
+# src/utils/parse_cache.py
+# On-disk cache of token streams and ASTs, in the spirit of __pycache__.
+#
+# Each source file gets entries in a __lolcache__ directory next to it, named
+# <file>.<content hash>.lolc. An entry holds the tokens and the AST of a successful parse
+# and is only used if the source hash and the lexer/parser version stamp both match, so a
+# cache hit skips tokenize() and Parser.parse() entirely.
+import contextlib
+import hashlib
+import os
+import time
+
+from src.lexer import tokenizer
+from src.lexer.source import SourceIndex
+from src.parser import parser, serialize
+
+CACHE_DIR_NAME = '__lolcache__'
+CACHE_SUFFIX = '.lolc'
+MAGIC = b'LOLC'
+
+# Eviction defaults: entries unused for MAX_AGE seconds are dropped, then the least
+# recently used ones until the directory is under MAX_BYTES
+MAX_AGE = 30 * 24 * 60 * 60
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _version_stamp():
+    """Digest of the lexer, parser and AST format sources: any change to them invalidates every entry."""
+    digest = hashlib.sha256()
+    for module in (tokenizer, parser, serialize):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()[:16]
+
+VERSION_STAMP = _version_stamp()
+
+
+def source_hash(source):
+    return hashlib.sha256(source.encode('utf-8')).digest()
+
+
+def cache_path(path, source, cache_dir=None):
+    """Location of the cache entry for this version of the file at path."""
+    directory = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    name = f"{os.path.basename(path)}.{source_hash(source).hex()[:16]}{CACHE_SUFFIX}"
+    return os.path.join(directory, name)
+
+
+def load(path, source, filename=None, cache_dir=None):
+    """
+    Return (tokens, ast) for source if a valid cache entry exists, else None.
+    Any unreadable, stale or corrupt entry is treated as a miss.
+    """
+    entry = cache_path(path, source, cache_dir)
+    try:
+        with open(entry, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = MAGIC + VERSION_STAMP + source_hash(source)
+    if not data.startswith(header):
+        return None
+    # The tokens are attached to an index of the source text the caller already has
+    index = SourceIndex(source, filename or path)
+    try:
+        tokens, ast = serialize.load(data[len(header):], index)
+    except (ValueError, TypeError):
+        # serialize.FormatError, undecodable strings or a value that is not (tokens, ast)
+        return None
+    try:
+        # Mark the entry as recently used for eviction
+        os.utime(entry)
+    except OSError:
+        pass
+    return tokens, ast
+
+
+def store(path, source, tokens, ast, cache_dir=None):
+    """
+    Save the tokens and AST of a successful parse. Failures to write (read-only
+    directories, full disks) are ignored, as with __pycache__.
+    """
+    entry = cache_path(path, source, cache_dir)
+    try:
+        data = MAGIC + VERSION_STAMP + source_hash(source) + serialize.dump((list(tokens), ast))
+    except TypeError:
+        return False
+    try:
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Write to a temporary name first so readers never see a partial entry
+        temporary = f"{entry}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, entry)
+    except OSError:
+        return False
+    evict(os.path.dirname(entry))
+    return True
+
+
+def evict(cache_dir, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+    """Remove entries older than max_age seconds, then the least recently used beyond max_bytes."""
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    now = time.time()
+    entries = []
+    for name in names:
+        if not name.endswith(CACHE_SUFFIX):
+            continue
+        entry = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(entry)
+        except OSError:
+            continue
+        if now - stat.st_mtime > max_age:
+            _remove(entry)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(entry)
+        total -= size
+
+
+def _remove(entry):
+    try:
+        os.remove(entry)
+    except OSError:
+        pass
+
+
+def tokenize_and_parse(path, source, filename=None, use_cache=True, cache_dir=None, stats=None):
+    """
+    Tokenize and parse source (read from path), going through the cache when use_cache is set.
+    Returns (tokens, parse_result, cache_hit). Lexer errors propagate as tokenizer.LexerError;
+    parse errors are returned in parse_result.error and are never cached. With stats (a
+    src.interpreter.stats.Stats), the phases are timed: 'load cache', or 'tokenize', 'parse'
+    and 'store cache'.
+    """
+    phase = stats.phase if stats is not None else lambda name: contextlib.nullcontext()
+    filename = filename or path
+    if use_cache:
+        with phase('load cache'):
+            cached = load(path, source, filename, cache_dir)
+        if cached is not None:
+            tokens, ast = cached
+            return tokens, parser.ParseResult().success(ast), True
+
+    with phase('tokenize'):
+        tokens = tokenizer.tokenize(source, filename=filename)
+    with phase('parse'):
+        result = parser.Parser(tokens, filename=filename).parse()
+    if use_cache and not result.error:
+        with phase('store cache'):
+            store(path, source, tokens, result.node, cache_dir)
+    return tokens, result, False
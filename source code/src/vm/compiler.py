@@ -0,0 +1,599 @@
+from src.interpreter.resolver import defined_names
+from src.interpreter.runtime import UNDEFINED
+from src.interpreter.values import Boolean, Noob, Number, String
+from src.lexer.tokenizer import Token, TokenType
+from src.parser.parser import *
+from .opcodes import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# BYTECODE COMPILER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Compiles the AST of a program, or the body of a HOW IZ I function, into a Code object for the
+# VirtualMachine (see opcodes.py for the instruction format). Variables are given numbered slots
+# at compile time; a scope's slots are every name it can define (I HAS A, HOW IZ I, arrays, the
+# function's parameters and IT). Names that are never defined in a scope get no slot, so reading
+# or assigning them always fails exactly like SymbolTable.found does in the tree-walker.
+#
+# GTFO and FOUND YR are compiled into jumps and returns. Where they end up depends on the
+# statement list they belong to, mirroring Interpreter:
+#   program body      GTFO / FOUND YR are ignored (after evaluating the FOUND YR expression)
+#   function body     FOUND YR returns its value, GTFO returns NOOB
+#   loop body         GTFO leaves the loop, FOUND YR is ignored
+#   matched OMG case  GTFO leaves the WTF?, FOUND YR is ignored
+#   OMGWTF            both are ignored
+# In an O RLY? branch either one ends the O RLY? and is handled by the enclosing list.
+
+ARITHMETIC_METHODS = {
+  TokenType.SUM_OF: 'added_by',
+  TokenType.DIFF_OF: 'subtracted_by',
+  TokenType.PRODUKT_OF: 'multiplied_by',
+  TokenType.QUOSHUNT_OF: 'divided_by',
+  TokenType.MOD_OF: 'modulo',
+  TokenType.BIGGR_OF: 'maximum',
+  TokenType.SMALLR_OF: 'minimum',
+  TokenType.BOTH_OF: 'and_logic',
+  TokenType.EITHER_OF: 'or_logic',
+  TokenType.WON_OF: 'xor_logic',
+}
+
+COMPARISON_METHODS = {
+  TokenType.BOTH_SAEM: 'is_equal',
+  TokenType.DIFFRINT: 'is_not_equal',
+}
+
+# MAEK/IS NOW A type -> arguments of explicit_typecast
+TYPECAST_ARGUMENTS = {
+  'NUMBR': (Number,),
+  'NUMBAR': (Number, True),
+  'TROOF': (Boolean,),
+  'YARN': (String,),
+}
+
+# Nodes compiled by Compiler.operator -> their operands, whose values compute theirs
+OPERANDS = {
+  ArithmeticBinaryOpNode: lambda node: (node.left_node, node.right_node),
+  BooleanBinaryOpNode: lambda node: (node.left_node, node.right_node),
+  ComparisonOpNode: lambda node: (node.left_node, node.right_node),
+  BooleanUnaryOpNode: lambda node: (node.operand,),
+  BooleanTernaryOpNode: lambda node: node.boolean_statements,
+  StringConcatNode: lambda node: node.operands,
+  TypecastNode: lambda node: (node.source_value,),
+  FuncCallNode: lambda node: [node.function_name] + list(node.parameters),
+  ArrayReduceNode: lambda node: (node.array_expr,),
+}
+
+# Marker actions of a Block
+SKIP = 'skip'        # carry on after the statement (or after the enclosing O RLY?)
+RETURNS = 'returns'  # return from the function (FOUND YR only)
+
+
+class CompileError(Exception):
+  """A program that cannot be compiled; error is the RuntimeError to report"""
+  def __init__(self, error):
+    super().__init__(error)
+    self.error = error
+
+
+def first_line(node):
+  """The line of the first token in node, looking breadth-first (None if it has none)."""
+  pending = [node]
+  for item in pending:
+    if isinstance(item, Token):
+      return item['line']
+    if isinstance(item, (list, tuple)):
+      pending.extend(item)
+    elif hasattr(item, '__dict__') and not isinstance(item, dict):
+      pending.extend(value for value in vars(item).values() if not isinstance(value, dict))
+  return None
+
+
+class Code:
+  """A compiled program or function body"""
+  __slots__ = ('name', 'filename', 'instructions', 'names', 'slots', 'param_slots', 'constants',
+               'register_count', 'template', 'guards')
+
+  def __init__(self, name, filename):
+    self.name = name
+    self.filename = filename
+    self.instructions = []
+    self.names = []          # slot -> variable name
+    self.slots = {}          # variable name -> slot
+    self.param_slots = ()
+    self.constants = []
+    self.register_count = 0
+    # Initial register file of a frame: undefined slots, empty temporaries, then the constants
+    self.template = []
+    # (start, end, slot, (token, name, filename)) for each R assignment: a runtime error in
+    # instructions start..end-1 comes from evaluating its value (see VirtualMachine.execute)
+    self.guards = []
+
+  def __repr__(self):
+    return f"<code {self.name}>"
+
+
+class Label:
+  __slots__ = ('position',)
+
+  def __init__(self):
+    self.position = None
+
+
+class Block:
+  """How a statement list treats statement values, GTFO (on_break) and FOUND YR (on_return)"""
+  __slots__ = ('stores_it', 'return_value', 'on_break', 'on_return', 'skip')
+
+  def __init__(self, stores_it, on_break, on_return, return_value=None, skip=None):
+    self.stores_it = stores_it
+    self.return_value = return_value  # register tracking a function's implicit return value
+    self.on_break = on_break          # a Label to jump to, SKIP, or a register to return
+    self.on_return = on_return        # RETURNS or SKIP
+    self.skip = skip                  # where SKIP jumps to inside an O RLY? branch
+
+  def branch(self, skip):
+    """The block of the statements in an O RLY? branch of a statement in this block."""
+    return Block(False, self.on_break, self.on_return, skip=self.skip or skip)
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# COMPILER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+class Compiler:
+  # Node class -> (statement or expression) compile method, filled in on first use
+  statement_handlers = {}
+  expression_handlers = {}
+  operator_handlers = {}
+
+  def __init__(self, name, filename, names, counting=False):
+    self.code = Code(name, filename)
+    self.filename = filename
+    # Whether to emit COUNTs for calls and loop iterations (a measured run, see stats.py)
+    self.counting = counting
+    for name in names:
+      if name not in self.code.slots:
+        self.code.slots[name] = len(self.code.names)
+        self.code.names.append(name)
+    self.constant_registers = {}
+    self.temporaries = len(self.code.names)
+    self.register_count = self.temporaries
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Registers, constants and instructions
+  def temporary(self):
+    register = self.temporaries
+    self.temporaries += 1
+    self.register_count = max(self.register_count, self.temporaries)
+    return register
+
+  def release(self, mark):
+    self.temporaries = mark
+
+  def constant(self, value):
+    # Equal literals share a register (a NUMBR and a NUMBAR of the same value do not, nor do
+    # 0.0 and -0.0, which folded constants can produce)
+    key = (type(value), repr(value.value), value.line_number)
+    register = self.constant_registers.get(key)
+    if register is None:
+      self.code.constants.append(value)
+      register = self.constant_registers[key] = -len(self.code.constants)
+    return register
+
+  def emit(self, opcode, a=None, b=None, c=None, d=None):
+    self.code.instructions.append([opcode, a, b, c, d])
+
+  def mark(self, label):
+    label.position = len(self.code.instructions)
+
+  def slot(self, name):
+    return self.code.slots.get(name)
+
+  def finish(self):
+    code = self.code
+    code.instructions = [
+      tuple(operand.position if isinstance(operand, Label) else operand for operand in instruction)
+      for instruction in code.instructions
+    ]
+    code.register_count = self.register_count
+    code.template = ([UNDEFINED] * len(code.names) + [None] * (self.register_count - len(code.names))
+                     + list(reversed(code.constants)))
+    return code
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Statements
+  def statements(self, nodes, block):
+    for node in nodes:
+      self.statement(node, block)
+
+  def statement(self, node, block):
+    mark = self.temporaries
+    try:
+      handler = self.statement_handlers[type(node)]
+    except KeyError:
+      handler = self.statement_handlers[type(node)] = getattr(Compiler, f'statement_{type(node).__name__}', Compiler.expression_statement)
+    try:
+      handler(self, node, block)
+    except RecursionError:
+      # Nested operators are compiled without recursing (see operator); anything else nested
+      # past the recursion limit is reported at the innermost statement containing it
+      raise CompileError(RuntimeError(("Compile Error", None, first_line(node)),
+                                      "Code is nested too deeply to compile", self.filename)) from None
+    self.release(mark)
+
+  def expression_statement(self, node, block):
+    value = self.expression(node)
+    if block.stores_it:
+      self.emit(SETIT, self.slot('IT'), value, block.return_value)
+
+  def marker(self, action, block, value=None):
+    """Emit what a GTFO (value None) or FOUND YR (value: its register) does in block."""
+    if action is SKIP:
+      if block.skip is not None:
+        self.emit(JUMP, block.skip)
+    elif action is RETURNS:
+      self.emit(RETURN, value)
+    elif isinstance(action, Label):
+      self.emit(JUMP, action)
+    else:
+      self.emit(RETURN, action)
+
+  def statement_BreakNode(self, node, block):
+    self.marker(block.on_break, block)
+
+  def statement_ReturnNode(self, node, block):
+    if block.on_return is RETURNS and isinstance(node.return_expression, FuncCallNode):
+      # Returns the value of a call, which can then run in place of this one; the RETURN is
+      # reached only when it cannot
+      call = node.return_expression
+      (function, *arguments), result = self.operands([call.function_name] + list(call.parameters))
+      self.emit(TAILCALL, result, function, tuple(arguments))
+      self.emit(RETURN, result)
+      return
+    # The expression is evaluated even where FOUND YR is ignored
+    value = self.expression(node.return_expression)
+    self.marker(block.on_return, block, value)
+
+  def statement_ProgramNode(self, node, block):
+    self.statements(node.sections, block)
+
+  def statement_StatementListNode(self, node, block):
+    self.statements(node.statements, Block(True, SKIP, SKIP))
+
+  def statement_VarDecListNode(self, node, block):
+    self.statements(node.variable_declarations, Block(False, SKIP, SKIP))
+
+  def statement_PrintNode(self, node, block):
+    operands = tuple(self.expression(operand) for operand in node.operands)
+    self.emit(PRINT, operands, '' if node.suppress_newline else '\n')
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def statement_IfNode(self, node, block):
+    basis = self.temporary()
+    self.emit(GET, basis, self.slot('IT'), d='IT')
+    else_label, done, after = Label(), Label(), Label()
+    branch = block.branch(after)
+
+    self.emit(JUMPIF, basis, else_label, False)
+    self.statements(node.if_block_statements, branch)
+    self.emit(JUMP, done)
+
+    self.mark(else_label)
+    for condition, statements in node.mebbe_cases:
+      mark = self.temporaries
+      next_case = Label()
+      self.emit(JUMPIF, self.expression(condition), next_case, False)
+      self.release(mark)
+      self.statements(statements, branch)
+      self.emit(JUMP, done)
+      self.mark(next_case)
+    self.statements(node.else_block_statements, branch)
+
+    # The O RLY? itself evaluates to IT
+    self.mark(done)
+    if block.stores_it:
+      self.emit(SETIT, self.slot('IT'), basis, block.return_value)
+    self.mark(after)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def statement_SwitchCaseNode(self, node, block):
+    basis = self.temporary()
+    self.emit(GET, basis, self.slot('IT'), d='IT')
+    done = Label()
+
+    for case, statements in zip(node.cases, node.cases_statements):
+      mark = self.temporaries
+      next_case = Label()
+      self.emit(CASE, basis, self.expression(case), next_case)
+      self.release(mark)
+      self.statements(statements, Block(False, done, SKIP))
+      self.emit(JUMP, done)
+      self.mark(next_case)
+    self.statements(node.default_case_statements, Block(False, SKIP, SKIP))
+
+    # The WTF? itself evaluates to IT
+    self.mark(done)
+    if block.stores_it:
+      self.emit(SETIT, self.slot('IT'), basis, block.return_value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def statement_LoopNode(self, node, block):
+    variable = node.variable
+    var_name = variable['value']
+    slot = self.slot(var_name)
+    top, end = Label(), Label()
+
+    self.emit(LOOPCHECK, slot, d=(variable, var_name))
+    self.mark(top)
+    if node.clause_type and node.til_wile_expression is not None:
+      # TIL stops once the condition is WIN, WILE once it is FAIL (and anything else never)
+      stop_when = {TokenType.TIL: True, TokenType.WILE: False}.get(node.clause_type)
+      mark = self.temporaries
+      self.emit(JUMPIF, self.expression(node.til_wile_expression), end, stop_when)
+      self.release(mark)
+
+    if self.counting:
+      self.emit(COUNT, d=('loops', node.label))
+    self.statements(node.body_statements, Block(True, end, SKIP))
+    step = 1 if node.operation['type'] == TokenType.UPPIN else -1
+    self.emit(STEP, slot, step, d=(variable, var_name, self.filename))
+    self.emit(JUMP, top)
+    self.mark(end)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Expressions: each returns the register holding its value
+  def expression(self, node):
+    try:
+      handler = self.expression_handlers[type(node)]
+    except KeyError:
+      handler = getattr(Compiler, f'expression_{type(node).__name__}', Compiler.no_compile_method)
+      self.expression_handlers[type(node)] = handler
+    return handler(self, node)
+
+  def no_compile_method(self, node):
+    raise Exception(f'No expression_{type(node).__name__} method defined')
+
+  def expression_IntegerNode(self, node):
+    return self.constant(Number(int(node.token['value']), node.token['line']))
+
+  def expression_FloatNode(self, node):
+    return self.constant(Number(float(node.token['value']), node.token['line']))
+
+  def expression_BooleanNode(self, node):
+    return self.constant(Boolean(node.token['value'], node.token['line']))
+
+  def expression_StringNode(self, node):
+    return self.constant(String(node.token['value'], node.token['line']))
+
+  def expression_NoobNode(self, node):
+    return self.constant(Noob(node.line_number))
+
+  def expression_ConstantNode(self, node):
+    return self.constant(node.value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def operands(self, nodes):
+    """Registers of the values of nodes; their temporaries are released for the result."""
+    mark = self.temporaries
+    registers = tuple(self.expression(node) for node in nodes)
+    self.release(mark)
+    return registers, self.temporary()
+
+  def operator(self, node):
+    """
+    Nodes computed from the values of their OPERANDS (SUM OF, NOT, SMOOSH, MAEK, calls, ...).
+    Nested ones are compiled from a work stack rather than by recursing, so a SUM OF SUM OF ...
+    nested deeper than Python's recursion limit compiles like a shallow one.
+    """
+    # (node, temporaries mark, its operand nodes, registers of those compiled so far)
+    stack = [(node, self.temporaries, OPERANDS[type(node)](node), [])]
+    value = None
+    while True:
+      node, mark, operands, registers = stack[-1]
+      if value is not None:
+        registers.append(value)
+        value = None
+      if len(registers) < len(operands):
+        operand = operands[len(registers)]
+        if type(operand) in OPERANDS:
+          stack.append((operand, self.temporaries, OPERANDS[type(operand)](operand), []))
+        else:
+          value = self.expression(operand)
+        continue
+      stack.pop()
+      self.release(mark)
+      value = self.temporary()
+      try:
+        emitter = self.operator_handlers[type(node)]
+      except KeyError:
+        emitter = self.operator_handlers[type(node)] = getattr(Compiler, f'operator_{type(node).__name__}')
+      emitter(self, node, value, registers)
+      if not stack:
+        return value
+
+  def binary_operator(self, node, result, operands):
+    left, right = operands
+    method = ARITHMETIC_METHODS[node.operation['type']]
+    if method in ('added_by', 'multiplied_by'):
+      # SUM OF and PRODUKT OF take their line, for the errors of an elementwise UHS operation
+      self.emit(COMPARE, result, left, right, (method, node.operation['line']))
+    else:
+      self.emit(BINOP, result, left, right, method)
+
+  operator_ArithmeticBinaryOpNode = binary_operator
+  operator_BooleanBinaryOpNode = binary_operator
+
+  def operator_ComparisonOpNode(self, node, result, operands):
+    left, right = operands
+    self.emit(COMPARE, result, left, right, (COMPARISON_METHODS[node.operation['type']], node.operation))
+
+  def operator_BooleanUnaryOpNode(self, node, result, operands):
+    self.emit(NOT, result, operands[0])
+
+  def operator_BooleanTernaryOpNode(self, node, result, operands):
+    combine = {TokenType.ALL_OF: all, TokenType.ANY_OF: any}.get(node.operation['type'])
+    self.emit(VARIADIC, result, tuple(operands), d=combine)
+
+  def operator_StringConcatNode(self, node, result, operands):
+    self.emit(CONCAT, result, tuple(operands))
+
+  def operator_TypecastNode(self, node, result, operands):
+    self.emit(TYPECAST, result, operands[0], d=TYPECAST_ARGUMENTS[node.desired_type])
+
+  def operator_FuncCallNode(self, node, result, operands):
+    function, *arguments = operands
+    # The name called (None for another expression), for the error of going past max_depth
+    token = getattr(node.function_name, 'var_name_token', None)
+    self.emit(CALL, result, function, tuple(arguments), (token, self.filename))
+
+  def operator_ArrayReduceNode(self, node, result, operands):
+    self.emit(REDUCE, result, operands[0], d=(ARITHMETIC_METHODS[node.operation['type']], node.operation, self.filename))
+
+  expression_ArithmeticBinaryOpNode = operator
+  expression_BooleanBinaryOpNode = operator
+  expression_ComparisonOpNode = operator
+  expression_BooleanUnaryOpNode = operator
+  expression_BooleanTernaryOpNode = operator
+  expression_StringConcatNode = operator
+  expression_TypecastNode = operator
+  expression_FuncCallNode = operator
+  expression_ArrayReduceNode = operator
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def expression_VarAccessNode(self, node):
+    token = node.var_name_token
+    result = self.temporary()
+    self.emit(LOADVAR, result, self.slot(token['value']), d=(token, token['value'], self.filename))
+    return result
+
+  def expression_VarDeclarationNode(self, node):
+    slot = self.slot(node.var_name_token['value'])
+    if node.value_node is None:
+      self.emit(DECLARE_NOOB, slot)
+    else:
+      self.emit(DECLARE, slot, self.expression(node.value_node))
+    return slot
+
+  def expression_VarAssignmentNode(self, node):
+    token = node.var_to_access
+    slot = self.slot(token['value'])
+    start = len(self.code.instructions)
+    value = self.expression(node.value_to_assign)
+    info = (token, token['value'], self.filename)
+    self.code.guards.append((start, len(self.code.instructions), slot, info))
+    self.emit(ASSIGN, slot, value, d=info)
+    return value
+
+  def expression_InputNode(self, node):
+    token = node.variable.var_name_token
+    slot = self.slot(token['value'])
+    self.emit(INPUT, slot, d=(token, token['value'], self.filename))
+    return slot
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def expression_FuncDefNode(self, node):
+    function_name = node.function_name['value']
+    params = tuple(param.var_name_token['value'] for param in node.parameters)
+    code = compile_function(function_name, params, node.body_statements, self.counting)
+    slot = self.slot(function_name)
+    self.emit(FUNCDEF, slot, d=(function_name, params, node.body_statements, code))
+    return slot
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def array(self, node):
+    token = node.array_name_token
+    result = self.temporary()
+    self.emit(ARRAYREF, result, self.slot(token['value']), d=(token, token['value'], self.filename))
+    return result
+
+  def index(self, node, index_expr):
+    mark = self.temporaries
+    value = self.expression(index_expr)
+    self.release(mark)
+    result = self.temporary()
+    self.emit(INDEX, result, value, d=(node.array_name_token, self.filename))
+    return result
+
+  def expression_ArrayDeclarationNode(self, node):
+    token = node.array_name_token
+    slot = self.slot(token['value'])
+    size = self.expression(node.size_expr)
+    self.emit(ARRAYDECL, slot, size, d=(node.element_type, token, self.filename))
+    return slot
+
+  def expression_ArrayAccessNode(self, node):
+    array = self.array(node)
+    index = self.index(node, node.index_expr)
+    self.emit(ARRAYGET, array, array, index)
+    return array
+
+  def expression_ArrayConfineNode(self, node):
+    array = self.array(node)
+    value = self.expression(node.value_expr)
+    index = self.index(node, node.index_expr)
+    self.emit(CONFINE, array, array, value, index)
+    return array
+
+  def expression_ArrayDischargeNode(self, node):
+    array = self.array(node)
+    index = self.index(node, node.index_expr)
+    self.emit(DISCHARGE, array, array, index)
+    return array
+
+  def expression_ArrayFillNode(self, node):
+    array = self.array(node)
+    value = self.expression(node.value_expr)
+    self.emit(FILL, array, array, value, node.array_name_token['line'])
+    return array
+
+  def expression_ArraySliceNode(self, node):
+    array = self.array(node)
+    start = self.index(node, node.start_expr)
+    end = self.index(node, node.end_expr)
+    self.emit(SLICE, array, array, start, (end, node.array_name_token['line']))
+    return array
+
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# ENTRY POINTS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+def compile_function(name, params, body_statements, counting=False):
+  """Compile the body of HOW IZ I name. Calls run in their own frame; errors report <stdin>."""
+  compiler = Compiler(name, '<stdin>', list(params) + defined_names(body_statements) + ['IT'], counting)
+  compiler.code.param_slots = tuple(compiler.slot(param) for param in params)
+  if counting:
+    # Every call, TAILCALLs included, starts here
+    compiler.emit(COUNT, d=('calls', name))
+
+  # Without FOUND YR a function returns the value of its last statement that had one
+  return_value = compiler.temporary()
+  noob = compiler.constant(Noob())
+  compiler.emit(MOVE, return_value, noob)
+  compiler.statements(body_statements, Block(True, noob, RETURNS, return_value=return_value))
+  compiler.emit(RETURN, return_value)
+  return compiler.finish()
+
+
+def compile_program(node, filename='<stdin>', predefined=(), counting=False):
+  """
+  Compile node as Interpreter.visit(node, context) would run it: usually a ProgramNode, but any
+  statement or expression works. predefined are the names already in the context's symbol table.
+  With counting, calls and loop iterations are counted in the Stats of the machine running it.
+  """
+  compiler = Compiler('<program>', filename, list(predefined) + defined_names([node]) + ['IT'], counting)
+  handler = getattr(Compiler, f'statement_{type(node).__name__}', None)
+  if handler is not None:
+    handler(compiler, node, Block(False, SKIP, SKIP))
+    compiler.emit(END)
+  else:
+    compiler.emit(END, compiler.expression(node))
+  return compiler.finish()
+
+
+def disassemble(code):
+  """Readable listing of code, for debugging."""
+  lines = [f"{code!r}: {len(code.names)} slots {code.names}, {code.register_count} registers"]
+  for position, (opcode, a, b, c, d) in enumerate(code.instructions):
+    operands = ', '.join(repr(operand) for operand in (a, b, c) if operand is not None)
+    extra = f'  ; {d[1] if isinstance(d, tuple) and len(d) > 1 and isinstance(d[1], str) else d!r}' if d is not None else ''
+    lines.append(f"{position:5}  {NAMES[opcode]:12} {operands}{extra}")
+  for index, value in enumerate(code.constants):
+    lines.append(f"  const {-index - 1}: {value!r}")
+  return '\n'.join(lines)
@@ -0,0 +1,436 @@
+from src.interpreter.runtime import RTResult, SymbolTable
+from src.interpreter.streams import STANDARD_INPUT, STANDARD_OUTPUT
+from src.interpreter.values import Array, Boolean, Function, Noob, Number, String
+from src.parser.parser import RuntimeError
+from .compiler import UNDEFINED, CompileError, compile_program
+from .opcodes import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# VIRTUAL MACHINE
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Runs the Code produced by compiler.py. Each program or function call gets a Frame holding its
+# register file; HOW IZ I functions keep the frame they were defined in, which is where lookups
+# that fall back to the enclosing scope (SymbolTable.get in the tree-walker) continue.
+# A call does not recurse into the dispatch loop: the caller's frame and position are pushed on
+# a stack of calls and the loop carries on in the callee, so the depth of LOLCODE recursion is
+# bounded by max_depth, not by Python's recursion limit. A call returned by FOUND YR (TAILCALL)
+# is not pushed at all: it replaces the call returning, so tail recursion runs in constant space.
+# Values and their operations are the ones in values.py, so results and error messages are
+# the same as Interpreter's.
+
+
+class Failure(Exception):
+  """A runtime error raised out of the dispatch loop"""
+  def __init__(self, error):
+    super().__init__(error)
+    self.error = error
+
+
+class Frame:
+  __slots__ = ('code', 'registers', 'parent', 'pinned')
+
+  def __init__(self, code, parent):
+    self.code = code
+    self.registers = code.template[:]
+    self.parent = parent   # enclosing Frame, SymbolTable or None
+    self.pinned = ()       # Functions whose frame is this one
+
+
+class MergedFrame(Frame):
+  """What the frames a chain of tail calls left behind show to lookups (see VirtualMachine.reenter)"""
+  __slots__ = ()
+
+
+def lookup(scope, name):
+  """SymbolTable.get over the frames (and symbol tables) enclosing a frame."""
+  while scope is not None:
+    if type(scope) is SymbolTable:
+      return scope.get(name)
+    slot = scope.code.slots.get(name)
+    value = scope.registers[slot] if slot is not None else None
+    if value is not None and value is not UNDEFINED:
+      return value
+    scope = scope.parent
+  return None
+
+
+class VirtualMachine:
+  # Default limit on nested HOW IZ I calls
+  MAX_DEPTH = 100000
+
+  def __init__(self, filename='<stdin>', max_depth=None, output=STANDARD_OUTPUT, input=STANDARD_INPUT, stats=None):
+    self.filename = filename
+    self.max_depth = max_depth if max_depth is not None else self.MAX_DEPTH
+    self.output = output
+    self.input = input
+    # Stats of a measured run (see stats.py), whose code is compiled with COUNTs
+    self.stats = stats
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def run(self, node, context):
+    """
+    Compile node (once per filename and set of names already in the context) and run it.
+    Returns an RTResult like Interpreter.visit; the variables the program defined are written
+    back to context.symbol_table, in the order they were defined, even when it fails.
+    """
+    table = context.symbol_table
+    symbols = table.symbols
+    counting = self.stats is not None
+    key = (self.filename, tuple(symbols), counting)
+    try:
+      code = node.bytecode[key]
+    except AttributeError:
+      node.bytecode = {}
+      code = None
+    except KeyError:
+      code = None
+    if code is None:
+      try:
+        code = node.bytecode[key] = compile_program(node, self.filename, symbols, counting)
+      except CompileError as failure:
+        return RTResult().failure(failure.error)
+
+    frame = Frame(code, table.parent)
+    registers = frame.registers
+    preloaded = [code.slots[name] for name in symbols]
+    for slot, value in zip(preloaded, symbols.values()):
+      registers[slot] = value
+    defined = []
+
+    res = RTResult()
+    try:
+      return res.success(self.execute(frame, defined))
+    except Failure as failure:
+      return res.failure(failure.error)
+    finally:
+      self.output.flush()
+      for slot in preloaded + defined:
+        table.set(code.names[slot], registers[slot])
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def enter(self, function, arguments):
+    """The frame of a call of a function defined by FUNCDEF; the same checks and messages as Function.execute."""
+    error = function.arguments_error(len(arguments))
+    if error: raise Failure(error)
+    frame = Frame(function.bytecode, function.frame)
+    self.bind(frame, arguments)
+    return frame
+
+  def reenter(self, frame, function, arguments):
+    """
+    The frame of a TAILCALL of function from frame, whose call is over. As in Function.execute,
+    a function calling itself (passed as an argument, so it would run under frame) takes frame
+    over once every Function kept on it has moved on: frame's values are folded into a merged
+    frame above it, and a chain of tail calls keeps two frames.
+    """
+    code = frame.code
+    if function.bytecode is not code or function.frame is not frame:
+      return self.enter(function, arguments)
+    if not all(any(argument is pin for argument in arguments) for pin in frame.pinned):
+      return self.enter(function, arguments)
+    error = function.arguments_error(len(arguments))
+    if error: raise Failure(error)
+
+    merged = frame.parent
+    if type(merged) is not MergedFrame:
+      merged = MergedFrame(code, frame.parent)
+    registers, merged_registers = frame.registers, merged.registers
+    for slot in range(len(code.names)):
+      value = registers[slot]
+      if value is not None and value is not UNDEFINED:
+        merged_registers[slot] = value
+    frame.parent = merged
+    frame.registers = code.template[:]
+    frame.pinned = ()
+    self.bind(frame, arguments)
+    return frame
+
+  def bind(self, frame, arguments):
+    """Store the arguments of a call in the parameter slots of its frame"""
+    registers = frame.registers
+    for slot, argument in zip(frame.code.param_slots, arguments):
+      # Function.execute moves every argument into the callee's context
+      if isinstance(argument, Function):
+        argument.frame = frame
+        frame.pinned += (argument,)
+      registers[slot] = argument
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def execute(self, frame, defined):
+    """
+    The dispatch loop. Returns the value of the code. defined, if not None, collects the
+    slots in the order they are first defined (for the symbol table of a program).
+    """
+    code = frame.code
+    instructions = code.instructions
+    registers = frame.registers
+    pc = 0
+    # Callers of the calls in progress: (frame, defined, pc after the CALL, result register)
+    calls = []
+
+    while True:
+      try:
+        while True:
+          opcode, a, b, c, d = instructions[pc]
+          pc += 1
+
+          if opcode == LOADVAR:
+            if b is None or registers[b] is UNDEFINED:
+              raise Failure(RuntimeError(d[0], f"Variable '{d[1]}' is not defined.\nMake sure you declared it with 'I HAS A {d[1]}' before using it.", d[2]))
+            value = registers[b]
+            registers[a] = value if value is not None else lookup(frame.parent, d[1])
+
+          elif opcode == BINOP:
+            result, error = getattr(registers[b], d)(registers[c])
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == COMPARE:
+            result, error = getattr(registers[b], d[0])(registers[c], d[1])
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == JUMPIF:
+            value, error = registers[a].typecast(Boolean)
+            if error: raise Failure(error)
+            if value.value == c:
+              pc = b
+
+          elif opcode == SETIT:
+            value = registers[b]
+            if value is not None:
+              if registers[a] is UNDEFINED and defined is not None:
+                defined.append(a)
+              registers[a] = value
+              if c is not None:
+                registers[c] = value
+
+          elif opcode == STEP:
+            iterator = registers[a]
+            if iterator is None or iterator is UNDEFINED:
+              iterator = lookup(frame.parent, d[1])
+            if iterator is None:
+              raise Failure(RuntimeError(d[0], f"Cannot store input in undefined variable '{d[1]}'.\nDeclare it first with 'I HAS A {d[1]}'.", d[2]))
+            iterator, error = iterator.typecast(Number)
+            if error: raise Failure(error)
+            registers[a] = Number(iterator.value + b)
+
+          elif opcode == JUMP:
+            pc = a
+
+          elif opcode == MOVE:
+            registers[a] = registers[b]
+
+          elif opcode == ASSIGN:
+            if a is None or registers[a] is UNDEFINED:
+              raise Failure(RuntimeError(d[0], f"Cannot assign to undefined variable '{d[1]}'.\nDeclare it first with 'I HAS A {d[1]}'.", d[2]))
+            registers[a] = registers[b]
+
+          elif opcode == CALL:
+            function = registers[b]
+            arguments = [registers[register] for register in c]
+            if getattr(function, 'bytecode', None) is not None:
+              if len(calls) == self.max_depth:
+                token, filename = d
+                raise Failure(RuntimeError(
+                  token if token is not None else ("Function Call", "Function", None),
+                  f"Too many nested calls in function '{function.function_name}'.\nThe limit is {self.max_depth} calls deep.",
+                  filename
+                ))
+              callee = self.enter(function, arguments)
+              calls.append((frame, defined, pc, a))
+              frame, defined, pc = callee, None, 0
+              code = frame.code
+              instructions = code.instructions
+              registers = frame.registers
+            else:
+              # Anything else behaves as in FuncCallNode (functions of other engines, or the
+              # AttributeError of calling a non-function)
+              result = function.execute(arguments)
+              if result.error: raise Failure(result.error)
+              registers[a] = result.value if result.value is not None else Noob()
+
+          elif opcode == RETURN:
+            value = registers[a]
+            if not calls:
+              return value
+            frame, defined, pc, a = calls.pop()
+            code = frame.code
+            instructions = code.instructions
+            registers = frame.registers
+            registers[a] = value if value is not None else Noob()
+
+          elif opcode == PRINT:
+            self.output.write(''.join([str(registers[register]) for register in a]) + b)
+
+          elif opcode == CONCAT:
+            string_value = ""
+            for register in b:
+              # Perform implicit typecasting to String
+              value, error = registers[register].typecast(String)
+              if error: raise Failure(error)
+              string_value += value.value
+            registers[a] = String(string_value)
+
+          elif opcode == NOT:
+            result, error = registers[b].not_logic()
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == TYPECAST:
+            result, error = registers[b].explicit_typecast(*d)
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == DECLARE or opcode == DECLARE_NOOB:
+            if registers[a] is UNDEFINED and defined is not None:
+              defined.append(a)
+            registers[a] = registers[b] if opcode == DECLARE else Noob()
+
+          elif opcode == GET:
+            value = registers[b] if b is not None else None
+            if value is None or value is UNDEFINED:
+              value = lookup(frame.parent, d)
+            registers[a] = value
+
+          elif opcode == CASE:
+            condition, error = registers[a].is_equal(registers[b])
+            if error: raise Failure(error)
+            if not condition.value:
+              pc = c
+
+          elif opcode == VARIADIC:
+            values = [registers[register].value for register in b]
+            registers[a] = Boolean(d(values)) if d is not None else None
+
+          elif opcode == LOOPCHECK:
+            if a is None or registers[a] is UNDEFINED:
+              raise Failure(RuntimeError(d[0], f"Loop variable '{d[1]}' must be declared before the loop", code.filename))
+
+          elif opcode == FUNCDEF:
+            function_name, params, body_statements, function_code = d
+            function = Function(function_name, list(params), body_statements)
+            function.bytecode = function_code
+            function.frame = frame
+            frame.pinned += (function,)
+            if registers[a] is UNDEFINED and defined is not None:
+              defined.append(a)
+            registers[a] = function
+
+          elif opcode == INPUT:
+            token = d[0]
+            if a is None or registers[a] is UNDEFINED:
+              raise Failure(RuntimeError(('Var Access Error', None, token['line']), f"Can't find a variable named '{d[1]}'", d[2]))
+            # GIMMEH always reads a YARN, after showing any output still buffered
+            self.output.flush()
+            registers[a] = String(self.input.readline(), token['line'])
+
+          elif opcode == ARRAYREF:
+            array = registers[b] if b is not None else None
+            if array is None or array is UNDEFINED:
+              array = lookup(frame.parent, d[1])
+            if array is None:
+              raise Failure(RuntimeError(d[0], f"Array '{d[1]}' is not defined", d[2]))
+            if not isinstance(array, Array):
+              raise Failure(RuntimeError(d[0], f"'{d[1]}' is not an array", d[2]))
+            registers[a] = array
+
+          elif opcode == INDEX:
+            index_number, error = registers[b].typecast(Number)
+            if error: raise Failure(error)
+            if not Number.is_integer(index_number.value):
+              raise Failure(RuntimeError(d[0], f"Array index must be an integer. Got {index_number.value}", d[1]))
+            registers[a] = int(index_number.value)
+
+          elif opcode == ARRAYGET:
+            element, error = registers[b].get(registers[c])
+            if error: raise Failure(error)
+            registers[a] = element
+
+          elif opcode == CONFINE:
+            result, error = registers[b].set(registers[d], registers[c])
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == DISCHARGE:
+            removed_value, error = registers[b].remove(registers[c])
+            if error: raise Failure(error)
+            registers[a] = removed_value
+
+          elif opcode == ARRAYDECL:
+            element_type, token, filename = d
+            size_number, error = registers[b].typecast(Number)
+            if error: raise Failure(error)
+            if not Number.is_integer(size_number.value) or size_number.value <= 0:
+              raise Failure(RuntimeError(token, f"Array size must be a positive integer. Got {size_number.value}", filename))
+            if registers[a] is UNDEFINED and defined is not None:
+              defined.append(a)
+            registers[a] = Array(element_type, int(size_number.value), token['line'])
+
+          elif opcode == FILL:
+            result, error = registers[b].fill(registers[c], d)
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == SLICE:
+            result, error = registers[b].slice(registers[c], registers[d[0]], d[1])
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == REDUCE:
+            method, token, filename = d
+            array = registers[b]
+            if not isinstance(array, Array):
+              raise Failure(RuntimeError(token, f"{token['value']} UHS needs an array. Got {array.__class__.__name__}", filename))
+            result, error = array.reduced_by(method, token['line'])
+            if error: raise Failure(error)
+            registers[a] = result
+
+          elif opcode == END:
+            return registers[a] if a is not None else None
+
+          elif opcode == TAILCALL:
+            function = registers[b]
+            arguments = [registers[register] for register in c]
+            if getattr(function, 'bytecode', None) is not None:
+              # The callee runs in place of this call, without growing the stack of calls
+              frame, pc = self.reenter(frame, function, arguments), 0
+              code = frame.code
+              instructions = code.instructions
+              registers = frame.registers
+            else:
+              result = function.execute(arguments)
+              if result.error: raise Failure(result.error)
+              registers[a] = result.value if result.value is not None else Noob()
+
+          elif opcode == COUNT:
+            getattr(self.stats, d[0])[d[1]] += 1
+
+          else:
+            raise Exception(f"Unknown opcode {opcode}")
+
+      except Failure as failure:
+        # Unwind the calls in progress, from the frame that failed out to the first one
+        while True:
+          failure = self.guard(code, registers, pc - 1, failure)
+          if not calls:
+            raise failure
+          frame, defined, pc, _ = calls.pop()
+          code = frame.code
+          instructions = code.instructions
+          registers = frame.registers
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def guard(self, code, registers, failed_at, failure):
+    """
+    The Failure to pass on from instruction failed_at of code. An R assignment whose value
+    failed, like in the tree-walker, reports an undefined target instead, or stores None in
+    the target before the error is passed on.
+    """
+    for start, end, slot, (token, name, filename) in code.guards:
+      if start <= failed_at < end:
+        if slot is None or registers[slot] is UNDEFINED:
+          return Failure(RuntimeError(token, f"Cannot assign to undefined variable '{name}'.\nDeclare it first with 'I HAS A {name}'.", filename))
+        registers[slot] = None
+        break
+    return failure
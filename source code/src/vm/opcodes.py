@@ -0,0 +1,48 @@
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPCODES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Every instruction is a tuple (opcode, a, b, c, d). Operands a, b and c are usually register
+# numbers: the register file of a frame holds the local variable slots, then temporaries, then
+# the constant pool (addressed with negative register numbers, -1 being the first constant).
+# d carries whatever else the instruction needs (a method name, error-reporting data, ...).
+# Unused operands are None.
+#
+# The numbering is also the order of the VM's dispatch chain, so the most frequent come first.
+
+LOADVAR = 0     # a = variable slot b (or -1 if never set in this scope); d = (token, name, filename)
+BINOP = 1       # a = b.<d>(c), e.g. d = 'added_by'
+JUMPIF = 2      # jump to b if b.typecast(TROOF).value == c, with a as the register tested
+SETIT = 3       # IT slot a = register b unless it is None; also the return value c of a function
+STEP = 4        # loop counter slot a += b (UPPIN/NERFIN); d = (token, name, filename)
+JUMP = 5        # jump to a
+MOVE = 6        # a = b
+ASSIGN = 7      # slot a = register b, if slot a is defined; d = (token, name, filename)
+COMPARE = 8     # a = b.<d[0]>(c, d[1]) (BOTH SAEM / DIFFRINT with the operation token, SUM OF / PRODUKT OF with its line)
+CALL = 9        # a = call function b with argument registers c; d = (token of the name, filename)
+RETURN = 10     # return register a from the function
+PRINT = 11      # VISIBLE registers a, ending the line with b
+CONCAT = 12     # a = SMOOSH of registers b
+NOT = 13        # a = NOT b
+TYPECAST = 14   # a = b.explicit_typecast(*d)
+DECLARE = 15    # slot a = register b (I HAS A ... ITZ)
+DECLARE_NOOB = 16  # slot a = NOOB (I HAS A without ITZ)
+GET = 17        # a = slot b, falling back to the enclosing scopes by name d (SymbolTable.get)
+CASE = 18       # unless a.is_equal(b) jump to c (WTF? OMG)
+VARIADIC = 19   # a = ALL OF / ANY OF registers b, combined with d (None: unknown operation)
+LOOPCHECK = 20  # fail unless loop variable slot a is defined; d = (token, name)
+FUNCDEF = 21    # slot a = new function d = (name, params, body, code)
+INPUT = 22      # slot a = GIMMEH input, if slot a is defined; d = (token, name, filename)
+ARRAYREF = 23   # a = array named d[1] (slot b), failing if it is missing or not an array
+INDEX = 24      # a = b as an array index (integer NUMBR); d = (token, filename)
+ARRAYGET = 25   # a = array b [index c]
+CONFINE = 26    # a = array b [index d] = value c
+DISCHARGE = 27  # a = remove array b [index c]
+ARRAYDECL = 28  # slot a = new array of size b; d = (element type, token, filename)
+FILL = 29       # a = fill array b with value c (CONFINE without AT); d = line
+SLICE = 30      # a = array b [index c TIL index d[0]]; d[1] = line
+REDUCE = 31     # a = array b reduced with method d[0]; d[1:] = (operation token, filename)
+END = 32        # end of the program code, whose value is register a (if any)
+TAILCALL = 33   # CALL made by FOUND YR in a function body; a function's call replaces its frame
+COUNT = 34      # add one to counter d[1] of d[0] ('calls' or 'loops') of the run's Stats
+
+NAMES = {value: name for name, value in globals().items() if name.isupper() and isinstance(value, int)}
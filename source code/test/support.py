@@ -0,0 +1,47 @@
+# Shared helpers for the tests in this directory. Run them from the "source code" directory:
+#   python -m pytest test
+#   python -m unittest discover test
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.streams import LineInput, MemoryOutput
+from src.lexer import tokenizer
+from src.parser.parser import Parser
+
+TESTCASE_DIR = os.path.join(ROOT, 'test', 'project-testcases')
+
+
+def read_testcases():
+    """Return {filename: source} for every .lol file in test/project-testcases."""
+    sources = {}
+    for name in sorted(os.listdir(TESTCASE_DIR)):
+        if name.endswith('.lol'):
+            with open(os.path.join(TESTCASE_DIR, name), 'r', encoding='utf-8') as f:
+                sources[name] = f.read()
+    return sources
+
+
+def parse(source, filename='<test>'):
+    """The AST of source, which must parse."""
+    result = Parser(tokenizer.tokenize(source, filename=filename), filename=filename).parse()
+    if result.error:
+        raise AssertionError(result.error.as_string())
+    return result.node
+
+
+def run(engine, ast, stdin='', interpreter=Interpreter, **options):
+    """Run ast in engine; returns (output, error as a string or None, {name: value as a string})."""
+    context = Context('<program>')
+    context.symbol_table = SymbolTable()
+    output = MemoryOutput()
+    result = interpreter(filename='<test>', engine=engine, output=output,
+                         input=LineInput(stdin.splitlines()), **options).visit(ast, context)
+    error = result.error.as_string() if result.error else None
+    symbols = {name: f"{value} ({type(value).__name__})" for name, value in context.symbol_table.symbols.items()}
+    return output.getvalue(), error, symbols
@@ -0,0 +1,209 @@
+import random
+import unittest
+
+from support import parse, run
+
+from src.interpreter import values
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.runtime import Context, SymbolTable
+from src.interpreter.streams import MemoryOutput
+from src.interpreter.values import Array, Noob, Number, String
+
+
+class BoxedArray(Array):
+    """The original layout, a Value for every element: the bulk operations go element by element."""
+    def __init__(self, element_type, size, line_number=None):
+        super().__init__(element_type, 0, line_number)
+        self.size = size
+        self.elements = [Noob() for _ in range(size)]
+        self.noobs = self.integers = None
+        self.storage = 'boxed'
+
+
+def random_array(rng, element_type, size):
+    array = Array(element_type, size)
+    kind = rng.randrange(4)
+    for index in range(size):
+        if kind == 0 and rng.random() < 0.1:
+            continue  # NOOB
+        if element_type == 'NUMBR':
+            value = rng.choice([rng.randint(-1000, 1000), rng.randint(-2**40, 2**40)] + [2**62] * (kind == 1))
+        elif kind == 2 and rng.random() < 0.3:
+            value = rng.randint(-1000, 1000)  # a NUMBR in a NUMBAR array
+        else:
+            value = rng.uniform(-1e6, 1e6)
+        array.set(index, Number(value))
+    return array
+
+
+def boxed(array):
+    copy = BoxedArray(array.element_type, array.size)
+    for index in range(array.size):
+        value, _ = array.get(index)
+        copy.unbox(index, value if type(value) is not Noob else None)
+    return copy
+
+
+def describe(result):
+    value, error = result
+    if error:
+        return f"error: {error.details}"
+    if isinstance(value, Array):
+        return value.element_type, [describe(value.get(index)) for index in range(value.size)]
+    return f"{type(value).__name__} {value!r} {type(value.value).__name__}"
+
+
+class PackedOperationTest(unittest.TestCase):
+    """The packed (C loop or NumPy) bulk operations agree with element-by-element evaluation."""
+
+    ROUNDS = 3000
+    SEED = 115
+
+    def test_random_arrays(self):
+        rng = random.Random(self.SEED)
+        for _ in range(self.ROUNDS):
+            size = rng.randint(1, 40)
+            element_type = rng.choice(['NUMBR', 'NUMBAR'])
+            typed = random_array(rng, element_type, size)
+            copy = boxed(typed)
+            operation = rng.randrange(5)
+            if operation == 0:
+                scalar = rng.choice([Number(3), Number(-2.5), Number(2**62), String('7'), String('x'), Number(0)])
+                method = rng.choice(['added_by', 'multiplied_by'])
+                results = [(describe(getattr(array, method)(scalar)), describe(getattr(scalar, method)(array)))
+                           for array in (typed, copy)]
+            elif operation == 1:
+                other = random_array(rng, rng.choice(['NUMBR', 'NUMBAR']), size)
+                method = rng.choice(['added_by', 'multiplied_by'])
+                results = [describe(getattr(typed, method)(other)), describe(getattr(copy, method)(boxed(other)))]
+            elif operation == 2:
+                method = rng.choice(['added_by', 'maximum', 'minimum'])
+                results = [describe(typed.reduced_by(method)), describe(copy.reduced_by(method))]
+            elif operation == 3:
+                start, end = sorted(rng.sample(range(size + 2), 2))
+                results = [describe(typed.slice(start, end)), describe(copy.slice(start, end))]
+            else:
+                value = rng.choice([Number(5), Number(2**63), Number(1.5)])
+                results = [(describe(array.fill(value)), describe((array, None))) for array in (typed, copy)]
+            self.assertEqual(results[0], results[1], f"operation {operation} on {element_type}")
+
+
+# Failing operations, each run after the declarations of LINE_PROGRAM; its error must name line 12
+FAILURES = [
+    'SUM OF a AN b',                # arrays of different sizes
+    'PRODUKT OF c AN 2',            # a NOOB element
+    'SUM OF 2 AN c',
+    'SUM OF c AN a',
+    'VISIBLE SUM OF UHS c',
+    'VISIBLE SMALLR OF UHS c',
+    'half R a[1 TIL 9]',            # out of bounds
+    'CONFINE "kitteh" IN a',        # a YARN in a NUMBR array
+]
+
+LINE_PROGRAM = """HAI
+    WAZZUP
+        I HAS A a ITZ A NUMBR UHS OF 3
+        I HAS A b ITZ A NUMBR UHS OF 2
+        I HAS A c ITZ A NUMBAR UHS OF 3
+        I HAS A half ITZ 0
+    BUHBYE
+    CONFINE 1 IN a
+    CONFINE 2 IN b
+    CONFINE 0.5 IN c AT 0
+
+    {statement}
+KTHXBYE
+"""
+
+
+class ErrorLineTest(unittest.TestCase):
+
+    def test_errors_name_their_line(self):
+        for statement in FAILURES:
+            ast = parse(LINE_PROGRAM.format(statement=statement))
+            for engine in Interpreter.ENGINES:
+                _, error, _ = run(engine, ast)
+                self.assertIsNotNone(error, f"{statement} in {engine}")
+                self.assertTrue(error.startswith('Line 12:'), f"{statement} in {engine}: {error}")
+
+
+# (bulk statement, the LOOP doing the same one element at a time) on arrays xs and ys of SIZE
+# NUMBARs and half of SIZE // 2
+OPERATIONS = [
+    ("""
+    CONFINE 0.5 IN xs""", """
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE 0.5 IN xs AT i
+    IM OUTTA YR fill"""),
+    ("""
+    half R xs[{half} TIL {size}]""", """
+    IM IN YR copy UPPIN YR i TIL BOTH SAEM i AN {half}
+        CONFINE xs[SUM OF i AN {half}] IN half AT i
+    IM OUTTA YR copy"""),
+    ("""
+    ys R PRODUKT OF xs AN 1.5""", """
+    IM IN YR scale UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE PRODUKT OF xs[i] AN 1.5 IN ys AT i
+    IM OUTTA YR scale"""),
+    ("""
+    ys R SUM OF xs AN ys""", """
+    IM IN YR add UPPIN YR i TIL BOTH SAEM i AN {size}
+        CONFINE SUM OF xs[i] AN ys[i] IN ys AT i
+    IM OUTTA YR add"""),
+    ("""
+    total R SUM OF UHS xs""", """
+    total R xs[0]
+    i R 1
+    IM IN YR add UPPIN YR i TIL BOTH SAEM i AN {size}
+        total R SUM OF total AN xs[i]
+    IM OUTTA YR add"""),
+    ("""
+    total R BIGGR OF UHS xs""", """
+    total R xs[0]
+    i R 1
+    IM IN YR biggest UPPIN YR i TIL BOTH SAEM i AN {size}
+        total R BIGGR OF total AN xs[i]
+    IM OUTTA YR biggest"""),
+]
+
+
+class BulkStatementTest(unittest.TestCase):
+    """Each bulk statement leaves the variables as its LOOP does, in every engine."""
+
+    SIZE = 50
+
+    def program(self, body):
+        return parse(f"""HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A total ITZ 0
+    BUHBYE
+{body.format(size=self.SIZE, half=self.SIZE // 2)}
+KTHXBYE
+""")
+
+    def variables(self, engine, ast):
+        """Run ast on xs, ys and half; their elements and total afterwards"""
+        rng = random.Random(self.SIZE)
+        context = Context('<program>')
+        context.symbol_table = SymbolTable()
+        for name, length in (('xs', self.SIZE), ('ys', self.SIZE), ('half', self.SIZE // 2)):
+            array = Array('NUMBAR', length)
+            for index in range(length):
+                array.set(index, Number(rng.uniform(-1000, 1000)))
+            context.symbol_table.set(name, array)
+        result = Interpreter(filename='<test>', engine=engine, output=MemoryOutput()).visit(ast, context)
+        self.assertIsNone(result.error)
+        table = context.symbol_table
+        return {name: describe((table.get(name), None)) for name in ('xs', 'ys', 'half', 'total')}
+
+    def test_same_as_loop(self):
+        for bulk, loop in OPERATIONS:
+            bulk_ast, loop_ast = self.program(bulk), self.program(loop)
+            for engine in Interpreter.ENGINES:
+                self.assertEqual(self.variables(engine, bulk_ast), self.variables(engine, loop_ast),
+                                 f"{bulk.strip()} in {engine}")
+
+
+if __name__ == '__main__':
+    unittest.main()
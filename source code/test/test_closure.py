@@ -0,0 +1,49 @@
+import unittest
+
+from support import parse, run
+
+OPERATORS = ('SUM OF', 'DIFF OF', 'PRODUKT OF', 'QUOSHUNT OF', 'MOD OF', 'BIGGR OF', 'SMALLR OF',
+             'BOTH OF', 'EITHER OF', 'WON OF', 'BOTH SAEM', 'DIFFRINT')
+OPERANDS = ('7', '-2', '2.5', 'WIN', 'FAIL', '"4"', '"1.5"', '"x"', 'NOOB')
+
+
+def outcome(engine, ast):
+    """run(), or the exception it raised"""
+    try:
+        return run(engine, ast)
+    except Exception as e:
+        return type(e).__name__
+
+
+class OperatorTest(unittest.TestCase):
+    """The closure engine's compiled operators, fast paths included, act as the tree-walker's."""
+
+    def test_operands(self):
+        for operation in OPERATORS:
+            for left in OPERANDS:
+                for right in OPERANDS:
+                    expression = f"{operation} {left} AN {right}"
+                    ast = parse(f"HAI\nVISIBLE {expression}\nKTHXBYE\n")
+                    self.assertEqual(outcome('closure', ast), outcome('tree', ast), expression)
+
+    def test_array_operands(self):
+        # SUM OF and PRODUKT OF a UHS and a number apply to every element
+        for operation in ('SUM OF', 'PRODUKT OF', 'DIFF OF'):
+            for operands in ('list AN 2', '2 AN list', 'list AN list', 'list AN "x"'):
+                ast = parse(f"""HAI
+    WAZZUP
+        I HAS A list ITZ A NUMBR UHS OF 3
+        I HAS A result
+    BUHBYE
+    CONFINE 1 IN list AT 0
+    CONFINE 2 IN list AT 1
+    CONFINE 3 IN list AT 2
+    result R {operation} {operands}
+    VISIBLE result[0] + " " + result[1] + " " + result[2]
+KTHXBYE
+""")
+                self.assertEqual(outcome('closure', ast), outcome('tree', ast), f"{operation} {operands}")
+
+
+if __name__ == '__main__':
+    unittest.main()
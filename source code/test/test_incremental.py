@@ -0,0 +1,93 @@
+import random
+import unittest
+
+from support import read_testcases
+
+from src.lexer import tokenizer
+from src.lexer.incremental import IncrementalLexer, retokenize
+
+# Fragments that open or close multi-line constructs, to stress resynchronisation
+FRAGMENTS = ['\n', '\n\n', ' ', '"', 'OBTW', 'TLDR', 'OBTW\n', '\nTLDR\n', 'BTW ', '...', '…',
+             'SUM', ' OF', 'I', '\nHAS\n', 'A', 'IF\n', 'U\nSAY\n', 'SO', 'IM IN', 'YR', ':)',
+             'x', '12', '3.5', 'VISIBLE "hi"\n', ',', '!']
+
+
+def lex(code):
+    """(tokens, None), or (None, where and why it does not lex)"""
+    try:
+        return tokenizer.tokenize(code), None
+    except tokenizer.LexerError as e:
+        return None, (e.message, e.line, e.col)
+
+
+def random_edit(rng, code):
+    offset = rng.randint(0, len(code))
+    removed = rng.choice([0, 0, 1, 2, rng.randint(0, 40)])
+    removed = min(removed, len(code) - offset)
+    if rng.random() < 0.7:
+        inserted = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 3)))
+    else:
+        inserted = ''
+    return offset, removed, inserted
+
+
+class RetokenizeTest(unittest.TestCase):
+    """retokenize gives what a full tokenize of the edited text gives, over random edit chains."""
+
+    EDITS = 2000
+    SEED = 124
+
+    def test_random_edits(self):
+        rng = random.Random(self.SEED)
+        sources = list(read_testcases().values())
+        checked = 0
+        while checked < self.EDITS:
+            code = rng.choice(sources)
+            tokens = tokenizer.tokenize(code)
+            for _ in range(50):
+                edit = random_edit(rng, code)
+                offset, removed, inserted = edit
+                expected_code = code[:offset] + inserted + code[offset + removed:]
+                expected, expected_error = lex(expected_code)
+                try:
+                    result, error = retokenize(code, tokens, *edit), None
+                except tokenizer.LexerError as e:
+                    result, error = None, (e.message, e.line, e.col)
+                self.assertEqual(error, expected_error, edit)
+                if result is not None:
+                    self.assertEqual(result, (expected_code, expected), edit)
+                    # Keep editing the new text; edits that do not lex are dropped
+                    code, tokens = result
+                checked += 1
+
+
+class IncrementalLexerTest(unittest.TestCase):
+    """An IncrementalLexer keeps up through edits that do not lex, as an editor buffer does."""
+
+    def test_edits(self):
+        rng = random.Random(7)
+        code = read_testcases()['01_variables.lol']
+        lexer = IncrementalLexer(code)
+        for _ in range(300):
+            offset, removed, inserted = random_edit(rng, code)
+            code = code[:offset] + inserted + code[offset + removed:]
+            expected, expected_error = lex(code)
+            try:
+                tokens = lexer.edit(offset, removed, inserted)
+            except tokenizer.LexerError:
+                tokens = None
+            self.assertEqual(lexer.code, code)
+            self.assertEqual(tokens, expected)
+            self.assertEqual(lexer.tokens, expected)
+
+    def test_reset(self):
+        lexer = IncrementalLexer()
+        with self.assertRaises(tokenizer.LexerError):
+            lexer.reset('VISIBLE 1 $\n')
+        self.assertIsNone(lexer.tokens)
+        self.assertEqual(lexer.reset('VISIBLE 1\n'), tokenizer.tokenize('VISIBLE 1\n'))
+        self.assertEqual(lexer.code, 'VISIBLE 1\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
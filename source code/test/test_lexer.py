@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from support import read_testcases
+
+from src.lexer import tokenizer
+from src.lexer.source import SourceLine, StreamIndex
+
+
+def large_program():
+    """The testcases repeated past a few CHUNK_SIZEs, with a comment spanning lines at the end"""
+    body = '\n'.join(read_testcases().values())
+    text = body * (3 * tokenizer.CHUNK_SIZE // len(body) + 1)
+    return text + 'OBTW\nspans\nlines\nTLDR\nVISIBLE "end"\n'
+
+
+class StreamTest(unittest.TestCase):
+    """tokenize_iter of a file object gives the same tokens as tokenize of its text."""
+
+    def test_same_tokens(self):
+        text = large_program()
+        streamed = list(tokenizer.tokenize_iter(io.StringIO(text)))
+        self.assertEqual([token.items() for token in streamed],
+                         [token.items() for token in tokenizer.tokenize(text)])
+        self.assertIsInstance(streamed[-1].source, SourceLine)
+
+    def test_error_position(self):
+        text = large_program() + 'VISIBLE 1 $\n'
+        errors = []
+        for source in (text, io.StringIO(text)):
+            with self.assertRaises(tokenizer.LexerError) as caught:
+                list(tokenizer.tokenize_iter(source))
+            errors.append((caught.exception.line, caught.exception.col))
+        self.assertEqual(errors[0], (text.count('\n'), 11))
+        self.assertEqual(errors[1], errors[0])
+
+    def test_index_is_bounded(self):
+        # The StreamIndex only keeps the lines still buffered, not one entry per line read
+        text = large_program()
+        index = StreamIndex()
+        for _ in tokenizer._scan(index.track(tokenizer._read_chunks(io.StringIO(text))), index, '<test>'):
+            pass
+        self.assertEqual(index.first_line + len(index.line_starts) - 1, text.count('\n') + 1)
+        self.assertLess(len(index.line_starts), text.count('\n') // 2)
+
+
+class StringEscapeTest(unittest.TestCase):
+
+    def value(self, literal):
+        tokens = tokenizer.tokenize(f'VISIBLE "{literal}"\n')
+        return ''.join(token['value'] for token in tokens if token['type'] is tokenizer.TokenType.STRING)
+
+    def error(self, literal):
+        with self.assertRaises(tokenizer.LexerError) as caught:
+            tokenizer.tokenize(f'VISIBLE "{literal}"\n')
+        return caught.exception
+
+    def test_escapes(self):
+        self.assertEqual(self.value('a:)b:>c:"d::e:o'), 'a\nb\tc"d:e\a')
+        self.assertEqual(self.value('x:(41):(1F600):(D7FF):(E000)'), 'xA\U0001F600\ud7ff\ue000')
+        self.assertEqual(self.value(':[LATIN SMALL LETTER A]:[SNOWMAN]'), 'a\u2603')
+        self.assertEqual(self.value('a:b'), 'a:b')
+
+    def test_invalid_escapes(self):
+        # Reported at the escape's colon (col 9 is the first character of the literal)
+        for literal in ('ab:(110000)', 'ab:(D800)', 'ab:(dfff)', 'ab:(zz)', 'ab:[NO SUCH NAME]'):
+            error = self.error(literal)
+            self.assertEqual((error.line, error.col), (1, 12), literal)
+        self.assertIn('surrogate', self.error('ab:(DC00)').message)
+
+
+if __name__ == '__main__':
+    unittest.main()
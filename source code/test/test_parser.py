@@ -0,0 +1,60 @@
+import io
+import unittest
+
+from support import parse, read_testcases
+
+from src.lexer import tokenizer
+from src.parser import serialize
+from src.parser.parser import Parser
+
+
+def shape(value):
+    """A value of an AST as nested tuples, with every field of every token"""
+    if isinstance(value, tokenizer.Token):
+        return tuple(value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(shape(item) for item in value)
+    if type(value) in serialize.NODE_FIELDS:
+        return (type(value).__name__,) + tuple(shape(getattr(value, name)) for name in serialize.NODE_FIELDS[type(value)])
+    return value
+
+
+class TokenStreamTest(unittest.TestCase):
+    """The parser reads tokens as they are lexed: a generator parses as the whole list does."""
+
+    def test_same_tree(self):
+        for name, source in read_testcases().items():
+            expected = shape(parse(source, name))
+            for tokens in (tokenizer.tokenize_iter(source, name), tokenizer.tokenize_iter(io.StringIO(source), name)):
+                result = Parser(tokens, filename=name).parse()
+                self.assertIsNone(result.error, name)
+                self.assertEqual(shape(result.node), expected, name)
+
+    def test_same_error(self):
+        source = 'HAI\nVISIBLE "a" BLAH BLAH\nI HAS A\nKTHXBYE\n'
+        expected = Parser(tokenizer.tokenize(source)).parse().error.as_string()
+        result = Parser(tokenizer.tokenize_iter(source)).parse()
+        self.assertEqual(result.error.as_string(), expected)
+
+
+class EmptyStringTest(unittest.TestCase):
+    """"" has no STRING token of its own: the parser makes one at the opening quote."""
+
+    def token(self, ast):
+        return ast.sections[0].statements[0].operands[0].token
+
+    def test_token(self):
+        token = self.token(parse('HAI\nVISIBLE ""\nKTHXBYE\n'))
+        self.assertIsInstance(token, tokenizer.Token)
+        self.assertEqual((token.type, token.value, token.line, token.col), (tokenizer.TokenType.STRING, '', 2, 9))
+        self.assertEqual(token['category'], tokenizer.TOKEN_CATEGORIES[tokenizer.TokenType.STRING])
+
+    def test_round_trip(self):
+        ast = parse('HAI\nVISIBLE ""\nKTHXBYE\n')
+        token = self.token(serialize.load(serialize.dump(ast)))
+        self.assertEqual(token, self.token(ast))
+        self.assertEqual(token.offset, self.token(ast).offset)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from support import parse, read_testcases, run
+
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.resolver import resolve
+from src.interpreter.runtime import RTResult
+
+STDIN_SETS = [
+    '5\n3\n7\n2\nhello\nworld\n4\n1\n0\n9\n8\n6\n',
+    '12\nabc\n-3\n2.5\nWIN\n\n100\n7\n7\n7\n7\n7\n',
+]
+
+
+class NameLookupInterpreter(Interpreter):
+    """Runs programs without resolving them, so every lookup goes by name."""
+    def visit_ProgramNode(self, node, context):
+        res = RTResult()
+        context.output, context.input, context.stats = self.output, self.input, self.stats
+        try:
+            for section in node.sections:
+                res.register(self.visit(section, context))
+                if res.error: return res
+            return res.success(None)
+        finally:
+            self.output.flush()
+
+
+GLOBALS_PROGRAM = """HAI
+    WAZZUP
+        I HAS A i ITZ 0
+        I HAS A weights ITZ A NUMBR UHS OF 4
+    BUHBYE
+
+    HOW IZ I weigh YR n
+        I HAS A j ITZ 0
+        I HAS A sum ITZ n
+        IM IN YR scan UPPIN YR j TIL BOTH SAEM j AN 4
+            sum R SUM OF sum AN weights[j]
+        IM OUTTA YR scan
+        FOUND YR sum
+    IF U SAY SO
+
+    IM IN YR fill UPPIN YR i TIL BOTH SAEM i AN 4
+        CONFINE i IN weights AT i
+    IM OUTTA YR fill
+    VISIBLE I IZ weigh YR 10 MKAY
+KTHXBYE
+"""
+
+
+class ResolvedLookupTest(unittest.TestCase):
+    """Lookups by resolved (depth, slot) address find what lookups by name find."""
+
+    def check(self, source, name='<test>', stdin=''):
+        # Separate trees, so the name-lookup run cannot use annotations left by the other
+        expected = run('tree', parse(source, name), stdin, interpreter=NameLookupInterpreter)
+        self.assertEqual(run('tree', parse(source, name), stdin), expected, name)
+
+    def test_testcases(self):
+        for name, source in read_testcases().items():
+            for stdin in STDIN_SETS:
+                self.check(source, name, stdin)
+
+    def test_enclosing_scope(self):
+        self.check(GLOBALS_PROGRAM)
+        self.assertEqual(run('tree', parse(GLOBALS_PROGRAM))[:2], ("16\n", None))
+
+    def test_errors_found_without_running(self):
+        source = """HAI
+    VISIBLE "start"
+    BOTH SAEM 1 AN 2
+    O RLY?
+        YA RLY
+            VISIBLE missing
+    OIC
+    gone R 1
+KTHXBYE
+"""
+        errors = [error.as_string() for error in resolve(parse(source), '<test>').errors]
+        self.assertEqual(len(errors), 2)
+        self.assertIn("Variable 'missing' is not defined", errors[0])
+        # Only the one the program reaches is raised, as by name
+        output, error, _ = run('tree', parse(source))
+        self.assertEqual((output, error), ("start\n", errors[1]))
+        self.check(source)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from support import parse, read_testcases
+
+from src.parser import serialize
+
+
+class OpcodeTest(unittest.TestCase):
+
+    def test_ranges_do_not_overlap(self):
+        nodes = set(serialize.NODE_OPCODES.values())
+        leaves = set(serialize.LEAF_OPCODES.values())
+        self.assertFalse(nodes & leaves)
+        self.assertGreater(min(nodes), serialize.OP_TUPLE)
+        self.assertLess(max(leaves), 256)
+
+    def test_round_trip(self):
+        for name, source in read_testcases().items():
+            data = serialize.dump(parse(source, name))
+            self.assertEqual(serialize.dump(serialize.load(data)), data, name)
+
+    def test_other_version(self):
+        data = bytearray(serialize.dump(parse("HAI\nVISIBLE 1\nKTHXBYE\n")))
+        data[len(serialize.MAGIC)] = serialize.FORMAT_VERSION - 1
+        with self.assertRaises(serialize.FormatError):
+            serialize.load(bytes(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+import contextlib
+import unittest
+
+from support import parse, run
+
+import src.interpreter.resolver as resolver
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.values import Function
+from src.parser.parser import ReturnNode
+from src.vm.compiler import Compiler
+
+
+def nested_return(self, node, block):
+    self.marker(block.on_return, block, self.expression(node.return_expression))
+
+
+@contextlib.contextmanager
+def nested_calls():
+    """Run FOUND YR of a call as a nested call (on trees parsed for it: both ways mark the nodes)"""
+    saved = resolver.tail_calls, Compiler.statement_ReturnNode
+    resolver.tail_calls = lambda statements: iter(())
+    Compiler.statement_ReturnNode = nested_return
+    # The compiler keeps the method it found for each node class
+    Compiler.statement_handlers.pop(ReturnNode, None)
+    try:
+        yield
+    finally:
+        resolver.tail_calls, Compiler.statement_ReturnNode = saved
+        Compiler.statement_handlers.pop(ReturnNode, None)
+
+
+PROGRAMS = [
+    ("Accumulators, mutual recursion and errors", """HAI
+    HOW IZ I loop YR n AN YR acc AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR acc
+            MEBBE BOTH SAEM n AN 5
+                FOUND YR I IZ self YR DIFF OF n AN 1 AN YR SUM OF acc AN 100 AN YR self MKAY
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR SUM OF acc AN n AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I even YR n AN YR odd AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR WIN
+        OIC
+        FOUND YR I IZ odd YR DIFF OF n AN 1 AN YR self AN YR odd MKAY
+    IF U SAY SO
+    HOW IZ I odd YR n AN YR even AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR FAIL
+        OIC
+        FOUND YR I IZ even YR DIFF OF n AN 1 AN YR self AN YR even MKAY
+    IF U SAY SO
+    HOW IZ I div YR n AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR QUOSHUNT OF 1 AN n
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I bad YR n AN YR self
+        FOUND YR I IZ self YR n MKAY
+    IF U SAY SO
+
+    VISIBLE I IZ loop YR 10 AN YR 0 AN YR loop MKAY
+    VISIBLE I IZ even YR 7 AN YR odd AN YR even MKAY
+    I HAS A x ITZ I IZ loop YR 3 AN YR 1 AN YR loop MKAY
+    VISIBLE x
+    VISIBLE I IZ bad YR 1 AN YR bad MKAY
+KTHXBYE
+"""),
+    ("Error at the end of a chain", """HAI
+    HOW IZ I div YR n AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR QUOSHUNT OF 1 AN n
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+    IF U SAY SO
+
+    VISIBLE I IZ div YR 4 AN YR div MKAY
+KTHXBYE
+"""),
+    # An O RLY? before any statement in the body reads IT from the frame the function runs
+    # under, which for a function passed to itself is its caller's
+    ("IT seen through the frames of earlier calls", """HAI
+    HOW IZ I f YR n AN YR self
+        O RLY?
+            YA RLY
+                VISIBLE "win " + n
+            NO WAI
+                VISIBLE "fail " + n
+        OIC
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR n
+        OIC
+        MOD OF n AN 2
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I helper
+        O RLY?
+            YA RLY
+                VISIBLE "helper win"
+            NO WAI
+                VISIBLE "helper fail"
+        OIC
+    IF U SAY SO
+    HOW IZ I g YR n AN YR h AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR 0
+        OIC
+        BOTH SAEM n AN 3
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR NOOB AN YR self MKAY
+    IF U SAY SO
+
+    BOTH SAEM 1 AN 2
+    VISIBLE I IZ f YR 6 AN YR f MKAY
+    VISIBLE I IZ f YR 2 AN YR f MKAY
+    VISIBLE I IZ g YR 3 AN YR helper AN YR g MKAY
+    I IZ helper MKAY
+KTHXBYE
+"""),
+]
+
+
+def loop_program(iterations):
+    """Sums 1 to iterations with an accumulator (functions cannot see their own name, so it is passed along)"""
+    return f"""HAI
+    HOW IZ I count YR n AN YR total AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR total
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR SUM OF total AN n AN YR self MKAY
+    IF U SAY SO
+
+    VISIBLE I IZ count YR {iterations} AN YR 0 AN YR count MKAY
+KTHXBYE
+"""
+
+
+# Programs whose frames are read by Functions, with their output and which can_fold decisions
+# the tree and closure engines must make on them
+FRAME_PROGRAMS = [
+    # swap passes both Function arguments on (swapped): its chain folds. drop leaves where behind
+    # on the frame of its first call, whose IT (FAIL, n is 3) where must still read at the end
+    ("Function arguments through a chain of tail calls", """HAI
+    HOW IZ I shout YR x
+        FOUND YR SMOOSH "shout " AN x
+    IF U SAY SO
+    HOW IZ I whisper YR x
+        FOUND YR SMOOSH "whisper " AN x
+    IF U SAY SO
+    HOW IZ I where
+        O RLY?
+            YA RLY
+                FOUND YR "win"
+            NO WAI
+                FOUND YR "fail"
+        OIC
+    IF U SAY SO
+    HOW IZ I swap YR n AN YR f AN YR g AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR I IZ f YR n MKAY
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR g AN YR f AN YR self MKAY
+    IF U SAY SO
+    HOW IZ I drop YR n AN YR f AN YR self
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR n
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR NOOB AN YR self MKAY
+    IF U SAY SO
+
+    VISIBLE I IZ swap YR 5 AN YR shout AN YR whisper AN YR swap MKAY
+    VISIBLE I IZ swap YR 4 AN YR shout AN YR whisper AN YR swap MKAY
+    VISIBLE I IZ drop YR 3 AN YR where AN YR drop MKAY
+    VISIBLE I IZ where MKAY
+KTHXBYE
+""", "whisper 0\nshout 0\n0\nfail\n", {True, False}),
+    # A function defined in a body keeps that call's frame, and reads its IT: maker's frames are
+    # never reused (one must not see the IT of the later call), and build's chain never folds
+    ("Functions defined in a body, called after it returned", """HAI
+    HOW IZ I maker YR n
+        HOW IZ I inner
+            O RLY?
+                YA RLY
+                    FOUND YR "one"
+                NO WAI
+                    FOUND YR "other"
+            OIC
+        IF U SAY SO
+        BOTH SAEM n AN 1
+        FOUND YR inner
+    IF U SAY SO
+    HOW IZ I build YR n AN YR acc AN YR self
+        HOW IZ I get
+            O RLY?
+                YA RLY
+                    FOUND YR "last"
+                NO WAI
+                    FOUND YR "earlier"
+            OIC
+        IF U SAY SO
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                FOUND YR acc
+        OIC
+        FOUND YR I IZ self YR DIFF OF n AN 1 AN YR get AN YR self MKAY
+    IF U SAY SO
+
+    I HAS A one ITZ I IZ maker YR 1 MKAY
+    I HAS A two ITZ I IZ maker YR 2 MKAY
+    VISIBLE I IZ one MKAY
+    VISIBLE I IZ two MKAY
+    I HAS A got ITZ I IZ build YR 3 AN YR NOOB AN YR build MKAY
+    VISIBLE I IZ got MKAY
+KTHXBYE
+""", "one\nother\nlast\n", {False}),
+]
+
+
+class FrameFoldTest(unittest.TestCase):
+    """Chains of tail calls fold their frames (Function.can_fold) only when no Function still reads them."""
+
+    def test_frames_read_by_functions(self):
+        can_fold = Function.can_fold
+        decisions = set()
+        def recorded(*args):
+            decision = can_fold(*args)
+            decisions.add(decision)
+            return decision
+        for label, source, expected, folds in FRAME_PROGRAMS:
+            for engine in Interpreter.ENGINES:
+                with nested_calls():
+                    nested, _, _ = run(engine, parse(source))
+                decisions.clear()
+                Function.can_fold = recorded
+                try:
+                    output, _, _ = run(engine, parse(source))
+                finally:
+                    Function.can_fold = can_fold
+                self.assertEqual(nested, expected, f"{label}, nested, in {engine}")
+                self.assertEqual(output, expected, f"{label} in {engine}")
+                # (the vm folds its own frames, in VirtualMachine.reenter)
+                if engine != 'vm':
+                    self.assertEqual(decisions, folds, f"{label} in {engine}")
+
+
+class TailCallTest(unittest.TestCase):
+    """A call in tail position gives what the nested call gives, however deep the chain."""
+
+    def test_same_as_nested_calls(self):
+        for label, source in PROGRAMS:
+            with nested_calls():
+                expected = run('tree', parse(source))
+            for engine in Interpreter.ENGINES:
+                with nested_calls():
+                    self.assertEqual(run(engine, parse(source)), expected, f"{label}, nested, in {engine}")
+                self.assertEqual(run(engine, parse(source)), expected, f"{label} in {engine}")
+
+    def test_deep_chain(self):
+        # Far past Python's default recursion limit, which tail calls leave alone
+        depth = 20000
+        ast = parse(loop_program(depth))
+        for engine in Interpreter.ENGINES:
+            self.assertEqual(run(engine, ast)[:2], (f"{depth * (depth + 1) // 2}\n", None), engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
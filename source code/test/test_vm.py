@@ -0,0 +1,148 @@
+import sys
+import unittest
+
+from support import parse, run
+
+from src.interpreter.interpreter import Interpreter
+
+
+def nested(depth, operand, template):
+    """operand wrapped depth times in template, e.g. 'SUM OF 1 AN {}'"""
+    expression = operand
+    for _ in range(depth):
+        expression = template.format(expression)
+    return expression
+
+
+class NestedExpressionTest(unittest.TestCase):
+    """The vm compiles nested operators without recursing, so it runs whatever the parser accepts."""
+
+    # Deeper than the vm's compiler could recurse, shallow enough for the recursive parser
+    DEPTH = 300
+
+    def check(self, operand, template, expected):
+        ast = parse(f"HAI\nVISIBLE {nested(self.DEPTH, operand, template)}\nKTHXBYE\n")
+        for engine in ('tree', 'vm'):
+            self.assertEqual(run(engine, ast), (expected, None, {}), engine)
+
+    def test_sum_of(self):
+        self.check('1', 'SUM OF 1 AN {}', f'{self.DEPTH + 1}\n')
+
+    def test_both_of(self):
+        self.check('WIN', 'BOTH OF {} AN WIN', 'WIN\n')
+
+    def test_both_saem(self):
+        self.check('WIN', 'EITHER OF BOTH SAEM 1 AN 1 AN {}', 'WIN\n')
+
+    def test_maek(self):
+        self.check('1', 'MAEK {} A NUMBR', '1\n')
+
+    def test_too_deep_to_compile(self):
+        # Statements still nest by recursing: past the limit they are a LOLCODE error at the
+        # innermost statement the compiler could finish
+        depth = 60
+        source = "HAI\n" + "BOTH SAEM 1 AN 1\nO RLY?\nYA RLY\n" * depth + "VISIBLE 1\n" + "OIC\n" * depth + "KTHXBYE\n"
+        ast = parse(source)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len_stack() + 100)
+        try:
+            _, error, _ = run('vm', ast)
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertIsNotNone(error)
+        self.assertIn("Code is nested too deeply to compile", error)
+        self.assertRegex(error, r'^Line \d+:')
+
+
+def depth_program(depth):
+    """Recurses depth calls deep (functions cannot see their own name, so it is passed along)"""
+    return f"""HAI
+    HOW IZ I depth YR n AN YR self
+        BOTH SAEM n AN 1
+        O RLY?
+            YA RLY
+                FOUND YR 1
+        OIC
+        I HAS A below ITZ I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+        FOUND YR SUM OF below AN 1
+    IF U SAY SO
+
+    VISIBLE I IZ depth YR {depth} AN YR depth MKAY
+KTHXBYE
+"""
+
+
+def failing_program(depth):
+    """Divides by zero at the bottom of the recursion; every level assigns the call with R"""
+    return f"""HAI
+    WAZZUP
+        I HAS A result ITZ 0
+    BUHBYE
+
+    HOW IZ I fall YR n AN YR self
+        I HAS A below ITZ 0
+        BOTH SAEM n AN 0
+        O RLY?
+            YA RLY
+                below R QUOSHUNT OF 1 AN n
+            NO WAI
+                below R I IZ self YR DIFF OF n AN 1 AN YR self MKAY
+        OIC
+        FOUND YR below
+    IF U SAY SO
+
+    result R I IZ fall YR {depth} AN YR fall MKAY
+KTHXBYE
+"""
+
+
+class RecursionTest(unittest.TestCase):
+    """The vm keeps the calls in progress on a stack of its own, bounded by max_depth."""
+
+    # Python frames allowed below the test while recursing; a recursive evaluator needs several
+    # per LOLCODE call
+    HOST_FRAMES = 100
+
+    def test_shallow_recursion_agrees(self):
+        for source in (depth_program(40), failing_program(40)):
+            ast = parse(source)
+            expected = run('tree', ast)
+            for engine in Interpreter.ENGINES[1:]:
+                self.assertEqual(run(engine, ast), expected, engine)
+
+    def test_deep_recursion(self):
+        depth = 100000
+        ast = parse(depth_program(depth))
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len_stack() + self.HOST_FRAMES)
+        try:
+            output, error, _ = run('vm', ast)
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertIsNone(error)
+        self.assertEqual(output, f"{depth}\n")
+
+    def test_max_depth(self):
+        ast = parse(depth_program(50))
+        self.assertEqual(run('vm', ast, max_depth=50)[:2], ("50\n", None))
+        _, error, _ = run('vm', ast, max_depth=49)
+        # at the recursive call, on line 8
+        self.assertTrue(error.startswith('Line 8:'), error)
+
+    def test_max_depth_is_vm_only(self):
+        for engine in Interpreter.ENGINES:
+            if engine != 'vm':
+                with self.assertRaises(ValueError):
+                    Interpreter(engine=engine, max_depth=10)
+
+
+def len_stack():
+    """The number of Python frames below the caller"""
+    frame, depth = sys._getframe(1), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+if __name__ == '__main__':
+    unittest.main()